@@ -0,0 +1,47 @@
+"""Benchmark score_batch on growing batches.
+
+Doubles the batch size from --min-nodes to --max-nodes, scores each batch with
+one score_batch call and prints the total run time and the time per node. The
+bitset columns of a batch are built and walked in linear time, so the time per
+node should stay flat as the batch grows.
+
+Usage:
+    python -m benchmarks.bench_batch [--scores 16] [--min-nodes 1000]
+        [--max-nodes 16000] [--backend native]
+"""
+
+import argparse
+import sys
+import time
+
+from shui_widget_scoring import ScoringEngine
+
+from .workload import build_workload
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scores", type=int, default=16)
+    parser.add_argument("--min-nodes", type=int, default=1000)
+    parser.add_argument("--max-nodes", type=int, default=16000)
+    parser.add_argument("--backend", choices=("pyshacl", "native"), default="native")
+    args = parser.parse_args()
+
+    print(f"Python {sys.version.split()[0]}")
+    print(f"{args.scores} Scores, {args.backend} backend")
+    print(f"{'nodes':>8} {'seconds':>8} {'us/node':>8}")
+    nodes = args.min_nodes
+    while nodes <= args.max_nodes:
+        scoring_graph, data_graph, focus_nodes = build_workload(args.scores, nodes)
+        engine = ScoringEngine(
+            scoring_graph, scoring_graph, scoring_graph, backend=args.backend
+        )
+        start = time.perf_counter()
+        engine.score_batch(focus_nodes, data_graph=data_graph)
+        elapsed = time.perf_counter() - start
+        print(f"{nodes:>8} {elapsed:>8.2f} {elapsed / nodes * 1e6:>8.1f}")
+        nodes *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark the time importing the package adds on top of importing rdflib.
+
+Imports the package in fresh interpreters after rdflib is already loaded and
+prints the minimum and median import time, so changes that pull heavy
+dependencies into the import path show up.
+
+Usage:
+    python -m benchmarks.bench_import [--runs 10]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+IMPORT_SCRIPT = """
+import time
+import rdflib
+start = time.perf_counter()
+import shui_widget_scoring
+print(time.perf_counter() - start)
+"""
+
+
+def import_time() -> float:
+    """Return the seconds one fresh interpreter takes to import the package."""
+    completed = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(completed.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    times = [import_time() for _ in range(args.runs)]
+    print(f"Python {sys.version.split()[0]}")
+    print(f"{'runs':>5} {'min ms':>8} {'median ms':>10}")
+    print(
+        f"{args.runs:>5} {min(times) * 1000:>8.1f} "
+        f"{statistics.median(times) * 1000:>10.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
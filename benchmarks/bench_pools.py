@@ -0,0 +1,85 @@
+"""Benchmark the thread, process and interpreter pool scorers.
+
+Scores the same focus nodes with ScoringEngine.score_batch in the current
+process, then with ThreadPoolScorer, ProcessPoolScorer and (on Python 3.14+)
+InterpreterPoolScorer on pools of increasing size, and prints the throughput
+and speedup for each. Process and interpreter workers load the engine from
+an artefact and attach to a snapshot of the data graph, and the pool start-up
+cost is included in each timing.
+
+Usage:
+    python -m benchmarks.bench_pools [--scores 16] [--nodes 2000]
+        [--max-workers N] [--chunk-size 250]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from shui_widget_scoring import ScoringEngine
+from shui_widget_scoring.artifact import save_engine
+from shui_widget_scoring.parallel import (
+    InterpreterPoolScorer,
+    ProcessPoolScorer,
+    ThreadPoolScorer,
+    interpreters_available,
+)
+from shui_widget_scoring.snapshot import GraphSnapshot
+
+from .workload import build_workload
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scores", type=int, default=16)
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=250)
+    args = parser.parse_args()
+
+    scoring_graph, data_graph, focus_nodes = build_workload(args.scores, args.nodes)
+    engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    print(f"{args.scores} Scores, {args.nodes} focus nodes, {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    engine.score_batch(focus_nodes, data_graph=data_graph)
+    baseline = time.perf_counter() - start
+    print(f"{'backend':>12} {'workers':>8} {'nodes/s':>10} {'speedup':>8}")
+    print(f"{'serial':>12} {1:>8} {args.nodes / baseline:>10.1f} {1.0:>8.2f}")
+
+    backends = {"thread": ThreadPoolScorer, "process": ProcessPoolScorer}
+    if interpreters_available():
+        backends["interpreter"] = InterpreterPoolScorer
+    else:
+        print("InterpreterPoolScorer needs Python 3.14+, skipped")
+
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        GraphSnapshot.create(data_graph) as snapshot,
+    ):
+        path = os.path.join(tmp, "engine.bin")
+        save_engine(engine, path)
+        workers = 1
+        while workers <= args.max_workers:
+            for label, scorer_class in backends.items():
+                start = time.perf_counter()
+                with scorer_class(
+                    path, snapshot, max_workers=workers, chunk_size=args.chunk_size
+                ) as scorer:
+                    for _ in scorer.score_iter(focus_nodes, ordered=False):
+                        pass
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{label:>12} {workers:>8} {args.nodes / elapsed:>10.1f} "
+                    f"{baseline / elapsed:>8.2f}"
+                )
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark process pools fed a pickled data graph against a shared snapshot.
+
+For each pool size, starts a ProcessPoolScorer with the data graph passed as
+pickled triples and as a GraphSnapshot, scores the focus nodes, and prints the
+bytes sent to each worker at start-up, the total run time and the combined
+resident memory of the workers. The per-worker payload of a snapshot is its
+segment name, so worker memory should stay flat as workers are added.
+
+Usage:
+    python -m benchmarks.bench_snapshot [--scores 16] [--nodes 20000]
+        [--max-workers N] [--chunk-size 1000]
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+from shui_widget_scoring import ScoringEngine
+from shui_widget_scoring.parallel import ProcessPoolScorer, graph_payload
+from shui_widget_scoring.snapshot import GraphSnapshot
+
+from .workload import build_workload
+
+
+def workers_rss(scorer: ProcessPoolScorer) -> int:
+    """Return the combined resident set size of a pool's workers, in bytes."""
+    total = 0
+    for pid in scorer._executor._processes:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            return 0
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scores", type=int, default=16)
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    scoring_graph, data_graph, focus_nodes = build_workload(args.scores, args.nodes)
+    engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+
+    print(f"Python {sys.version.split()[0]}")
+    print(f"{args.scores} Scores, {len(data_graph)} triples, {os.cpu_count()} CPUs")
+
+    with GraphSnapshot.create(data_graph) as snapshot:
+        sources = {"pickled": data_graph, "snapshot": snapshot}
+        print(
+            f"{'workers':>8} {'source':>9} {'payload':>10} {'seconds':>8} {'RSS MiB':>8}"
+        )
+        workers = 1
+        while workers <= args.max_workers:
+            for label, source in sources.items():
+                payload = len(pickle.dumps(graph_payload(source)))
+                start = time.perf_counter()
+                with ProcessPoolScorer(
+                    engine, source, max_workers=workers, chunk_size=args.chunk_size
+                ) as scorer:
+                    for _ in scorer.score_iter(focus_nodes, ordered=False):
+                        pass
+                    rss = workers_rss(scorer)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{workers:>8} {label:>9} {payload:>10} {elapsed:>8.2f} "
+                    f"{rss / (1 << 20):>8.1f}"
+                )
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
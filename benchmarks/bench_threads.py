@@ -0,0 +1,60 @@
+"""Benchmark thread-pool evaluation against serial evaluation.
+
+Scores the same focus nodes with ScoringEngine.score on thread pools of
+increasing size and prints the throughput and speedup for each. On a build
+with the GIL, threads only overlap while pyshacl releases it, so speedups are
+expected on the free-threaded build.
+
+Usage:
+    python -m benchmarks.bench_threads [--scores 16] [--nodes 50] [--max-workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from shui_widget_scoring import ScoringEngine
+
+from .workload import build_workload
+
+
+def run(engine: ScoringEngine, data_graph, focus_nodes) -> float:
+    """Score every focus node once and return the elapsed seconds."""
+    start = time.perf_counter()
+    for focus_node in focus_nodes:
+        engine.score(focus_node, data_graph=data_graph)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scores", type=int, default=16)
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    scoring_graph, data_graph, focus_nodes = build_workload(args.scores, args.nodes)
+    engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    print(f"{args.scores} Scores, {args.nodes} focus nodes, {os.cpu_count()} CPUs")
+
+    baseline = run(engine, data_graph, focus_nodes)
+    print(f"{'workers':>8} {'nodes/s':>10} {'speedup':>8}")
+    print(f"{'serial':>8} {args.nodes / baseline:>10.1f} {1.0:>8.2f}")
+
+    workers = 1
+    while workers <= args.max_workers:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            engine.executor = executor
+            elapsed = run(engine, data_graph, focus_nodes)
+        engine.executor = None
+        print(f"{workers:>8} {args.nodes / elapsed:>10.1f} {baseline / elapsed:>8.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
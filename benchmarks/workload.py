@@ -0,0 +1,55 @@
+"""Synthetic scoring workloads shared by the benchmarks."""
+
+from typing import List, Tuple
+
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDF
+
+from shui_widget_scoring.namespaces import SH, SHUI
+
+EX = Namespace("http://example.org/")
+
+
+def build_workload(
+    num_scores: int = 16, num_nodes: int = 200
+) -> Tuple[Graph, Graph, List[URIRef]]:
+    """
+    Build a scoring graph with graph-dependent shapes and a matching data graph.
+
+    Every Score has its own dataGraphShape requiring a value for one predicate,
+    so each shape needs a real validation run and none can be dispatched on
+    datatype alone. Focus node i has values for the predicates i % k == 0.
+
+    Args:
+        num_scores: Number of Score instances, each with a distinct shape
+        num_nodes: Number of focus nodes in the data graph
+
+    Returns:
+        The scoring graph (also holding the shapes), the data graph and the
+        focus nodes
+    """
+    scoring_graph = Graph()
+    for k in range(1, num_scores + 1):
+        shape = EX[f"hasP{k}"]
+        prop = EX[f"hasP{k}Property"]
+        scoring_graph.add((shape, RDF.type, SH.NodeShape))
+        scoring_graph.add((shape, SH.property, prop))
+        scoring_graph.add((prop, SH.path, EX[f"p{k}"]))
+        scoring_graph.add((prop, SH.minCount, Literal(1)))
+
+        score = EX[f"Score{k}"]
+        scoring_graph.add((score, RDF.type, SHUI.Score))
+        scoring_graph.add((score, SHUI.widget, EX[f"Editor{k}"]))
+        scoring_graph.add((score, SHUI.score, Literal(k)))
+        scoring_graph.add((score, SHUI.dataGraphShape, shape))
+
+    data_graph = Graph()
+    focus_nodes = []
+    for i in range(num_nodes):
+        node = EX[f"item{i}"]
+        focus_nodes.append(node)
+        data_graph.add((node, RDF.type, EX.Item))
+        for k in range(1, num_scores + 1):
+            if i % k == 0:
+                data_graph.add((node, EX[f"p{k}"], Literal(i)))
+    return scoring_graph, data_graph, focus_nodes
@@ -5,6 +5,7 @@ import { focusNodeToRDFLibPython, focusNodeToN3String } from "@/lib/focusNode";
 
 let pyodide: any = null;
 let isInitialized = false;
+let isPyshaclInstalled = false;
 let baseURL = "";
 
 // Initialize Pyodide
@@ -22,8 +23,9 @@ async function initPyodide() {
     await pyodide.loadPackage(["micropip"]);
     const micropip = pyodide.pyimport("micropip");
 
-    // Install rdflib and pyshacl
-    await micropip.install(["rdflib", "pyshacl"]);
+    // Install rdflib only: scoring runs on the native backend, and pyshacl is
+    // installed on demand for scoring graphs outside the native SHACL subset
+    await micropip.install(["rdflib"]);
 
     // Install the wheel from public folder using the baseURL
     const wheelURL = `${baseURL}pyodide/shui_widget_score-0.1.0-py3-none-any.whl`;
@@ -39,16 +41,26 @@ async function initPyodide() {
   }
 }
 
+// Install pyshacl the first time a scoring graph needs it
+async function ensurePyshacl() {
+  if (isPyshaclInstalled) return;
+  const micropip = pyodide.pyimport("micropip");
+  await micropip.install(["pyshacl"]);
+  isPyshaclInstalled = true;
+}
+
 // Score widgets function
 async function scoreWidgets(request: ScoringRequest): Promise<ScoringResult> {
   if (!pyodide || !isInitialized) {
     throw new Error("Pyodide not initialized");
   }
 
+  const backend = isPyshaclInstalled ? "pyshacl" : "native";
+
   // Create Python code to execute
   const pythonCode = `
-from rdflib import Graph, Literal, URIRef, Namespace
-from shui_widget_scoring import score_widgets
+from rdflib import Graph, Literal, URIRef
+from shui_widget_scoring import score_widgets, UnsupportedFeatureError
 
 # Create graphs
 widget_scoring_graph = Graph()
@@ -104,67 +116,59 @@ kwargs['constraint_shape'] = URIRef("""${request.constraintShape}""")
     : ""
 }
 
-# Call score_widgets
-result = score_widgets(**kwargs)
-
-# Format results for JavaScript
-# Build detailed widget scores with Score instance information
-widget_scores_detailed = []
-SHUI = Namespace("http://www.w3.org/ns/shacl-ui#")
-
-for ws in result.widget_scores:
-    widget_uri = str(ws.widget)
-    score_value = int(ws.score)
-
-    # Find the corresponding Score instance in the widget_scoring_graph
-    score_instance_uri = None
-    data_graph_shape = None
-    shapes_graph_shape = None
-
-    # Query for Score instances with matching widget and score
-    for score_inst in widget_scoring_graph.subjects(SHUI.widget, URIRef(widget_uri)):
-        score_obj = widget_scoring_graph.value(score_inst, SHUI.score)
-        if score_obj and int(score_obj) == score_value:
-            score_instance_uri = str(score_inst)
-            # Get optional shapes
-            dg_shape = widget_scoring_graph.value(score_inst, SHUI.dataGraphShape)
-            if dg_shape:
-                data_graph_shape = str(dg_shape)
-            sg_shape = widget_scoring_graph.value(score_inst, SHUI.shapesGraphShape)
-            if sg_shape:
-                shapes_graph_shape = str(sg_shape)
-            break
-
-    score_entry = {
-        'widget': widget_uri,
-        'score': score_value,
-        'scoreUri': score_instance_uri,
+# Call score_widgets; the native backend raises early for unsupported features
+needs_pyshacl = None
+try:
+    result = score_widgets(**kwargs, backend="${backend}")
+except UnsupportedFeatureError as e:
+    if "${backend}" != "native":
+        raise
+    needs_pyshacl = str(e)
+
+def format_result(result):
+    # Format results for JavaScript, with the Score instance behind each entry
+    widget_scores_detailed = []
+
+    for ws in result.widget_scores:
+        source = ws.source
+        score_entry = {
+            'widget': str(ws.widget),
+            'score': int(ws.score),
+            'scoreUri': str(source.uri) if source else None,
+        }
+        if source and source.data_graph_shapes:
+            score_entry['dataGraphShape'] = str(source.data_graph_shapes[0])
+        if source and source.shapes_graph_shapes:
+            score_entry['shapesGraphShape'] = str(source.shapes_graph_shapes[0])
+
+        widget_scores_detailed.append(score_entry)
+
+    return {
+        'widgetScores': widget_scores_detailed,
+        'defaultWidget': str(result.default_widget) if result.default_widget else None,
+        'defaultScore': int(result.default_score) if result.default_score else None,
+        'executionSteps': [],
+        'focusNode': """${focusNodeToN3String(request.focusNode)}""",
+        'constraintShape': """${request.constraintShape || ""}""" or None,
     }
-    if data_graph_shape:
-        score_entry['dataGraphShape'] = data_graph_shape
-    if shapes_graph_shape:
-        score_entry['shapesGraphShape'] = shapes_graph_shape
-
-    widget_scores_detailed.append(score_entry)
-
-output = {
-    'widgetScores': widget_scores_detailed,
-    'defaultWidget': str(result.default_widget) if result.default_widget else None,
-    'defaultScore': int(result.default_score) if result.default_score else None,
-    'executionSteps': [],
-    'focusNode': """${focusNodeToN3String(request.focusNode)}""",
-    'constraintShape': """${request.constraintShape || ""}""" or None,
-}
+
+output = {'needsPyshacl': needs_pyshacl} if needs_pyshacl else format_result(result)
 
 output
 `;
 
+  let result;
   try {
-    const result = await pyodide.runPythonAsync(pythonCode);
-    return result.toJs() as ScoringResult;
+    result = await pyodide.runPythonAsync(pythonCode);
   } catch (error) {
     throw new Error(`Python execution error: ${error}`);
   }
+
+  if (result.get("needsPyshacl")) {
+    await ensurePyshacl();
+    return scoreWidgets(request);
+  }
+  return result.toJs() as ScoringResult;
 }
 
 // Message handler
@@ -6,24 +6,42 @@ in the SHACL UI specification.
 
 __version__ = "0.1.0"
 
-from .models import WidgetScore, ScoringResult
+from .models import (
+    PropertyScores,
+    ScoreSource,
+    WidgetScore,
+    ScoringResult,
+    score_to_json,
+)
 from .exceptions import (
     ShuiWidgetScoringError,
     MalformedScoreError,
     InvalidFocusNodeError,
     MissingGraphError,
+    StaleArtifactError,
+    UnsupportedFeatureError,
 )
 from .namespaces import SHUI, SH
-from .core import score_widgets
+from .core import iter_widget_scores, score_form, score_widgets
+from .engine import ScoringEngine, ShapesGraphVerdicts
 
 __all__ = [
     "score_widgets",
+    "iter_widget_scores",
+    "score_form",
+    "ScoringEngine",
+    "ShapesGraphVerdicts",
     "WidgetScore",
+    "ScoreSource",
+    "PropertyScores",
     "ScoringResult",
+    "score_to_json",
     "ShuiWidgetScoringError",
     "MalformedScoreError",
     "InvalidFocusNodeError",
     "MissingGraphError",
+    "StaleArtifactError",
+    "UnsupportedFeatureError",
     "SHUI",
     "SH",
 ]
@@ -0,0 +1,6 @@
+"""Command line entry point: python -m shui_widget_scoring, see bulk.main."""
+
+from .bulk import main
+
+if __name__ == "__main__":
+    main()
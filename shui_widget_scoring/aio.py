@@ -0,0 +1,184 @@
+"""An asyncio front-end to the scoring engine.
+
+AsyncScorer evaluates Scores on the event loop, one at a time, and only
+leaves the loop for validation runs: pyshacl validations are offloaded to an
+executor, while dispatch-table answers, cached verdicts and native-backend
+predicates complete inline. Concurrent calls for the same focus node share
+one in-flight evaluation, which is cancelled when every caller has gone.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Dict, Hashable, List, Optional, Union
+
+from rdflib import Graph, URIRef, BNode, Literal
+
+from .engine import ScoringEngine, ShapesGraphVerdicts, check_inputs
+from .lite import NATIVE
+from .models import ScoringResult, WidgetScore
+from .views import as_graph
+
+Node = Union[URIRef, BNode, Literal]
+Shape = Union[URIRef, BNode]
+
+
+class AsyncScorer:
+    """
+    Score widgets from asyncio code without blocking the event loop.
+
+    Args:
+        engine: The compiled scoring engine
+        executor: Executor for pyshacl validation runs; None uses the event
+            loop's default executor
+    """
+
+    def __init__(self, engine: ScoringEngine, executor: Optional[Executor] = None):
+        self.engine = engine
+        self.executor = executor
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+    async def score(
+        self,
+        focus_node: Node,
+        data_graph: Optional[Graph] = None,
+        constraint_shape: Optional[Shape] = None,
+        shapes_graph: Optional[Graph] = None,
+        shapes_verdicts: Optional[ShapesGraphVerdicts] = None,
+    ) -> ScoringResult:
+        """
+        Score widgets for a focus node, like ScoringEngine.score.
+
+        Cancelling the call detaches the caller; the shared evaluation is
+        cancelled once no caller is waiting for it, before its next Score.
+
+        Raises:
+            InvalidFocusNodeError: If focus_node is invalid or not provided
+            MissingGraphError: If required graphs are missing
+        """
+        check_inputs(focus_node, data_graph, constraint_shape, shapes_graph)
+        assert data_graph is not None  # Input validation ensures this
+
+        dispatched = self.engine.dispatch_result(
+            focus_node, as_graph(data_graph), constraint_shape
+        )
+        if dispatched is not None:
+            return dispatched
+
+        # The graphs are referenced by the task while it is in flight, so
+        # their ids cannot be reused by other graphs in the meantime
+        key = (
+            focus_node,
+            constraint_shape,
+            id(data_graph),
+            id(shapes_graph),
+            id(shapes_verdicts),
+        )
+        task = self._in_flight.get(key)
+        if task is None:
+            data_graph, shapes_graph = as_graph(data_graph), as_graph(shapes_graph)
+            task = asyncio.ensure_future(
+                self._evaluate(
+                    focus_node,
+                    data_graph,
+                    constraint_shape,
+                    shapes_graph,
+                    shapes_verdicts,
+                )
+            )
+            self._in_flight[key] = task
+            self._waiters[task] = 0
+            task.add_done_callback(lambda _: self._forget(key, task))
+
+        self._waiters[task] += 1
+        try:
+            widget_scores = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # The last caller to leave cancels the shared evaluation
+            if not task.done() and self._waiters[task] == 1:
+                task.cancel()
+            raise
+        finally:
+            if task in self._waiters:
+                self._waiters[task] -= 1
+        return ScoringResult(widget_scores=list(widget_scores))
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Drop a finished evaluation from the in-flight table."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        self._waiters.pop(task, None)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of evaluations currently in flight."""
+        return len(self._in_flight)
+
+    async def _evaluate(
+        self,
+        focus_node: Node,
+        data_graph: Graph,
+        constraint_shape: Optional[Shape],
+        shapes_graph: Optional[Graph],
+        shapes_verdicts: Optional[ShapesGraphVerdicts],
+    ) -> List[WidgetScore]:
+        """Evaluate every Score in order, yielding to the loop between Scores."""
+        engine = self.engine
+        data_verdicts: Dict[Shape, bool] = {}
+        shape_verdicts = engine.initial_shape_verdicts(
+            constraint_shape, shapes_verdicts
+        )
+
+        widget_scores = []
+        for score_inst in engine.score_instances:
+            await asyncio.sleep(0)
+
+            # Per spec section 6.2: If constraint_shape is not provided but
+            # Score has shapesGraphShape conditions, the score is not applicable
+            if constraint_shape is None and score_inst["shapesGraphShapes"]:
+                continue
+
+            applicable = True
+            for shape in score_inst["dataGraphShapes"]:
+                verdict = engine.data_verdict(
+                    focus_node, data_graph, shape, data_verdicts, validate=False
+                )
+                if verdict is None:
+                    verdict = await self._run(
+                        engine.data_verdict,
+                        focus_node,
+                        data_graph,
+                        shape,
+                        data_verdicts,
+                    )
+                if not verdict:
+                    applicable = False
+                    break
+
+            if applicable and constraint_shape is not None:
+                for shape in score_inst["shapesGraphShapes"]:
+                    verdict = shape_verdicts.get(shape)
+                    if verdict is None:
+                        verdict = await self._run(
+                            engine.shapes_graph_verdict,
+                            constraint_shape,
+                            shapes_graph,
+                            shape,
+                            shape_verdicts,
+                        )
+                    if not verdict:
+                        applicable = False
+                        break
+
+            if applicable:
+                widget_scores.append(score_inst["widget_score"])
+
+        # score_instances is presorted, so widget_scores is already in result order
+        return widget_scores
+
+    async def _run(self, function, *args) -> bool:
+        """Compute a verdict inline on the native backend, else on the executor."""
+        if self.engine.backend == NATIVE:
+            return function(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
@@ -0,0 +1,328 @@
+"""Static analysis of SHACL shapes used by Score instances."""
+
+from typing import FrozenSet, Iterator, Optional, Set, Union
+
+from rdflib import Graph, URIRef, BNode
+from rdflib.collection import Collection
+from rdflib.namespace import RDF, RDFS
+
+from .namespaces import SH
+from .validation import has_declared_targets
+
+
+# Constraint parameters whose verdict only depends on the value node itself
+VALUE_PARAMETERS = frozenset(
+    {
+        SH.datatype,
+        SH.nodeKind,
+        SH["in"],
+        SH.hasValue,
+        SH.pattern,
+        SH.flags,
+        SH.minInclusive,
+        SH.maxInclusive,
+        SH.minExclusive,
+        SH.maxExclusive,
+        SH.minLength,
+        SH.maxLength,
+        SH.languageIn,
+    }
+)
+
+# Parameters whose objects are lists of shapes
+LOGICAL_LIST_PARAMETERS = frozenset({SH["and"], SH["or"], SH.xone})
+
+# Parameters whose object is a single shape
+LOGICAL_SHAPE_PARAMETERS = frozenset({SH["not"], SH.node})
+
+# Predicates that do not affect validation results
+NON_VALIDATING_PREDICATES = frozenset(
+    {
+        RDF.type,
+        RDFS.label,
+        RDFS.comment,
+        SH.message,
+        SH.name,
+        SH.description,
+        SH.severity,
+        SH.order,
+        SH.group,
+        SH.defaultValue,
+        SH.deactivated,
+    }
+)
+
+
+def nested_shapes(
+    shape: Union[URIRef, BNode], shapes_graph: Graph
+) -> Iterator[Union[URIRef, BNode]]:
+    """
+    Yield the shapes referenced by a shape's logical parameters.
+
+    Args:
+        shape: The shape to inspect
+        shapes_graph: The graph containing the shape definition
+
+    Yields:
+        Shapes referenced through sh:and, sh:or, sh:xone, sh:not and sh:node
+    """
+    for predicate in LOGICAL_LIST_PARAMETERS:
+        for list_node in shapes_graph.objects(shape, predicate):
+            yield from Collection(shapes_graph, list_node)
+    for predicate in LOGICAL_SHAPE_PARAMETERS:
+        yield from shapes_graph.objects(shape, predicate)
+
+
+def shape_closure(
+    shape: Union[URIRef, BNode], shapes_graph: Graph
+) -> Set[Union[URIRef, BNode]]:
+    """
+    Collect a shape and every shape it references through logical parameters.
+
+    Args:
+        shape: The root shape
+        shapes_graph: The graph containing the shape definitions
+
+    Returns:
+        The set of shapes reachable from shape, including shape itself
+    """
+    closure: Set[Union[URIRef, BNode]] = set()
+    pending = [shape]
+    while pending:
+        current = pending.pop()
+        if current in closure:
+            continue
+        closure.add(current)
+        pending.extend(nested_shapes(current, shapes_graph))
+    return closure
+
+
+def is_value_only_shape(
+    shape: Union[URIRef, BNode],
+    shapes_graph: Graph,
+    declared_targets: Optional[bool] = None,
+) -> bool:
+    """
+    Check whether a shape's verdict depends only on the value of the focus node.
+
+    A shape is value-only when every shape in its closure uses only value
+    constraint parameters (sh:datatype, sh:nodeKind, sh:in, sh:pattern, ranges,
+    lengths, ...) and logical combinations of such shapes. Shapes with property
+    shapes, sh:class, SPARQL constraints or any unknown parameter read the data
+    graph and are graph-dependent. When the shapes graph declares targets, every
+    validation session also depends on those targets, so no shape is value-only.
+
+    Args:
+        shape: The shape to classify
+        shapes_graph: The graph containing the shape definitions
+        declared_targets: Precomputed has_declared_targets(shapes_graph), if known
+
+    Returns:
+        True if the shape is value-only, False if it is graph-dependent
+    """
+    if declared_targets is None:
+        declared_targets = has_declared_targets(shapes_graph)
+    if declared_targets:
+        return False
+
+    # An undefined shape never validates, which is not a property of the value
+    if (shape, None, None) not in shapes_graph:
+        return False
+
+    for current in shape_closure(shape, shapes_graph):
+        for predicate in shapes_graph.predicates(current, None):
+            if (
+                predicate not in VALUE_PARAMETERS
+                and predicate not in LOGICAL_LIST_PARAMETERS
+                and predicate not in LOGICAL_SHAPE_PARAMETERS
+                and predicate not in NON_VALIDATING_PREDICATES
+            ):
+                return False
+    return True
+
+
+# Constraint parameters whose verdict for a literal only depends on its bucket
+DATATYPE_PARAMETERS = frozenset({SH.datatype, SH.nodeKind})
+
+
+def is_datatype_determined(
+    shape: Union[URIRef, BNode],
+    shapes_graph: Graph,
+    declared_targets: Optional[bool] = None,
+) -> bool:
+    """
+    Check whether a shape's verdict for a literal depends only on its datatype.
+
+    A datatype-determined shape is value-only and every shape in its closure
+    uses at most one sh:datatype, at most one sh:nodeKind and logical
+    combinations of such shapes. The verdict for a literal then only depends on
+    its datatype, language tag presence and lexical validity, and can be
+    evaluated natively with native.evaluate_literal_bucket.
+
+    Args:
+        shape: The shape to classify
+        shapes_graph: The graph containing the shape definitions
+        declared_targets: Precomputed has_declared_targets(shapes_graph), if known
+
+    Returns:
+        True if the shape is datatype-determined
+    """
+    if not is_value_only_shape(shape, shapes_graph, declared_targets):
+        return False
+
+    for current in shape_closure(shape, shapes_graph):
+        if (current, None, None) not in shapes_graph:
+            return False
+        for predicate in shapes_graph.predicates(current, None):
+            if predicate in VALUE_PARAMETERS and predicate not in DATATYPE_PARAMETERS:
+                return False
+            if predicate == SH.deactivated:
+                return False
+        for parameter in DATATYPE_PARAMETERS:
+            if len(list(shapes_graph.objects(current, parameter))) > 1:
+                return False
+    return True
+
+
+def mentioned_datatypes(
+    shape: Union[URIRef, BNode], shapes_graph: Graph
+) -> Set[URIRef]:
+    """Return the sh:datatype values used anywhere in a shape's closure."""
+    return {
+        datatype
+        for current in shape_closure(shape, shapes_graph)
+        for datatype in shapes_graph.objects(current, SH.datatype)
+    }
+
+
+# Predicates traversed when checking sh:class
+CLASS_PREDICATES = frozenset({RDF.type, RDFS.subClassOf})
+
+# Parameters whose object is a nested shape evaluated on value nodes
+NESTED_SHAPE_PARAMETERS = frozenset({SH.property, SH.qualifiedValueShape})
+
+# Property pair parameters, whose object is a predicate of the data graph
+PROPERTY_PAIR_PARAMETERS = frozenset(
+    {SH.equals, SH.disjoint, SH.lessThan, SH.lessThanOrEquals}
+)
+
+# Parameters that only count or compare the value nodes of a path
+CARDINALITY_PARAMETERS = frozenset(
+    {
+        SH.minCount,
+        SH.maxCount,
+        SH.uniqueLang,
+        SH.qualifiedMinCount,
+        SH.qualifiedMaxCount,
+        SH.qualifiedValueShapesDisjoint,
+    }
+)
+
+# Path constructs with a single nested path
+UNARY_PATH_PARAMETERS = (
+    SH.inversePath,
+    SH.zeroOrMorePath,
+    SH.oneOrMorePath,
+    SH.zeroOrOnePath,
+)
+
+
+def path_predicates(
+    path: Union[URIRef, BNode], shapes_graph: Graph
+) -> Optional[Set[URIRef]]:
+    """
+    Collect the predicates a SHACL property path can traverse.
+
+    Args:
+        path: The value of sh:path
+        shapes_graph: The graph containing the path definition
+
+    Returns:
+        The set of predicates, or None if the path is not understood
+    """
+    if isinstance(path, URIRef):
+        return {path}
+    if not isinstance(path, BNode):
+        return None
+
+    if (path, RDF.first, None) in shapes_graph:
+        members = list(Collection(shapes_graph, path))
+    else:
+        members = list(shapes_graph.objects(path, SH.alternativePath))
+        if members:
+            members = [m for node in members for m in Collection(shapes_graph, node)]
+        else:
+            for parameter in UNARY_PATH_PARAMETERS:
+                members.extend(shapes_graph.objects(path, parameter))
+    if not members:
+        return None
+
+    predicates: Set[URIRef] = set()
+    for member in members:
+        member_predicates = path_predicates(member, shapes_graph)
+        if member_predicates is None:
+            return None
+        predicates |= member_predicates
+    return predicates
+
+
+def shape_read_predicates(
+    shape: Union[URIRef, BNode],
+    shapes_graph: Graph,
+    declared_targets: Optional[bool] = None,
+) -> Optional[FrozenSet[URIRef]]:
+    """
+    Collect the data graph predicates a shape's verdict can depend on.
+
+    Besides triples that mention the focus node itself, which decide whether
+    it exists in the data graph, a verdict can only change when a triple with
+    one of these predicates is added or removed. Value-only shapes read no
+    predicates at all.
+
+    Args:
+        shape: The shape to analyse
+        shapes_graph: The graph containing the shape definitions
+        declared_targets: Precomputed has_declared_targets(shapes_graph), if known
+
+    Returns:
+        The predicates read, or None if any triple may affect the verdict
+        (declared targets, SPARQL constraints, sh:closed or unknown parameters)
+    """
+    if declared_targets is None:
+        declared_targets = has_declared_targets(shapes_graph)
+    if declared_targets:
+        return None
+
+    predicates: Set[URIRef] = set()
+    seen: Set[Union[URIRef, BNode]] = set()
+    pending = [shape]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        for predicate, value in shapes_graph.predicate_objects(current):
+            if (
+                predicate in VALUE_PARAMETERS
+                or predicate in NON_VALIDATING_PREDICATES
+                or predicate in CARDINALITY_PARAMETERS
+            ):
+                continue
+            if predicate in LOGICAL_LIST_PARAMETERS:
+                pending.extend(Collection(shapes_graph, value))
+            elif predicate in LOGICAL_SHAPE_PARAMETERS or (
+                predicate in NESTED_SHAPE_PARAMETERS
+            ):
+                pending.append(value)
+            elif predicate == SH.path:
+                read = path_predicates(value, shapes_graph)
+                if read is None:
+                    return None
+                predicates |= read
+            elif predicate == SH["class"]:
+                predicates |= CLASS_PREDICATES
+            elif predicate in PROPERTY_PAIR_PARAMETERS and isinstance(value, URIRef):
+                predicates.add(value)
+            else:
+                return None
+    return frozenset(predicates)
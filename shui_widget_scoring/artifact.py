@@ -0,0 +1,244 @@
+"""Compiled engine artefacts.
+
+An artefact stores a compiled ScoringEngine, so worker processes can load it
+without parsing Turtle, meta-validating Score instances or running pyshacl.
+Each artefact carries a version stamp and the fingerprints of the sources it
+was compiled from, and is rejected when either no longer matches.
+
+Artefacts contain pickled data: only load artefacts from trusted locations.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Union
+
+import rdflib
+from rdflib import Graph
+from rdflib.compare import to_isomorphic
+
+from . import __version__
+from .engine import ScoringEngine
+from .exceptions import StaleArtifactError
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+# Incremented whenever the layout of the compiled engine state changes
+ARTIFACT_FORMAT_VERSION = 5
+
+MAGIC = b"SHUIENG\x00"
+
+_HEADER_LENGTH = struct.Struct(">I")
+
+
+def version_stamp() -> Dict[str, Union[int, str]]:
+    """Return the versions an artefact must have been written with to be loaded."""
+    return {
+        "format": ARTIFACT_FORMAT_VERSION,
+        "shui_widget_scoring": __version__,
+        "rdflib": rdflib.__version__,
+    }
+
+
+def file_fingerprint(path: PathLike) -> str:
+    """Return the SHA-256 digest of a source file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def graph_fingerprint(graph: Graph) -> str:
+    """
+    Return a fingerprint of a graph's content.
+
+    Isomorphic graphs, including graphs that only differ in blank node labels,
+    have the same fingerprint.
+    """
+    return str(to_isomorphic(graph).graph_digest())
+
+
+def save_engine(
+    engine: ScoringEngine,
+    path: PathLike,
+    sources: Optional[Mapping[str, str]] = None,
+) -> None:
+    """
+    Write a compiled engine to an artefact file.
+
+    The file is written to a temporary name and renamed into place, so
+    concurrent readers never see a partial artefact.
+
+    Args:
+        engine: The compiled engine
+        path: The artefact path
+        sources: Fingerprints of the sources the engine was compiled from, by
+            name (see file_fingerprint and graph_fingerprint)
+    """
+    header = json.dumps(
+        {"version": version_stamp(), "sources": dict(sources or {})},
+        sort_keys=True,
+    ).encode("utf-8")
+    payload = zlib.compress(pickle.dumps(engine, protocol=pickle.HIGHEST_PROTOCOL))
+
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(_HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_engine(
+    path: PathLike,
+    sources: Optional[Mapping[str, str]] = None,
+    logger: Optional[logging.Logger] = None,
+) -> ScoringEngine:
+    """
+    Load a compiled engine from an artefact file.
+
+    Args:
+        path: The artefact path
+        sources: Expected source fingerprints, by name; the artefact is
+            rejected unless it records exactly these fingerprints. When None,
+            the sources are not checked.
+        logger: Optional logger for the loaded engine
+
+    Returns:
+        The compiled engine
+
+    Raises:
+        StaleArtifactError: If the file is not an artefact, was written by a
+            different version, or was compiled from different sources
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if not data.startswith(MAGIC):
+        raise StaleArtifactError(f"{path} is not a compiled engine artefact")
+    offset = len(MAGIC)
+    try:
+        (header_length,) = _HEADER_LENGTH.unpack_from(data, offset)
+        offset += _HEADER_LENGTH.size
+        header = json.loads(data[offset : offset + header_length])
+    except (struct.error, ValueError) as e:
+        raise StaleArtifactError(f"{path} has a corrupt header: {e}") from e
+    offset += header_length
+
+    if header.get("version") != version_stamp():
+        raise StaleArtifactError(
+            f"{path} was written by {header.get('version')}, expected {version_stamp()}"
+        )
+    if sources is not None and header.get("sources") != dict(sources):
+        raise StaleArtifactError(f"{path} was compiled from different sources")
+
+    try:
+        engine = pickle.loads(zlib.decompress(data[offset:]))
+    except (zlib.error, pickle.UnpicklingError, EOFError) as e:
+        raise StaleArtifactError(f"{path} has a corrupt payload: {e}") from e
+    engine.logger = logger
+    return engine
+
+
+def load_or_compile(
+    artifact_path: PathLike,
+    widget_scoring_path: PathLike,
+    data_graph_shapes_path: Optional[PathLike] = None,
+    shapes_graph_shapes_path: Optional[PathLike] = None,
+    format: Optional[str] = None,
+    logger: Optional[logging.Logger] = None,
+) -> ScoringEngine:
+    """
+    Load an engine from its artefact, recompiling it when the sources changed.
+
+    The source files are fingerprinted by their bytes, so a matching artefact
+    is loaded without parsing them. Otherwise the sources are parsed and
+    compiled, and the artefact is rewritten for the next process.
+
+    Args:
+        artifact_path: The artefact path
+        widget_scoring_path: File containing shui:Score instances
+        data_graph_shapes_path: File containing dataGraphShape definitions;
+            defaults to the widget scoring file
+        shapes_graph_shapes_path: File containing shapesGraphShape definitions;
+            defaults to the widget scoring file
+        format: RDF format of the source files; guessed from the file
+            extension when None
+        logger: Optional logger for the engine
+
+    Returns:
+        The compiled engine
+
+    Raises:
+        MalformedScoreError: If the sources have to be compiled and a Score
+            instance is malformed
+    """
+    paths = {
+        "widget_scoring_graph": widget_scoring_path,
+        "data_graph_shapes_graph": data_graph_shapes_path or widget_scoring_path,
+        "shapes_graph_shapes_graph": shapes_graph_shapes_path or widget_scoring_path,
+    }
+    sources = {name: file_fingerprint(p) for name, p in paths.items()}
+
+    if os.path.exists(artifact_path):
+        try:
+            return load_engine(artifact_path, sources=sources, logger=logger)
+        except StaleArtifactError as e:
+            if logger:
+                logger.info(f"Recompiling scoring engine: {e}")
+
+    # Parse each distinct file once, so shared graphs stay shared
+    graphs: Dict[str, Graph] = {}
+    for p in paths.values():
+        key = os.fspath(p)
+        if key not in graphs:
+            graphs[key] = Graph().parse(p, format=format)
+    engine = ScoringEngine(
+        *(graphs[os.fspath(p)] for p in paths.values()),
+        logger=logger,
+    )
+    save_engine(engine, artifact_path, sources=sources)
+    return engine
+
+
+def load_engine_source(
+    path: PathLike, logger: Optional[logging.Logger] = None
+) -> ScoringEngine:
+    """
+    Load an engine from an artefact, or compile it from an RDF file.
+
+    Files starting with the artefact magic bytes are loaded as artefacts. Any
+    other file is parsed as a widget scoring graph that also contains the
+    dataGraphShape and shapesGraphShape definitions.
+
+    Args:
+        path: An artefact or RDF file; the RDF format is guessed from the file
+            extension
+        logger: Optional logger for the engine
+
+    Returns:
+        The compiled engine
+
+    Raises:
+        StaleArtifactError: If the file is an artefact that cannot be loaded
+        MalformedScoreError: If a Score instance in an RDF file is malformed
+    """
+    with open(path, "rb") as f:
+        is_artifact = f.read(len(MAGIC)) == MAGIC
+    if is_artifact:
+        return load_engine(path, logger=logger)
+    graph = Graph().parse(path)
+    return ScoringEngine(graph, graph, graph, logger=logger)
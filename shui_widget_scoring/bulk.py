@@ -0,0 +1,499 @@
+"""Whole-graph widget assignment jobs.
+
+An AssignmentJob finds the default widget of every distinct object node of a
+data graph, or of the objects of selected subjects and predicates, and streams
+one row per node to a JSON Lines or CSV file. Object nodes are read from the
+store as they are scored, in chunks with ScoringEngine.score_batch, and nodes
+of one equivalence class are scored once: when the engine has a datatype
+dispatch table, every literal in a LiteralBucket gets the same widgets, so only
+the first literal of each bucket is evaluated. Rows are written as each chunk
+completes, and neither the node list nor the output is held in memory. After
+each chunk the job records its position in the store in a checkpoint file. An
+interrupted job run again with the same checkpoint truncates the output to the
+last completed chunk and continues from there.
+
+Run with:
+    python -m shui_widget_scoring data.ttl --engine scores.ttl --output widgets.jsonl
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from rdflib import Graph, URIRef, BNode, Literal
+
+from .artifact import PathLike, load_engine_source
+from .engine import ScoringEngine
+from .models import ScoringResult, score_to_json
+from .native import literal_bucket
+from .parallel import chunked
+
+Node = Union[URIRef, BNode, Literal]
+
+# A subject and predicate whose objects are read with one store lookup
+Pattern = Tuple[Optional[Node], Optional[URIRef]]
+
+# Index of a pattern and the number of its triples read
+Cursor = Tuple[int, int]
+
+FORMATS = ("jsonl", "csv")
+
+CSV_HEADER = ("node", "widget", "score")
+
+
+def object_patterns(
+    data_graph: Graph,
+    subjects: Optional[Iterable[Node]] = None,
+    predicates: Optional[Iterable[URIRef]] = None,
+) -> List[Pattern]:
+    """
+    Return the store lookups that read the selected objects of a data graph.
+
+    Without a selection, the objects are read one predicate at a time, with
+    the predicates sorted by N-Triples syntax. A full scan of rdflib's memory
+    store iterates a set, whose order changes between processes, while the
+    triples of one predicate or subject come in insertion order, so the
+    lookups read a parsed file in the same order every time.
+
+    Args:
+        data_graph: The data graph
+        subjects: Only take objects of these subjects; all subjects when None
+        predicates: Only take objects of these predicates; all predicates
+            when None
+    """
+    subject_list: List[Optional[Node]] = (
+        [None] if subjects is None else list(dict.fromkeys(subjects))
+    )
+    if predicates is not None:
+        predicate_list: List[Optional[URIRef]] = list(dict.fromkeys(predicates))
+    elif subjects is None:
+        predicate_list = sorted(
+            set(data_graph.predicates()), key=lambda predicate: predicate.n3()
+        )
+    else:
+        predicate_list = [None]
+    return [
+        (subject, predicate) for subject in subject_list for predicate in predicate_list
+    ]
+
+
+def iter_object_nodes(
+    data_graph: Graph,
+    patterns: Sequence[Pattern],
+    cursor: Cursor = (0, 0),
+) -> Iterator[Tuple[Cursor, Node]]:
+    """
+    Read the distinct objects of a data graph from the store.
+
+    A node is yielded for the first pattern it is an object of, at its first
+    triple in that pattern. Objects already yielded for an earlier pattern
+    are found with a store lookup per earlier pattern, and repeats within a
+    predicate pattern are skipped as they follow each other: rdflib's memory
+    stores return the triples of a predicate grouped by object. Only the
+    objects of one subject pattern are remembered, so memory does not grow
+    with the number of nodes.
+
+    Args:
+        data_graph: The data graph
+        patterns: Lookups from object_patterns
+        cursor: Position after the last node already read; earlier nodes
+            are skipped
+
+    Returns:
+        An iterator of (cursor, node) pairs, cursor being the position to
+        resume from after node
+    """
+    start_pattern, start_read = cursor
+    for index in range(start_pattern, len(patterns)):
+        subject, predicate = patterns[index]
+        earlier = patterns[:index]
+        seen = set()
+        previous = None
+        for read, node in enumerate(data_graph.objects(subject, predicate), 1):
+            if node == previous or node in seen:
+                continue
+            if subject is None:
+                previous = node
+            else:
+                seen.add(node)
+            if index == start_pattern and read <= start_read:
+                continue
+            if any((s, p, node) in data_graph for s, p in earlier):
+                continue
+            yield (index, read), node
+
+
+def object_nodes(
+    data_graph: Graph,
+    subjects: Optional[Iterable[Node]] = None,
+    predicates: Optional[Iterable[URIRef]] = None,
+) -> Iterator[Node]:
+    """
+    Return an iterator over the distinct object nodes of a data graph.
+
+    Nodes are read from the store as the iterator is consumed, in the order
+    of iter_object_nodes.
+
+    Args:
+        data_graph: The data graph
+        subjects: Only take objects of these subjects; all subjects when None
+        predicates: Only take objects of these predicates; all predicates
+            when None
+    """
+    patterns = object_patterns(data_graph, subjects, predicates)
+    return (node for _, node in iter_object_nodes(data_graph, patterns))
+
+
+def equivalence_key(engine: ScoringEngine, node: Node) -> Optional[Hashable]:
+    """
+    Return a key shared by nodes that always get the same widgets, or None.
+
+    Literals that are in the data graph get the same widgets when they are in
+    the same bucket of the engine's datatype dispatch table. Other nodes are
+    scored on their own.
+    """
+    if isinstance(node, Literal) and engine.datatype_dispatch is not None:
+        return literal_bucket(node, engine.dispatch_datatypes)
+    return None
+
+
+def _score_chunk(
+    engine: ScoringEngine,
+    data_graph: Graph,
+    nodes: Sequence[Node],
+    classes: Dict[Hashable, ScoringResult],
+) -> List[ScoringResult]:
+    """
+    Score a chunk of nodes, one node per equivalence class.
+
+    Args:
+        engine: The compiled scoring engine
+        data_graph: The data graph containing the nodes
+        nodes: The nodes to score
+        classes: Results of the equivalence classes scored so far, by key;
+            classes first seen in this chunk are added
+
+    Returns:
+        One result per node, in the order of nodes
+    """
+    keys = [equivalence_key(engine, node) for node in nodes]
+    representatives: Dict[Hashable, Node] = {}
+    pending = []
+    for node, key in zip(nodes, keys):
+        if key is None:
+            pending.append(node)
+        elif key not in classes and key not in representatives:
+            representatives[key] = node
+            pending.append(node)
+
+    results = {}
+    if pending:
+        results = dict(zip(pending, engine.score_batch(pending, data_graph=data_graph)))
+    for key, node in representatives.items():
+        classes[key] = results[node]
+    return [
+        results[node] if key is None else classes[key] for node, key in zip(nodes, keys)
+    ]
+
+
+def iter_assignments(
+    engine: ScoringEngine,
+    data_graph: Graph,
+    nodes: Iterable[Node],
+    chunk_size: int = 1000,
+) -> Iterator[Tuple[Node, ScoringResult]]:
+    """
+    Score object nodes of a data graph in chunks, one node per equivalence class.
+
+    Every node must be in data_graph, as the nodes returned by object_nodes
+    are. Nodes are read lazily, one chunk at a time.
+
+    Args:
+        engine: The compiled scoring engine
+        data_graph: The data graph containing the nodes
+        nodes: The nodes to score
+        chunk_size: Number of nodes per score_batch call
+
+    Returns:
+        An iterator of (node, result) pairs, in the order of nodes
+    """
+    classes: Dict[Hashable, ScoringResult] = {}
+    for chunk in chunked(nodes, chunk_size):
+        yield from zip(chunk, _score_chunk(engine, data_graph, chunk, classes))
+
+
+def format_rows(
+    assignments: Iterable[Tuple[Node, ScoringResult]], format: str
+) -> bytes:
+    """
+    Format the default widget of each node as JSON Lines or CSV rows.
+
+    Nodes and widgets are written in N-Triples syntax, and scores as the JSON
+    numbers of score_to_json. Nodes without an applicable widget get null
+    (JSON Lines) or empty (CSV) widget and score.
+    """
+    if format == "jsonl":
+        lines = []
+        for node, result in assignments:
+            widget = result.default_widget
+            score = result.default_score
+            lines.append(
+                json.dumps(
+                    {
+                        "node": node.n3(),
+                        "widget": widget.n3() if widget is not None else None,
+                        "score": score_to_json(score) if score is not None else None,
+                    }
+                )
+                + "\n"
+            )
+        return "".join(lines).encode("utf-8")
+
+    text = io.StringIO()
+    writer = csv.writer(text, lineterminator="\n")
+    for node, result in assignments:
+        widget = result.default_widget
+        score = result.default_score
+        writer.writerow(
+            (
+                node.n3(),
+                widget.n3() if widget is not None else "",
+                score_to_json(score) if score is not None else "",
+            )
+        )
+    return text.getvalue().encode("utf-8")
+
+
+def _selection_digest(data_graph: Graph, patterns: Sequence[Pattern]) -> str:
+    """Return a digest identifying the nodes a job reads, for checkpoint validation."""
+    digest = hashlib.sha256(str(len(data_graph)).encode("utf-8"))
+    for pattern in patterns:
+        for term in pattern:
+            digest.update(b"\n" + (term.n3() if term is not None else "").encode())
+    return digest.hexdigest()
+
+
+class AssignmentJob:
+    """
+    Write the default widget of every object node of a data graph to a file.
+
+    Object nodes are read from the store one chunk at a time with
+    iter_object_nodes, and the checkpoint records the store position after
+    the last written chunk. A job is resumed against the same data graph,
+    loaded the same way, so that its store returns the triples in the same
+    order.
+
+    Args:
+        engine: The compiled scoring engine
+        data_graph: The data graph
+        output_path: File the rows are written to
+        format: "jsonl" or "csv"; guessed from the output file extension when
+            None, JSON Lines unless it is .csv
+        checkpoint_path: File recording the job's progress; the job cannot be
+            resumed when None
+        subjects: Only assign widgets to objects of these subjects
+        predicates: Only assign widgets to objects of these predicates
+        chunk_size: Number of nodes scored and written at a time
+        logger: Optional logger for progress reports
+
+    Raises:
+        ValueError: If format is not a supported format
+    """
+
+    def __init__(
+        self,
+        engine: ScoringEngine,
+        data_graph: Graph,
+        output_path: PathLike,
+        format: Optional[str] = None,
+        checkpoint_path: Optional[PathLike] = None,
+        subjects: Optional[Iterable[Node]] = None,
+        predicates: Optional[Iterable[URIRef]] = None,
+        chunk_size: int = 1000,
+        logger: Optional[logging.Logger] = None,
+    ):
+        if format is None:
+            format = "csv" if str(output_path).lower().endswith(".csv") else "jsonl"
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}, got {format!r}")
+        self.engine = engine
+        self.data_graph = data_graph
+        self.output_path = output_path
+        self.format = format
+        self.checkpoint_path = checkpoint_path
+        self.subjects = subjects
+        self.predicates = predicates
+        self.chunk_size = chunk_size
+        self.logger = logger
+
+    def run(self) -> int:
+        """
+        Run the job, resuming from the checkpoint file when there is one.
+
+        A checkpoint whose output file is missing or shorter than recorded is
+        discarded, and the job starts over. The checkpoint file is removed
+        when the job completes.
+
+        Returns:
+            The number of rows in the output file
+
+        Raises:
+            ValueError: If the checkpoint was written for other nodes or
+                another format
+        """
+        patterns = object_patterns(self.data_graph, self.subjects, self.predicates)
+        selection = _selection_digest(self.data_graph, patterns)
+        checkpoint = self._read_checkpoint()
+
+        if checkpoint is not None:
+            if (checkpoint["selection"], checkpoint["format"]) != (
+                selection,
+                self.format,
+            ):
+                raise ValueError(
+                    f"checkpoint {self.checkpoint_path} was written for a different job"
+                )
+            if (
+                not os.path.exists(self.output_path)
+                or os.path.getsize(self.output_path) < checkpoint["offset"]
+            ):
+                if self.logger:
+                    self.logger.warning(
+                        f"Output {self.output_path} is missing or truncated, "
+                        f"ignoring checkpoint {self.checkpoint_path}"
+                    )
+                checkpoint = None
+
+        if checkpoint is not None:
+            done = checkpoint["done"]
+            cursor: Cursor = tuple(checkpoint["cursor"])
+            output = open(self.output_path, "r+b")
+            output.truncate(checkpoint["offset"])
+            output.seek(checkpoint["offset"])
+            if self.logger:
+                self.logger.info(f"Resuming after {done} nodes")
+        else:
+            done = 0
+            cursor = (0, 0)
+            output = open(self.output_path, "wb")
+            if self.format == "csv":
+                output.write((",".join(CSV_HEADER) + "\n").encode("utf-8"))
+
+        classes: Dict[Hashable, ScoringResult] = {}
+        with output:
+            positioned = iter_object_nodes(self.data_graph, patterns, cursor)
+            for chunk in chunked(positioned, self.chunk_size):
+                nodes = [node for _, node in chunk]
+                results = _score_chunk(self.engine, self.data_graph, nodes, classes)
+                output.write(format_rows(zip(nodes, results), self.format))
+                done += len(nodes)
+                self._write_checkpoint(output, done, chunk[-1][0], selection)
+                if self.logger:
+                    self.logger.debug(f"Assigned widgets to {done} nodes")
+
+        if self.checkpoint_path is not None and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return done
+
+    def _read_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Return the saved progress of the job, or None."""
+        if self.checkpoint_path is None or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_checkpoint(
+        self, output: BinaryIO, done: int, cursor: Cursor, selection: str
+    ) -> None:
+        """Record that the nodes before cursor, done in all, are in the output."""
+        if self.checkpoint_path is None:
+            return
+        output.flush()
+        os.fsync(output.fileno())
+        checkpoint = {
+            "done": done,
+            "offset": output.tell(),
+            "cursor": list(cursor),
+            "selection": selection,
+            "format": self.format,
+        }
+        # Replace the checkpoint atomically, so an interruption leaves a valid one
+        temporary = f"{self.checkpoint_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(temporary, self.checkpoint_path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Run an assignment job from the command line.
+
+    Args:
+        argv: Command line arguments; sys.argv[1:] when None
+    """
+    parser = argparse.ArgumentParser(
+        description="Assign the default widget to every object node of a data graph."
+    )
+    parser.add_argument("data", help="Data graph file")
+    parser.add_argument(
+        "--engine",
+        required=True,
+        metavar="PATH",
+        help="Engine artefact or widget scoring graph file",
+    )
+    parser.add_argument("--output", required=True, help="JSON Lines or CSV output file")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument(
+        "--checkpoint", help="Progress file; an existing one resumes the job"
+    )
+    parser.add_argument(
+        "--subject",
+        action="append",
+        metavar="IRI",
+        help="Only objects of this subject; repeatable",
+    )
+    parser.add_argument(
+        "--predicate",
+        action="append",
+        metavar="IRI",
+        help="Only objects of this predicate; repeatable",
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+    job = AssignmentJob(
+        load_engine_source(args.engine),
+        Graph().parse(args.data),
+        args.output,
+        format=args.format,
+        checkpoint_path=args.checkpoint,
+        subjects=[URIRef(s) for s in args.subject] if args.subject else None,
+        predicates=[URIRef(p) for p in args.predicate] if args.predicate else None,
+        chunk_size=args.chunk_size,
+        logger=logger,
+    )
+    rows = job.run()
+    logger.info(f"Wrote {rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Request coalescing for concurrent scoring callers.
+
+CoalescingScorer collects scoring requests for a short window, or until a
+batch size is reached, dedupes identical requests and scores each group of
+requests sharing a constraint shape and graphs with one score_batch call.
+Every caller then receives the result for its own focus node.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Union
+
+from rdflib import Graph, URIRef, BNode, Literal
+
+from .engine import ScoringEngine, check_inputs
+from .models import ScoringResult
+
+Node = Union[URIRef, BNode, Literal]
+Shape = Union[URIRef, BNode]
+
+
+@dataclass
+class _Group:
+    """Pending requests sharing a constraint shape, graphs and graph version."""
+
+    data_graph: Graph
+    constraint_shape: Optional[Shape]
+    shapes_graph: Optional[Graph]
+    waiters: Dict[Node, List[Future]]
+
+
+class CoalescingScorer:
+    """
+    Coalesce concurrent scoring requests into batched engine calls.
+
+    Requests are collected until window seconds have passed since the first
+    pending request, or until max_batch_size distinct requests are pending,
+    whichever comes first. Requests are identical when they have the same
+    focus node, constraint shape, graphs and graph version; identical requests
+    are scored once.
+
+    Args:
+        engine: The compiled scoring engine
+        window: Maximum time, in seconds, a request waits for others to join
+            its batch
+        max_batch_size: Number of distinct pending requests that triggers an
+            immediate flush
+    """
+
+    def __init__(
+        self,
+        engine: ScoringEngine,
+        window: float = 0.005,
+        max_batch_size: int = 256,
+    ):
+        if window < 0:
+            raise ValueError("window must not be negative")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.engine = engine
+        self.window = window
+        self.max_batch_size = max_batch_size
+
+        self.requests = 0
+        self.deduplicated = 0
+        self.batches = 0
+
+        self._groups: Dict[Hashable, _Group] = {}
+        self._pending = 0
+        self._deadline: Optional[float] = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="shui-coalescer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        focus_node: Node,
+        data_graph: Optional[Graph] = None,
+        constraint_shape: Optional[Shape] = None,
+        shapes_graph: Optional[Graph] = None,
+        version: Hashable = None,
+    ) -> "Future[ScoringResult]":
+        """
+        Queue a scoring request.
+
+        Args:
+            focus_node: The node in the data graph to score widgets for
+            data_graph: The data graph containing the focus node (required)
+            constraint_shape: The SHACL shape constraining the focus node (optional)
+            shapes_graph: The shapes graph containing constraint_shape (required
+                if constraint_shape provided)
+            version: Version of the graphs' content, such as an ETag or a
+                revision counter. Requests with different versions are never
+                merged, so callers that change a graph in place must pass a
+                new version.
+
+        Returns:
+            A Future of the request's ScoringResult
+
+        Raises:
+            InvalidFocusNodeError: If focus_node is invalid or not provided
+            MissingGraphError: If required graphs are missing
+            RuntimeError: If the scorer is closed
+        """
+        check_inputs(focus_node, data_graph, constraint_shape, shapes_graph)
+        assert data_graph is not None  # Input validation ensures this
+
+        future: "Future[ScoringResult]" = Future()
+        # Pending groups reference their graphs, so graph ids stay unique
+        key = (constraint_shape, id(data_graph), id(shapes_graph), version)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("CoalescingScorer is closed")
+            self.requests += 1
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = _Group(
+                    data_graph, constraint_shape, shapes_graph, {}
+                )
+            waiters = group.waiters.get(focus_node)
+            if waiters is None:
+                group.waiters[focus_node] = [future]
+                self._pending += 1
+            else:
+                waiters.append(future)
+                self.deduplicated += 1
+
+            if self._deadline is None:
+                self._deadline = time.monotonic() + self.window
+            self._condition.notify()
+        return future
+
+    def score(
+        self,
+        focus_node: Node,
+        data_graph: Optional[Graph] = None,
+        constraint_shape: Optional[Shape] = None,
+        shapes_graph: Optional[Graph] = None,
+        version: Hashable = None,
+    ) -> ScoringResult:
+        """Queue a scoring request and wait for its result; see submit."""
+        return self.submit(
+            focus_node, data_graph, constraint_shape, shapes_graph, version
+        ).result()
+
+    def flush(self) -> None:
+        """Score every pending request now."""
+        with self._condition:
+            groups = self._take()
+        self._score_groups(groups)
+
+    def close(self) -> None:
+        """Score the pending requests and stop the background thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def __enter__(self) -> "CoalescingScorer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Return request, deduplication and batch counts."""
+        with self._condition:
+            return {
+                "requests": self.requests,
+                "deduplicated": self.deduplicated,
+                "batches": self.batches,
+                "pending": self._pending,
+            }
+
+    def _take(self) -> List[_Group]:
+        """Remove and return the pending groups; the caller holds the lock."""
+        groups = list(self._groups.values())
+        self._groups = {}
+        self._pending = 0
+        self._deadline = None
+        self.batches += len(groups)
+        return groups
+
+    def _run(self) -> None:
+        """Background thread: flush when the window closes or the batch fills."""
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._pending >= self.max_batch_size:
+                        break
+                    if self._deadline is None:
+                        self._condition.wait()
+                        continue
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                groups = self._take()
+                closed = self._closed
+            self._score_groups(groups)
+            if closed:
+                return
+
+    def _score_groups(self, groups: List[_Group]) -> None:
+        """Score each group with one batch call and resolve its futures."""
+        for group in groups:
+            focus_nodes = list(group.waiters)
+            try:
+                results = self.engine.score_batch(
+                    focus_nodes,
+                    data_graph=group.data_graph,
+                    constraint_shape=group.constraint_shape,
+                    shapes_graph=group.shapes_graph,
+                )
+            except Exception as e:
+                for waiters in group.waiters.values():
+                    for future in waiters:
+                        future.set_exception(e)
+                continue
+            for focus_node, result in zip(focus_nodes, results):
+                for future in group.waiters[focus_node]:
+                    future.set_result(
+                        ScoringResult(widget_scores=list(result.widget_scores))
+                    )
@@ -1,17 +1,12 @@
 """Core widget scoring algorithm implementation."""
 
 import logging
-from typing import Optional, Union
+from typing import Dict, Iterator, Optional, Union
 
 from rdflib import Graph, URIRef, BNode, Literal
 
-from .models import WidgetScore, ScoringResult
-from .validation import (
-    validate_widget_scoring_graph,
-    extract_score_instances,
-    validate_against_shapes,
-)
-from .exceptions import InvalidFocusNodeError, MissingGraphError
+from .models import PropertyScores, ScoringResult, WidgetScore
+from .engine import ScoringEngine
 
 
 def score_widgets(
@@ -23,6 +18,7 @@ def score_widgets(
     constraint_shape: Optional[Union[URIRef, BNode]] = None,
     shapes_graph: Optional[Graph] = None,
     logger: Optional[logging.Logger] = None,
+    backend: Optional[str] = None,
 ) -> ScoringResult:
     """
     Score widgets based on SHACL UI Widget Scoring algorithm.
@@ -41,6 +37,8 @@ def score_widgets(
         constraint_shape: The SHACL shape constraining the focus node (optional)
         shapes_graph: The shapes graph containing constraint_shape (required if constraint_shape provided)
         logger: Optional logger for warnings and debug messages
+        backend: "pyshacl" or "native"; None uses pyshacl when it is installed
+            and the pyshacl-free native backend otherwise
 
     Returns:
         ScoringResult containing sorted list of (widget, score) pairs,
@@ -50,6 +48,8 @@ def score_widgets(
         MalformedScoreError: If a Score instance violates multiplicity constraints
         InvalidFocusNodeError: If focus_node is invalid or not provided
         MissingGraphError: If required graphs are missing
+        UnsupportedFeatureError: If the native backend is used and a Score
+            instance uses a SHACL feature outside the native subset
 
     Example:
         >>> from rdflib import Graph, Literal
@@ -70,74 +70,132 @@ def score_widgets(
         ... )
         >>> print(result.default_widget)  # Highest-scoring widget
     """
-    # Step a: Validate Widget Scoring Graph
+    # Step a: Validate Widget Scoring Graph and extract Score instances
     # This ensures all Score instances are well-formed before processing
-    validate_widget_scoring_graph(widget_scoring_graph, logger=logger)
-
-    # Step b: Input Validation
-    # focus_node is required
-    if focus_node is None:
-        raise InvalidFocusNodeError("focus_node is required")
-
-    if not isinstance(focus_node, (URIRef, BNode, Literal)):
-        raise InvalidFocusNodeError(
-            f"focus_node must be URIRef, BNode, or Literal, got {type(focus_node)}"
-        )
-
-    # data_graph is required for ALL focus node types per spec section 4.1
-    if data_graph is None:
-        raise MissingGraphError("data_graph is required for all focus nodes")
-
-    # If constraint_shape provided, require shapes_graph
-    if constraint_shape is not None and shapes_graph is None:
-        raise MissingGraphError(
-            "shapes_graph is required when constraint_shape is provided"
-        )
-
-    # Step c: Extract Score Instances
-    score_instances = extract_score_instances(widget_scoring_graph)
-
-    # Step d: Evaluate Each Score
-    results = []
-
-    for score_inst in score_instances:
-        # Validate against dataGraphShapes
-        data_valid = validate_against_shapes(
-            focus_node,
-            data_graph,
-            score_inst["dataGraphShapes"],
-            data_graph_shapes_graph,
-            logger,
-        )
-
-        # Validate against shapesGraphShapes
-        # Per spec section 6.2: If constraint_shape is not provided but Score has
-        # shapesGraphShape conditions, the score is not applicable
-        if constraint_shape is None and score_inst["shapesGraphShapes"]:
-            shapes_valid = False
-        elif constraint_shape is None:
-            # No shapesGraphShape conditions, and no constraint_shape - always valid
-            shapes_valid = True
-        else:
-            # constraint_shape is not None, so shapes_graph must not be None
-            assert (
-                shapes_graph is not None
-            )  # Safety check - input validation ensures this
-            shapes_valid = validate_against_shapes(
-                constraint_shape,
-                shapes_graph,
-                score_inst["shapesGraphShapes"],
-                shapes_graph_shapes_graph,
-                logger,
-            )
-
-        # If all validations passed, record the result
-        if data_valid and shapes_valid:
-            results.append((score_inst["widget"], score_inst["score"]))
-
-    # Step e: Create WidgetScore objects (NO deduplication)
-    # All matching score instances should be returned, even if same widget
-    widget_scores = [WidgetScore(widget=w, score=s) for w, s in results]
-    widget_scores.sort()  # Uses WidgetScore.__lt__
-
-    return ScoringResult(widget_scores=widget_scores)
+    engine = ScoringEngine(
+        widget_scoring_graph,
+        data_graph_shapes_graph,
+        shapes_graph_shapes_graph,
+        logger=logger,
+        backend=backend,
+    )
+
+    # Steps b-e: Input validation, Score evaluation and sorting
+    return engine.score(
+        focus_node,
+        data_graph=data_graph,
+        constraint_shape=constraint_shape,
+        shapes_graph=shapes_graph,
+    )
+
+
+def iter_widget_scores(
+    focus_node: Union[URIRef, BNode, Literal],
+    widget_scoring_graph: Graph,
+    data_graph_shapes_graph: Graph,
+    shapes_graph_shapes_graph: Graph,
+    data_graph: Optional[Graph] = None,
+    constraint_shape: Optional[Union[URIRef, BNode]] = None,
+    shapes_graph: Optional[Graph] = None,
+    logger: Optional[logging.Logger] = None,
+    backend: Optional[str] = None,
+) -> Iterator[WidgetScore]:
+    """
+    Yield widget recommendations as they are found, highest-scoring first.
+
+    Takes the same arguments as score_widgets and yields the entries of its
+    result in the same order. Score instances are evaluated in descending score
+    order, so each WidgetScore is final when it is yielded: the first one is
+    the default widget, and a caller can stop iterating as soon as it has what
+    it needs. No validation runs ahead of the iterator.
+
+    The widget scoring graph and the inputs are validated before this
+    returns, so MalformedScoreError, InvalidFocusNodeError and
+    MissingGraphError are raised by the call, not by the first next().
+
+    Returns:
+        An iterator of WidgetScores, sorted by score descending, then by
+        widget IRI ascending
+
+    Raises:
+        MalformedScoreError: If a Score instance violates multiplicity constraints
+        InvalidFocusNodeError: If focus_node is invalid or not provided
+        MissingGraphError: If required graphs are missing
+        UnsupportedFeatureError: If the native backend is used and a Score
+            instance uses a SHACL feature outside the native subset
+
+    Example:
+        >>> widget_scores = iter_widget_scores(
+        ...     Literal(True),
+        ...     widget_scoring_graph,
+        ...     widget_scoring_graph,
+        ...     widget_scoring_graph,
+        ...     data_graph=data_graph,
+        ... )
+        >>> first = next(widget_scores, None)  # the default widget, if any
+    """
+    engine = ScoringEngine(
+        widget_scoring_graph,
+        data_graph_shapes_graph,
+        shapes_graph_shapes_graph,
+        logger=logger,
+        backend=backend,
+    )
+    return engine.iter_scores(
+        focus_node,
+        data_graph=data_graph,
+        constraint_shape=constraint_shape,
+        shapes_graph=shapes_graph,
+    )
+
+
+def score_form(
+    subject: Union[URIRef, BNode],
+    node_shape: Union[URIRef, BNode],
+    data_graph: Graph,
+    shapes_graph: Graph,
+    widget_scoring_graph: Graph,
+    data_graph_shapes_graph: Graph,
+    shapes_graph_shapes_graph: Graph,
+    logger: Optional[logging.Logger] = None,
+    backend: Optional[str] = None,
+) -> Dict[Union[URIRef, BNode], PropertyScores]:
+    """
+    Score widgets for every property value of a form.
+
+    For each sh:property shape of node_shape, every value node its sh:path
+    reaches from subject is scored with the property shape as constraint
+    shape. The results equal calling score_widgets for each (value, property
+    shape) pair, but each shape is validated once for the whole form.
+
+    Args:
+        subject: The node the form edits
+        node_shape: The node shape whose property shapes make up the form
+        data_graph: The data graph containing subject
+        shapes_graph: The shapes graph containing node_shape
+        widget_scoring_graph: Graph containing shui:Score instances
+        data_graph_shapes_graph: Graph containing shapes for dataGraphShape validation
+        shapes_graph_shapes_graph: Graph containing shapes for shapesGraphShape validation
+        logger: Optional logger for warnings and debug messages
+        backend: "pyshacl" or "native", as for score_widgets
+
+    Returns:
+        PropertyScores by property shape. value_scores holds a ScoringResult
+        per value node; shape_scores ranks the widgets for the property shape
+        alone, for properties without values
+
+    Raises:
+        MalformedScoreError: If a Score instance violates multiplicity constraints
+        InvalidFocusNodeError: If subject is invalid or not provided
+        MissingGraphError: If required graphs are missing
+        UnsupportedFeatureError: If the native backend is used and a Score
+            instance uses a SHACL feature outside the native subset
+    """
+    engine = ScoringEngine(
+        widget_scoring_graph,
+        data_graph_shapes_graph,
+        shapes_graph_shapes_graph,
+        logger=logger,
+        backend=backend,
+    )
+    return engine.score_form(subject, node_shape, data_graph, shapes_graph)
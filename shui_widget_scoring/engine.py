@@ -0,0 +1,1447 @@
+"""Compiled widget scoring engine.
+
+A ScoringEngine does the work that only depends on the widget scoring graph
+once: meta-validation, Score extraction and ordering. The engine can then
+score any number of focus nodes without repeating that work.
+"""
+
+import bisect
+import logging
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from itertools import compress
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from rdflib import Graph, URIRef, BNode, Literal
+from rdflib.namespace import RDF
+
+from .analysis import (
+    is_datatype_determined,
+    is_value_only_shape,
+    mentioned_datatypes,
+)
+from .cache import LRUCache
+from .models import PropertyScores, ScoreSource, WidgetScore, ScoringResult
+from .namespaces import SH, SHUI
+from .lite import NATIVE, check_lite_compatible, resolve_backend
+from .native import (
+    LiteralBucket,
+    OTHER_DATATYPE,
+    evaluate_literal_bucket,
+    literal_bucket,
+    path_values,
+    validate_node_natively,
+    validate_widget_scoring_graph_natively,
+)
+from .validation import (
+    has_declared_targets,
+    validate_widget_scoring_graph,
+    extract_score_instances,
+    validate_against_shapes,
+    validate_node_against_shape,
+    validate_nodes_against_shape,
+    validate_score_instance,
+    _node_exists_in_graph,
+)
+from .exceptions import InvalidFocusNodeError, MissingGraphError
+from .views import as_graph
+
+
+def _score_sort_key(score_inst: Dict[str, Any]):
+    """Sort key matching WidgetScore order: score descending, widget IRI ascending."""
+    return (-score_inst["score"], str(score_inst["widget"]))
+
+
+def _with_widget_score(score_inst: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return a Score record carrying the WidgetScore its results share.
+
+    Every result a Score applies to references this one WidgetScore, so
+    scoring allocates no per-result objects and sort keys are computed once.
+    The WidgetScore's source records the Score instance it came from.
+    """
+    return dict(
+        score_inst,
+        widget_score=WidgetScore(
+            widget=score_inst["widget"],
+            score=score_inst["score"],
+            source=ScoreSource(
+                uri=score_inst["uri"],
+                data_graph_shapes=tuple(score_inst["dataGraphShapes"]),
+                shapes_graph_shapes=tuple(score_inst["shapesGraphShapes"]),
+            ),
+        ),
+    )
+
+
+def check_inputs(
+    focus_node: Union[URIRef, BNode, Literal],
+    data_graph: Optional[Graph],
+    constraint_shape: Optional[Union[URIRef, BNode]] = None,
+    shapes_graph: Optional[Graph] = None,
+) -> None:
+    """
+    Validate the inputs of a scoring call, as ScoringEngine.score does.
+
+    Front-ends that score through ScoringEngine.dispatch_result and
+    ScoringEngine.evaluate call this first, since those methods do not check
+    their inputs.
+
+    Raises:
+        InvalidFocusNodeError: If focus_node is invalid or not provided
+        MissingGraphError: If required graphs are missing
+    """
+    _check_focus_node(focus_node)
+    _check_graphs(data_graph, constraint_shape, shapes_graph)
+
+
+def _check_focus_node(focus_node: Union[URIRef, BNode, Literal]) -> None:
+    """Validate a focus node, raising InvalidFocusNodeError on error."""
+    if focus_node is None:
+        raise InvalidFocusNodeError("focus_node is required")
+
+    if not isinstance(focus_node, (URIRef, BNode, Literal)):
+        raise InvalidFocusNodeError(
+            f"focus_node must be URIRef, BNode, or Literal, got {type(focus_node)}"
+        )
+
+
+def _check_graphs(
+    data_graph: Optional[Graph],
+    constraint_shape: Optional[Union[URIRef, BNode]],
+    shapes_graph: Optional[Graph],
+) -> None:
+    """Validate the graphs of a scoring call, raising MissingGraphError on error."""
+    # data_graph is required for ALL focus node types per spec section 4.1
+    if data_graph is None:
+        raise MissingGraphError("data_graph is required for all focus nodes")
+
+    # If constraint_shape provided, require shapes_graph
+    if constraint_shape is not None and shapes_graph is None:
+        raise MissingGraphError(
+            "shapes_graph is required when constraint_shape is provided"
+        )
+
+
+def _as_graphs(*graphs: Graph) -> Tuple[Graph, ...]:
+    """Return plain Graph views of graph inputs, one view per distinct input."""
+    views: Dict[int, Graph] = {}
+    for graph in graphs:
+        if id(graph) not in views:
+            views[id(graph)] = as_graph(graph)
+    return tuple(views[id(graph)] for graph in graphs)
+
+
+def _inserted(
+    table: List[Dict[str, Any]], score_inst: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Return a copy of a Score table with score_inst at its result position."""
+    index = bisect.bisect(table, _score_sort_key(score_inst), key=_score_sort_key)
+    return table[:index] + [score_inst] + table[index:]
+
+
+def _literal_key(shape: Union[URIRef, BNode], literal: Literal) -> Tuple:
+    """Cache key of a value-only verdict for a literal."""
+    return (shape, str(literal), literal.datatype, literal.language)
+
+
+# Row flags are ASCII digits, so int(..., 2) converts them in linear time
+_ONE = ord("1")
+_ONE_DIGIT = "1"
+
+
+def _set_bits(mask: int) -> Iterable[int]:
+    """Return an iterator over the indexes of the set bits of mask, ascending."""
+    # Clearing bits one at a time copies the whole int each time, which is
+    # quadratic in the number of rows; bin() reads it once
+    bits = bin(mask)[:1:-1]
+    return compress(range(len(bits)), map(_ONE_DIGIT.__eq__, bits))
+
+
+def _row_flags(size: int) -> bytearray:
+    """Return the flags of size rows, all clear."""
+    return bytearray(b"0") * size
+
+
+def _flags_mask(flags: bytearray) -> int:
+    """Return the bitset of the set row flags, row 0 being the lowest bit."""
+    return int(flags[::-1], 2) if flags else 0
+
+
+@dataclass(frozen=True)
+class _DatatypeDispatch:
+    """
+    The Score table partially evaluated for literals without a constraint shape.
+
+    Attributes:
+        table: LiteralBucket -> ranked WidgetScores of literals in the bucket
+        datatypes: The datatypes the buckets distinguish
+        absent_scores: Ranked WidgetScores of literals not in the data graph
+    """
+
+    table: Dict[LiteralBucket, Tuple[WidgetScore, ...]]
+    datatypes: FrozenSet[URIRef]
+    absent_scores: Tuple[WidgetScore, ...]
+
+    def widget_scores(
+        self, literal: Literal, data_graph: Graph
+    ) -> Tuple[WidgetScore, ...]:
+        """Return the ranked WidgetScores of a literal."""
+        if not _node_exists_in_graph(literal, data_graph):
+            return self.absent_scores
+        return self.table[literal_bucket(literal, self.datatypes)]
+
+
+@dataclass(frozen=True)
+class ShapesGraphVerdicts:
+    """
+    Precomputed shapesGraphShape verdicts for the constraint shapes of a shapes graph.
+
+    Attributes:
+        verdicts: constraint shape -> {shapesGraphShape: conforms}
+        applicable_scores: constraint shape -> URIs of the Score instances whose
+            shapesGraphShape conditions all hold for that constraint shape
+    """
+
+    verdicts: Dict[Union[URIRef, BNode], Dict[Union[URIRef, BNode], bool]]
+    applicable_scores: Dict[Union[URIRef, BNode], FrozenSet[Union[URIRef, BNode]]]
+
+    def __contains__(self, constraint_shape: Union[URIRef, BNode]) -> bool:
+        return constraint_shape in self.verdicts
+
+
+class ScoringEngine:
+    """
+    Widget scoring state compiled from a widget scoring graph.
+
+    Args:
+        widget_scoring_graph: Graph containing shui:Score instances
+        data_graph_shapes_graph: Graph containing shapes for dataGraphShape validation
+        shapes_graph_shapes_graph: Graph containing shapes for shapesGraphShape
+            validation
+        logger: Optional logger for warnings and debug messages
+        literal_cache_size: Maximum number of cached value-only verdicts for
+            literal focus nodes, shared across calls; 0 disables the cache
+        backend: "pyshacl" or "native" (see shui_widget_scoring.lite); None uses
+            pyshacl when it is installed and the native backend otherwise
+        executor: Optional executor, typically a ThreadPoolExecutor; when given,
+            the distinct shapes a call needs are evaluated concurrently on it
+
+    Raises:
+        MalformedScoreError: If a Score instance violates multiplicity constraints
+        UnsupportedFeatureError: If the native backend is used and a Score
+            instance uses a SHACL feature outside the native subset
+    """
+
+    def __init__(
+        self,
+        widget_scoring_graph: Graph,
+        data_graph_shapes_graph: Graph,
+        shapes_graph_shapes_graph: Graph,
+        logger: Optional[logging.Logger] = None,
+        literal_cache_size: int = 4096,
+        backend: Optional[str] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.backend = resolve_backend(backend)
+        widget_scoring_graph, data_graph_shapes_graph, shapes_graph_shapes_graph = (
+            _as_graphs(
+                widget_scoring_graph, data_graph_shapes_graph, shapes_graph_shapes_graph
+            )
+        )
+
+        # Validate Widget Scoring Graph once, before any Score is used
+        self._validate_scoring_graph(widget_scoring_graph, logger)
+
+        self._compile(
+            widget_scoring_graph,
+            extract_score_instances(widget_scoring_graph),
+            data_graph_shapes_graph,
+            shapes_graph_shapes_graph,
+            logger,
+            literal_cache_size,
+            executor,
+        )
+
+    @classmethod
+    def from_score_instances(
+        cls,
+        widget_scoring_graph: Graph,
+        score_instances: Iterable[Dict[str, Any]],
+        data_graph_shapes_graph: Graph,
+        shapes_graph_shapes_graph: Graph,
+        logger: Optional[logging.Logger] = None,
+        literal_cache_size: int = 4096,
+        backend: Optional[str] = None,
+        executor: Optional[Executor] = None,
+    ) -> "ScoringEngine":
+        """
+        Build an engine from Score instances that were already meta-validated.
+
+        Used to combine separately compiled Score tables, see
+        shui_widget_scoring.layers. The Score instances are not validated
+        again, so they must come from extract_score_instances on meta-validated
+        graphs.
+
+        Args:
+            widget_scoring_graph: Graph (or read-only view) the Score instances
+                were extracted from
+            score_instances: The Score instances, in any order
+            data_graph_shapes_graph: Graph containing shapes for dataGraphShape
+                validation
+            shapes_graph_shapes_graph: Graph containing shapes for
+                shapesGraphShape validation
+            logger: Optional logger for warnings and debug messages
+            literal_cache_size: As for ScoringEngine
+            backend: As for ScoringEngine
+            executor: As for ScoringEngine
+
+        Raises:
+            UnsupportedFeatureError: If the native backend is used and a Score
+                instance uses a SHACL feature outside the native subset
+        """
+        engine = cls.__new__(cls)
+        engine.backend = resolve_backend(backend)
+        engine._compile(
+            widget_scoring_graph,
+            score_instances,
+            data_graph_shapes_graph,
+            shapes_graph_shapes_graph,
+            logger,
+            literal_cache_size,
+            executor,
+        )
+        return engine
+
+    def _compile(
+        self,
+        widget_scoring_graph: Graph,
+        score_instances: Iterable[Dict[str, Any]],
+        data_graph_shapes_graph: Graph,
+        shapes_graph_shapes_graph: Graph,
+        logger: Optional[logging.Logger],
+        literal_cache_size: int,
+        executor: Optional[Executor],
+    ) -> None:
+        """Build the Score table, shape classification and dispatch table."""
+        widget_scoring_graph, data_graph_shapes_graph, shapes_graph_shapes_graph = (
+            _as_graphs(
+                widget_scoring_graph, data_graph_shapes_graph, shapes_graph_shapes_graph
+            )
+        )
+        self.executor = executor
+        self.widget_scoring_graph = widget_scoring_graph
+        self.data_graph_shapes_graph = data_graph_shapes_graph
+        self.shapes_graph_shapes_graph = shapes_graph_shapes_graph
+        self.logger = logger
+
+        # Score instances in result order, so applicable Scores never need sorting
+        table = sorted(map(_with_widget_score, score_instances), key=_score_sort_key)
+        if self.backend == NATIVE:
+            check_lite_compatible(
+                table,
+                data_graph_shapes_graph,
+                shapes_graph_shapes_graph,
+            )
+
+        # dataGraphShapes whose verdict for a literal only depends on the literal
+        self._declared_targets = has_declared_targets(data_graph_shapes_graph)
+        self.value_only_shapes: FrozenSet[Union[URIRef, BNode]] = frozenset()
+        self._datatype_determined: Dict[Union[URIRef, BNode], bool] = {}
+        self._classify_shapes(table)
+        self.literal_verdicts = LRUCache(literal_cache_size)
+
+        self._publish_table(table)
+
+    def _validate_scoring_graph(
+        self, widget_scoring_graph: Graph, logger: Optional[logging.Logger]
+    ) -> None:
+        """Meta-validate Score instances with the engine's backend."""
+        if self.backend == NATIVE:
+            validate_widget_scoring_graph_natively(widget_scoring_graph, logger=logger)
+        else:
+            validate_widget_scoring_graph(widget_scoring_graph, logger=logger)
+
+    def _validate_node(
+        self,
+        focus_node: Union[URIRef, BNode, Literal],
+        shape: Union[URIRef, BNode],
+        data_graph: Graph,
+        shape_definitions_graph: Graph,
+        logger: Optional[logging.Logger] = None,
+    ) -> bool:
+        """Validate a focus node against a shape with the engine's backend."""
+        if self.backend == NATIVE:
+            return validate_node_natively(
+                focus_node, shape, data_graph, shape_definitions_graph, logger
+            )
+        return validate_node_against_shape(
+            focus_node, shape, data_graph, shape_definitions_graph, logger
+        )
+
+    def _validate_nodes(
+        self,
+        focus_nodes: Iterable[Union[URIRef, BNode, Literal]],
+        shape: Union[URIRef, BNode],
+        data_graph: Graph,
+        shape_definitions_graph: Graph,
+    ) -> Set[Union[URIRef, BNode, Literal]]:
+        """Return the focus nodes that conform to a shape, batched where possible."""
+        if self.backend == NATIVE:
+            return {
+                focus_node
+                for focus_node in focus_nodes
+                if validate_node_natively(
+                    focus_node, shape, data_graph, shape_definitions_graph, self.logger
+                )
+            }
+        return validate_nodes_against_shape(
+            focus_nodes, shape, data_graph, shape_definitions_graph, self.logger
+        )
+
+    def _classify_shapes(self, score_instances: Iterable[Dict[str, Any]]) -> None:
+        """Classify the dataGraphShapes of Score instances not classified yet."""
+        value_only = set()
+        for score_inst in score_instances:
+            for shape in score_inst["dataGraphShapes"]:
+                if shape in self._datatype_determined:
+                    continue
+                if is_value_only_shape(
+                    shape, self.data_graph_shapes_graph, self._declared_targets
+                ):
+                    value_only.add(shape)
+                self._datatype_determined[shape] = is_datatype_determined(
+                    shape, self.data_graph_shapes_graph, self._declared_targets
+                )
+        if value_only:
+            self.value_only_shapes = self.value_only_shapes | value_only
+
+    def _publish_table(self, score_instances: List[Dict[str, Any]]) -> None:
+        """
+        Replace the Score table and its datatype dispatch table.
+
+        The new tables are built before either is published, and each is
+        published with a single assignment, so a concurrent scoring call sees
+        either the old or the new version of each and never a half-updated one.
+        Scoring methods read each attribute once per call.
+        """
+        dispatch = self._build_datatype_dispatch(score_instances)
+        self.score_instances: List[Dict[str, Any]] = score_instances
+        self._dispatch: Optional[_DatatypeDispatch] = dispatch
+
+    @property
+    def datatype_dispatch(
+        self,
+    ) -> Optional[Dict[LiteralBucket, Tuple[WidgetScore, ...]]]:
+        """The ranked widget list of each LiteralBucket, or None without dispatch."""
+        dispatch = self._dispatch
+        return dispatch.table if dispatch is not None else None
+
+    @property
+    def dispatch_datatypes(self) -> FrozenSet[URIRef]:
+        """The datatypes distinguished by the buckets of datatype_dispatch."""
+        dispatch = self._dispatch
+        return dispatch.datatypes if dispatch is not None else frozenset()
+
+    def _build_datatype_dispatch(
+        self, score_instances: List[Dict[str, Any]]
+    ) -> Optional[_DatatypeDispatch]:
+        """
+        Partially evaluate the Score table for literals without a constraint shape.
+
+        Only Scores without shapesGraphShapes can apply when there is no
+        constraint shape. If all their dataGraphShapes are datatype-determined,
+        the ranked widget list of a literal only depends on its LiteralBucket,
+        so it is precomputed for every bucket. Otherwise None is returned and
+        literals are evaluated normally.
+        """
+        candidates = [s for s in score_instances if not s["shapesGraphShapes"]]
+        shapes = {shape for s in candidates for shape in s["dataGraphShapes"]}
+        if not all(self._datatype_determined[shape] for shape in shapes):
+            return None
+
+        datatypes = frozenset(
+            datatype
+            for shape in shapes
+            for datatype in mentioned_datatypes(shape, self.data_graph_shapes_graph)
+        )
+        buckets = [
+            LiteralBucket(None, False, True),
+            LiteralBucket(None, True, True),
+            LiteralBucket(OTHER_DATATYPE, False, True),
+        ]
+        for datatype in datatypes:
+            buckets.append(LiteralBucket(datatype, False, True))
+            buckets.append(LiteralBucket(datatype, False, False))
+
+        dispatch = {}
+        for bucket in buckets:
+            verdicts = {
+                shape: evaluate_literal_bucket(
+                    shape, self.data_graph_shapes_graph, bucket
+                )
+                for shape in shapes
+            }
+            dispatch[bucket] = tuple(
+                s["widget_score"]
+                for s in candidates
+                if all(verdicts[shape] for shape in s["dataGraphShapes"])
+            )
+
+        # A literal that is not in the data graph only gets unconditional Scores
+        absent_scores = tuple(
+            s["widget_score"] for s in candidates if not s["dataGraphShapes"]
+        )
+        return _DatatypeDispatch(dispatch, datatypes, absent_scores)
+
+    # Graph attributes, stored as triples when an engine is pickled
+    _GRAPH_ATTRIBUTES = (
+        "widget_scoring_graph",
+        "data_graph_shapes_graph",
+        "shapes_graph_shapes_graph",
+    )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Return the compiled state for pickling.
+
+        Graphs are stored as lists of triples, once per distinct graph object.
+        The logger, the executor and the contents of the literal verdict cache
+        are not kept.
+        """
+        state = self.__dict__.copy()
+        graphs: List[List[Tuple[Any, Any, Any]]] = []
+        graph_indexes: Dict[int, int] = {}
+        for name in self._GRAPH_ATTRIBUTES:
+            graph = state.pop(name)
+            if id(graph) not in graph_indexes:
+                graph_indexes[id(graph)] = len(graphs)
+                graphs.append(list(graph))
+            state[name] = graph_indexes[id(graph)]
+        state["_graphs"] = graphs
+        state["logger"] = None
+        state["executor"] = None
+        state["literal_verdicts"] = self.literal_verdicts.maxsize
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore the compiled state without re-validating anything."""
+        state = dict(state)
+        graphs = []
+        for triples in state.pop("_graphs"):
+            graph = Graph()
+            graph.addN((s, p, o, graph) for s, p, o in triples)
+            graphs.append(graph)
+        for name in self._GRAPH_ATTRIBUTES:
+            state[name] = graphs[state[name]]
+        state["literal_verdicts"] = LRUCache(state["literal_verdicts"])
+        self.__dict__.update(state)
+
+    def add_score(
+        self, score_uri: Union[URIRef, BNode], widget_scoring_graph: Graph
+    ) -> None:
+        """
+        Add a single shui:Score instance to the compiled Score table.
+
+        Only the triples of score_uri in widget_scoring_graph are meta-validated.
+        The presorted Score table and the datatype dispatch table are rebuilt
+        with the same results as recompiling the whole scoring graph, and
+        replaced without disturbing concurrent scoring calls.
+        The shapes the Score references must be defined in the engine's
+        data_graph_shapes_graph and shapes_graph_shapes_graph; when these are the
+        widget scoring graph itself, add the new triples to it first.
+
+        Args:
+            score_uri: The Score instance to add
+            widget_scoring_graph: Graph containing the Score instance's triples
+
+        Raises:
+            MalformedScoreError: If the Score instance is malformed
+            ValueError: If the engine already contains score_uri
+        """
+        table = self.score_instances
+        if self._find_score(table, score_uri) is not None:
+            raise ValueError(f"Score instance {score_uri} is already in the engine")
+        score_inst = self._compile_score(score_uri, widget_scoring_graph)
+        self._publish_table(_inserted(table, score_inst))
+
+    def remove_score(self, score_uri: Union[URIRef, BNode]) -> None:
+        """
+        Remove a shui:Score instance from the compiled Score table.
+
+        Args:
+            score_uri: The Score instance to remove
+
+        Raises:
+            KeyError: If the engine does not contain score_uri
+        """
+        table = self.score_instances
+        index = self._find_score(table, score_uri)
+        if index is None:
+            raise KeyError(score_uri)
+        self._publish_table(table[:index] + table[index + 1 :])
+
+    def update_score(
+        self, score_uri: Union[URIRef, BNode], widget_scoring_graph: Graph
+    ) -> None:
+        """
+        Replace a shui:Score instance with its current definition.
+
+        The new definition is meta-validated before the old one is removed, so a
+        malformed update leaves the engine unchanged.
+
+        Args:
+            score_uri: The Score instance to update
+            widget_scoring_graph: Graph containing the Score instance's new triples
+
+        Raises:
+            MalformedScoreError: If the new definition is malformed
+            KeyError: If the engine does not contain score_uri
+        """
+        table = self.score_instances
+        index = self._find_score(table, score_uri)
+        if index is None:
+            raise KeyError(score_uri)
+        score_inst = self._compile_score(score_uri, widget_scoring_graph)
+        self._publish_table(_inserted(table[:index] + table[index + 1 :], score_inst))
+
+    def _compile_score(
+        self, score_uri: Union[URIRef, BNode], widget_scoring_graph: Graph
+    ) -> Dict[str, Any]:
+        """Meta-validate and extract a single Score instance."""
+        score_graph = Graph()
+        for triple in widget_scoring_graph.triples((score_uri, None, None)):
+            score_graph.add(triple)
+        score_graph.add((score_uri, RDF.type, SHUI.Score))
+
+        self._validate_scoring_graph(score_graph, self.logger)
+        score_inst = _with_widget_score(validate_score_instance(score_uri, score_graph))
+        if self.backend == NATIVE:
+            check_lite_compatible(
+                [score_inst],
+                self.data_graph_shapes_graph,
+                self.shapes_graph_shapes_graph,
+            )
+        self._classify_shapes([score_inst])
+        return score_inst
+
+    @staticmethod
+    def _find_score(
+        table: List[Dict[str, Any]], score_uri: Union[URIRef, BNode]
+    ) -> Optional[int]:
+        """Return the index of a Score instance in a Score table, or None."""
+        for index, score_inst in enumerate(table):
+            if score_inst["uri"] == score_uri:
+                return index
+        return None
+
+    def score(
+        self,
+        focus_node: Union[URIRef, BNode, Literal],
+        data_graph: Optional[Graph] = None,
+        constraint_shape: Optional[Union[URIRef, BNode]] = None,
+        shapes_graph: Optional[Graph] = None,
+        shapes_verdicts: Optional[ShapesGraphVerdicts] = None,
+    ) -> ScoringResult:
+        """
+        Score widgets for a focus node.
+
+        Args:
+            focus_node: The node in the data graph to score widgets for
+            data_graph: The data graph containing the focus node (required)
+            constraint_shape: The SHACL shape constraining the focus node (optional)
+            shapes_graph: The shapes graph containing constraint_shape (required if
+                constraint_shape provided)
+            shapes_verdicts: Optional precomputed shapesGraphShape verdicts for
+                shapes_graph, see precompute_shapes_verdicts
+
+        Returns:
+            ScoringResult sorted by score descending, then by widget IRI ascending
+
+        Raises:
+            InvalidFocusNodeError: If focus_node is invalid or not provided
+            MissingGraphError: If required graphs are missing
+        """
+        check_inputs(focus_node, data_graph, constraint_shape, shapes_graph)
+        data_graph, shapes_graph = as_graph(data_graph), as_graph(shapes_graph)
+
+        dispatched = self.dispatch_result(focus_node, data_graph, constraint_shape)
+        if dispatched is not None:
+            return dispatched
+
+        # Verdicts are per shape, so Scores sharing a shape validate it only once
+        shape_verdicts = self.initial_shape_verdicts(constraint_shape, shapes_verdicts)
+
+        data_verdicts: Dict[Union[URIRef, BNode], bool] = {}
+        if self.executor is not None:
+            self._prefetch_verdicts(
+                focus_node,
+                data_graph,
+                constraint_shape,
+                shapes_graph,
+                data_verdicts,
+                shape_verdicts,
+            )
+
+        widget_scores = self.evaluate(
+            focus_node,
+            data_graph,
+            constraint_shape,
+            shapes_graph,
+            data_verdicts,
+            shape_verdicts,
+        )
+        return ScoringResult(widget_scores=widget_scores)
+
+    def dispatch_result(
+        self,
+        focus_node: Union[URIRef, BNode, Literal],
+        data_graph: Graph,
+        constraint_shape: Optional[Union[URIRef, BNode]] = None,
+    ) -> Optional[ScoringResult]:
+        """
+        Answer a scoring call from the datatype dispatch table, or return None.
+
+        Literal focus nodes without a constraint shape are answered without
+        validation when the engine has a dispatch table. Other calls return
+        None and are scored with evaluate. The inputs are not checked (see
+        check_inputs).
+
+        Args:
+            focus_node: The node in the data graph to score widgets for
+            data_graph: The data graph containing the focus node
+            constraint_shape: The SHACL shape constraining the focus node
+        """
+        # Literals without a constraint shape may be answered by the dispatch table
+        dispatch = self._dispatch
+        if (
+            constraint_shape is None
+            and dispatch is not None
+            and isinstance(focus_node, Literal)
+        ):
+            return ScoringResult(
+                widget_scores=list(dispatch.widget_scores(focus_node, data_graph))
+            )
+        return None
+
+    @staticmethod
+    def initial_shape_verdicts(
+        constraint_shape: Optional[Union[URIRef, BNode]],
+        shapes_verdicts: Optional[ShapesGraphVerdicts],
+    ) -> Dict[Union[URIRef, BNode], bool]:
+        """
+        Return a new shapesGraphShape verdict memo for evaluate.
+
+        The memo is seeded with the precomputed verdicts of constraint_shape,
+        when there are any.
+        """
+        if constraint_shape is not None and shapes_verdicts is not None:
+            return dict(shapes_verdicts.verdicts.get(constraint_shape, {}))
+        return {}
+
+    def _map_shapes(
+        self, function: Callable[[Any], Any], shapes: List[Union[URIRef, BNode]]
+    ) -> Dict[Union[URIRef, BNode], Any]:
+        """Apply function to each shape, concurrently when an executor is set."""
+        if self.executor is None or len(shapes) < 2:
+            return {shape: function(shape) for shape in shapes}
+        return dict(zip(shapes, self.executor.map(function, shapes)))
+
+    def _prefetch_verdicts(
+        self,
+        focus_node: Union[URIRef, BNode, Literal],
+        data_graph: Graph,
+        constraint_shape: Optional[Union[URIRef, BNode]],
+        shapes_graph: Optional[Graph],
+        data_verdicts: Dict[Union[URIRef, BNode], bool],
+        shape_verdicts: Dict[Union[URIRef, BNode], bool],
+    ) -> None:
+        """
+        Evaluate every shape a call may need concurrently, filling the memos.
+
+        Unlike evaluate, this does not skip the remaining shapes of a Score
+        once one fails, trading extra validation runs for parallelism.
+        """
+        data_shapes: Dict[Union[URIRef, BNode], None] = {}
+        shapes_shapes: Dict[Union[URIRef, BNode], None] = {}
+        for score_inst in self.score_instances:
+            if constraint_shape is None and score_inst["shapesGraphShapes"]:
+                continue
+            data_shapes.update(dict.fromkeys(score_inst["dataGraphShapes"]))
+            if constraint_shape is not None:
+                shapes_shapes.update(dict.fromkeys(score_inst["shapesGraphShapes"]))
+
+        data_futures = {
+            shape: self.executor.submit(
+                self.data_verdict, focus_node, data_graph, shape, {}
+            )
+            for shape in data_shapes
+            if shape not in data_verdicts
+        }
+        shapes_futures = {
+            shape: self.executor.submit(
+                self.shapes_graph_verdict, constraint_shape, shapes_graph, shape, {}
+            )
+            for shape in shapes_shapes
+            if shape not in shape_verdicts
+        }
+        for shape, future in data_futures.items():
+            data_verdicts[shape] = future.result()
+        for shape, future in shapes_futures.items():
+            shape_verdicts[shape] = future.result()
+
+    def evaluate(
+        self,
+        focus_node: Union[URIRef, BNode, Literal],
+        data_graph: Graph,
+        constraint_shape: Optional[Union[URIRef, BNode]],
+        shapes_graph: Optional[Graph],
+        data_verdicts: Dict[Union[URIRef, BNode], bool],
+        shape_verdicts: Dict[Union[URIRef, BNode], bool],
+    ) -> List[WidgetScore]:
+        """
+        Evaluate every Score for a focus node using caller-owned verdict memos.
+
+        Verdicts found in data_verdicts and shape_verdicts are used as they
+        are. Missing verdicts are computed, as data_verdict and
+        shapes_graph_verdict do, and added to them. A caller that keeps the
+        memos between calls is responsible for dropping verdicts the graphs
+        no longer support. The dispatch table is not consulted and the inputs
+        are not checked (see dispatch_result and check_inputs).
+
+        Args:
+            focus_node: The node in the data graph to score widgets for
+            data_graph: The data graph containing the focus node
+            constraint_shape: The SHACL shape constraining the focus node
+            shapes_graph: The shapes graph containing constraint_shape
+            data_verdicts: dataGraphShape -> verdict for focus_node in data_graph
+            shape_verdicts: shapesGraphShape -> verdict for constraint_shape in
+                shapes_graph (see initial_shape_verdicts)
+
+        Returns:
+            The applicable WidgetScores in result order
+        """
+        return list(
+            self._iter_applicable(
+                focus_node,
+                data_graph,
+                constraint_shape,
+                shapes_graph,
+                data_verdicts,
+                shape_verdicts,
+            )
+        )
+
+    def _iter_applicable(
+        self,
+        focus_node: Union[URIRef, BNode, Literal],
+        data_graph: Graph,
+        constraint_shape: Optional[Union[URIRef, BNode]],
+        shapes_graph: Optional[Graph],
+        data_verdicts: Dict[Union[URIRef, BNode], bool],
+        shape_verdicts: Dict[Union[URIRef, BNode], bool],
+    ) -> Iterator[WidgetScore]:
+        """
+        Yield the WidgetScores of the Scores applying to a focus node, in result order.
+
+        Shapes are only validated when the Score being evaluated needs them.
+        """
+        for score_inst in self.score_instances:
+            data_valid = all(
+                self.data_verdict(focus_node, data_graph, shape, data_verdicts)
+                for shape in score_inst["dataGraphShapes"]
+            )
+            if not data_valid:
+                continue
+
+            # Per spec section 6.2: If constraint_shape is not provided but Score has
+            # shapesGraphShape conditions, the score is not applicable
+            if constraint_shape is None:
+                shapes_valid = not score_inst["shapesGraphShapes"]
+            else:
+                assert shapes_graph is not None  # Input validation ensures this
+                shapes_valid = all(
+                    self.shapes_graph_verdict(
+                        constraint_shape, shapes_graph, shape, shape_verdicts
+                    )
+                    for shape in score_inst["shapesGraphShapes"]
+                )
+
+            # score_instances is presorted, so each Score is yielded in result order
+            if shapes_valid:
+                yield score_inst["widget_score"]
+
+    def iter_scores(
+        self,
+        focus_node: Union[URIRef, BNode, Literal],
+        data_graph: Optional[Graph] = None,
+        constraint_shape: Optional[Union[URIRef, BNode]] = None,
+        shapes_graph: Optional[Graph] = None,
+        shapes_verdicts: Optional[ShapesGraphVerdicts] = None,
+    ) -> Iterator[WidgetScore]:
+        """
+        Yield the applicable WidgetScores for a focus node as they are found.
+
+        Scores are evaluated one at a time in result order, so each WidgetScore
+        is yielded in its final position as soon as it is known to apply, and
+        the first one is the default widget. No shape is validated ahead of the
+        Score that needs it and the executor is not used, so closing the
+        iterator early leaves no work behind. The inputs are checked before
+        this returns.
+
+        Args:
+            focus_node: The node in the data graph to score widgets for
+            data_graph: The data graph containing the focus node (required)
+            constraint_shape: The SHACL shape constraining the focus node (optional)
+            shapes_graph: The shapes graph containing constraint_shape (required if
+                constraint_shape provided)
+            shapes_verdicts: Optional precomputed shapesGraphShape verdicts for
+                shapes_graph, see precompute_shapes_verdicts
+
+        Returns:
+            An iterator of WidgetScores, sorted as in score
+
+        Raises:
+            InvalidFocusNodeError: If focus_node is invalid or not provided
+            MissingGraphError: If required graphs are missing
+        """
+        check_inputs(focus_node, data_graph, constraint_shape, shapes_graph)
+        data_graph, shapes_graph = as_graph(data_graph), as_graph(shapes_graph)
+
+        dispatched = self.dispatch_result(focus_node, data_graph, constraint_shape)
+        if dispatched is not None:
+            return iter(dispatched.widget_scores)
+
+        return self._iter_applicable(
+            focus_node,
+            data_graph,
+            constraint_shape,
+            shapes_graph,
+            {},
+            self.initial_shape_verdicts(constraint_shape, shapes_verdicts),
+        )
+
+    def score_batch(
+        self,
+        focus_nodes: Iterable[Union[URIRef, BNode, Literal]],
+        data_graph: Optional[Graph] = None,
+        constraint_shape: Optional[Union[URIRef, BNode]] = None,
+        shapes_graph: Optional[Graph] = None,
+        shapes_verdicts: Optional[ShapesGraphVerdicts] = None,
+    ) -> List[ScoringResult]:
+        """
+        Score widgets for many focus nodes sharing a data graph and constraint shape.
+
+        Each distinct dataGraphShape gets one bitset column over the batch,
+        computed with a single batched validation run. A Score applies to the
+        nodes in the AND of its shapes' columns, and the per-node lists are
+        filled in presorted Score order, so no per-node sorting is needed.
+
+        Args:
+            focus_nodes: The nodes in the data graph to score widgets for
+            data_graph: The data graph containing the focus nodes (required)
+            constraint_shape: The SHACL shape constraining every focus node (optional)
+            shapes_graph: The shapes graph containing constraint_shape (required if
+                constraint_shape provided)
+            shapes_verdicts: Optional precomputed shapesGraphShape verdicts for
+                shapes_graph, see precompute_shapes_verdicts
+
+        Returns:
+            One ScoringResult per focus node, in input order
+
+        Raises:
+            InvalidFocusNodeError: If a focus node is invalid or not provided
+            MissingGraphError: If required graphs are missing
+        """
+        # Graphs are checked once, so an empty batch still needs a data graph
+        _check_graphs(data_graph, constraint_shape, shapes_graph)
+        assert data_graph is not None  # Input validation ensures this
+        focus_nodes = list(focus_nodes)
+        for focus_node in focus_nodes:
+            _check_focus_node(focus_node)
+        data_graph, shapes_graph = as_graph(data_graph), as_graph(shapes_graph)
+
+        # One version of the tables serves the whole batch
+        table, dispatch = self.score_instances, self._dispatch
+
+        # Shapes-side verdicts are the same for every node in the batch
+        if constraint_shape is None:
+            scores = [s for s in table if not s["shapesGraphShapes"]]
+        else:
+            assert shapes_graph is not None  # Input validation ensures this
+            shape_verdicts = self.initial_shape_verdicts(
+                constraint_shape, shapes_verdicts
+            )
+            if self.executor is not None:
+                pending = list(
+                    dict.fromkeys(
+                        shape
+                        for s in table
+                        for shape in s["shapesGraphShapes"]
+                        if shape not in shape_verdicts
+                    )
+                )
+                shape_verdicts.update(
+                    self._map_shapes(
+                        lambda shape: self.shapes_graph_verdict(
+                            constraint_shape, shapes_graph, shape, {}
+                        ),
+                        pending,
+                    )
+                )
+            scores = [
+                s
+                for s in table
+                if all(
+                    self.shapes_graph_verdict(
+                        constraint_shape, shapes_graph, shape, shape_verdicts
+                    )
+                    for shape in s["shapesGraphShapes"]
+                )
+            ]
+
+        # Distinct focus nodes are the rows of the verdict matrix
+        results: Dict[Union[URIRef, BNode, Literal], List[WidgetScore]] = {}
+        rows: List[Union[URIRef, BNode, Literal]] = []
+        for focus_node in focus_nodes:
+            if focus_node in results:
+                continue
+            if (
+                constraint_shape is None
+                and dispatch is not None
+                and isinstance(focus_node, Literal)
+            ):
+                results[focus_node] = list(
+                    dispatch.widget_scores(focus_node, data_graph)
+                )
+                continue
+            results[focus_node] = []
+            rows.append(focus_node)
+
+        if rows:
+            all_rows = (1 << len(rows)) - 1
+            existing_flags = _row_flags(len(rows))
+            for index, focus_node in enumerate(rows):
+                if _node_exists_in_graph(focus_node, data_graph):
+                    existing_flags[index] = _ONE
+            existing = _flags_mask(existing_flags)
+
+            columns = self._prefetch_columns(scores, rows, existing, data_graph)
+            self._apply_scores(
+                scores, all_rows, rows, existing, data_graph, columns, results
+            )
+
+        return [
+            ScoringResult(widget_scores=list(results[focus_node]))
+            for focus_node in focus_nodes
+        ]
+
+    def _prefetch_columns(
+        self,
+        scores: Iterable[Dict[str, Any]],
+        rows: List[Union[URIRef, BNode, Literal]],
+        existing: int,
+        data_graph: Graph,
+    ) -> Dict[Union[URIRef, BNode], int]:
+        """Compute the dataGraphShape columns of scores up front on the executor."""
+        if self.executor is None:
+            return {}
+        return self._map_shapes(
+            lambda shape: self._data_column(shape, rows, existing, data_graph),
+            list(
+                dict.fromkeys(shape for s in scores for shape in s["dataGraphShapes"])
+            ),
+        )
+
+    def _apply_scores(
+        self,
+        scores: Iterable[Dict[str, Any]],
+        row_mask: int,
+        rows: List[Union[URIRef, BNode, Literal]],
+        existing: int,
+        data_graph: Graph,
+        columns: Dict[Union[URIRef, BNode], int],
+        results: Dict[Union[URIRef, BNode, Literal], List[WidgetScore]],
+    ) -> None:
+        """
+        Append each Score's WidgetScore to the results of the rows it applies to.
+
+        Only rows in row_mask are considered. Missing dataGraphShape columns
+        are computed over all rows and added to columns, so callers can share
+        them between calls.
+        """
+        for score_inst in scores:
+            mask = row_mask
+            for shape in score_inst["dataGraphShapes"]:
+                if shape not in columns:
+                    columns[shape] = self._data_column(
+                        shape, rows, existing, data_graph
+                    )
+                mask &= columns[shape]
+                if not mask:
+                    break
+            if not mask:
+                continue
+            widget_score = score_inst["widget_score"]
+            for index in _set_bits(mask):
+                results[rows[index]].append(widget_score)
+
+    def score_form(
+        self,
+        subject: Union[URIRef, BNode],
+        node_shape: Union[URIRef, BNode],
+        data_graph: Graph,
+        shapes_graph: Graph,
+        shapes_verdicts: Optional[ShapesGraphVerdicts] = None,
+    ) -> Dict[Union[URIRef, BNode], PropertyScores]:
+        """
+        Score widgets for every value of every property of a form at once.
+
+        Each sh:property shape of node_shape is the constraint shape of the
+        values its sh:path reaches from subject. The shapesGraphShapes are
+        validated against all the property shapes in one batched run per
+        shape, as in precompute_shapes_verdicts, and each dataGraphShape is
+        validated against the distinct values of the whole form in one batched
+        run, as in score_batch. A property without values gets the Scores
+        that need no dataGraphShape, as its shape_scores.
+
+        Args:
+            subject: The node the form edits
+            node_shape: The node shape whose property shapes make up the form
+            data_graph: The data graph containing subject
+            shapes_graph: The shapes graph containing node_shape
+            shapes_verdicts: Optional precomputed shapesGraphShape verdicts for
+                shapes_graph; property shapes missing from it are evaluated
+
+        Returns:
+            PropertyScores by property shape, in shapes graph order
+
+        Raises:
+            InvalidFocusNodeError: If subject is invalid or not provided
+            MissingGraphError: If required graphs are missing
+        """
+        check_inputs(subject, data_graph, node_shape, shapes_graph)
+        data_graph, shapes_graph = as_graph(data_graph), as_graph(shapes_graph)
+
+        property_shapes = list(
+            dict.fromkeys(shapes_graph.objects(node_shape, SH.property))
+        )
+        verdicts = dict(shapes_verdicts.verdicts) if shapes_verdicts else {}
+        missing = [shape for shape in property_shapes if shape not in verdicts]
+        if missing:
+            verdicts.update(
+                self.precompute_shapes_verdicts(shapes_graph, missing).verdicts
+            )
+
+        # Values of every property are the rows of one verdict matrix
+        paths: Dict[Union[URIRef, BNode], Any] = {}
+        values: Dict[Union[URIRef, BNode], List[Union[URIRef, BNode, Literal]]] = {}
+        row_index: Dict[Union[URIRef, BNode, Literal], int] = {}
+        for property_shape in property_shapes:
+            path = shapes_graph.value(property_shape, SH.path)
+            paths[property_shape] = path
+            values[property_shape] = (
+                []
+                if path is None
+                else sorted(path_values(subject, path, data_graph, shapes_graph))
+            )
+            for value in values[property_shape]:
+                row_index.setdefault(value, len(row_index))
+        rows = list(row_index)
+        property_rows: Dict[Union[URIRef, BNode], int] = {}
+        for property_shape in property_shapes:
+            flags = _row_flags(len(rows))
+            for value in values[property_shape]:
+                flags[row_index[value]] = _ONE
+            property_rows[property_shape] = _flags_mask(flags)
+        existing_flags = _row_flags(len(rows))
+        for index, value in enumerate(rows):
+            if _node_exists_in_graph(value, data_graph):
+                existing_flags[index] = _ONE
+        existing = _flags_mask(existing_flags)
+
+        applicable = {
+            property_shape: [
+                s
+                for s in self.score_instances
+                if all(
+                    verdicts[property_shape].get(shape, False)
+                    for shape in s["shapesGraphShapes"]
+                )
+            ]
+            for property_shape in property_shapes
+        }
+        columns = self._prefetch_columns(
+            [
+                s
+                for property_shape in property_shapes
+                if property_rows[property_shape]
+                for s in applicable[property_shape]
+            ],
+            rows,
+            existing,
+            data_graph,
+        )
+
+        form: Dict[Union[URIRef, BNode], PropertyScores] = {}
+        for property_shape in property_shapes:
+            results: Dict[Union[URIRef, BNode, Literal], List[WidgetScore]] = {
+                value: [] for value in values[property_shape]
+            }
+            if results:
+                self._apply_scores(
+                    applicable[property_shape],
+                    property_rows[property_shape],
+                    rows,
+                    existing,
+                    data_graph,
+                    columns,
+                    results,
+                )
+            form[property_shape] = PropertyScores(
+                property_shape=property_shape,
+                path=paths[property_shape],
+                value_scores={
+                    value: ScoringResult(widget_scores=widget_scores)
+                    for value, widget_scores in results.items()
+                },
+                shape_scores=ScoringResult(
+                    widget_scores=[
+                        s["widget_score"]
+                        for s in applicable[property_shape]
+                        if not s["dataGraphShapes"]
+                    ]
+                ),
+            )
+        return form
+
+    def _data_column(
+        self,
+        shape: Union[URIRef, BNode],
+        rows: List[Union[URIRef, BNode, Literal]],
+        existing: int,
+        data_graph: Graph,
+    ) -> int:
+        """Return the bitset of rows that conform to a dataGraphShape."""
+        if not list(self.data_graph_shapes_graph.predicate_objects(shape)):
+            if self.logger:
+                self.logger.warning(f"Shape {shape} is not defined in shapes graph")
+            return 0
+
+        column = _row_flags(len(rows))
+        pending: Dict[Union[URIRef, BNode, Literal], int] = {}
+        value_only = shape in self.value_only_shapes
+        for index in _set_bits(existing):
+            focus_node = rows[index]
+            if value_only and isinstance(focus_node, Literal):
+                verdict = self.literal_verdicts.get(_literal_key(shape, focus_node))
+                if verdict is not None:
+                    if verdict:
+                        column[index] = _ONE
+                    continue
+            pending[focus_node] = index
+
+        if pending:
+            conforming = self._validate_nodes(
+                pending, shape, data_graph, self.data_graph_shapes_graph
+            )
+            for focus_node, index in pending.items():
+                verdict = focus_node in conforming
+                if verdict:
+                    column[index] = _ONE
+                if value_only and isinstance(focus_node, Literal):
+                    self.literal_verdicts.put(_literal_key(shape, focus_node), verdict)
+        return _flags_mask(column)
+
+    def data_verdict(
+        self,
+        focus_node: Union[URIRef, BNode, Literal],
+        data_graph: Graph,
+        shape: Union[URIRef, BNode],
+        verdicts: Dict[Union[URIRef, BNode], bool],
+        validate: bool = True,
+    ) -> Optional[bool]:
+        """
+        Return the verdict of a focus node against a dataGraphShape.
+
+        The verdict is looked up in verdicts, then, for literals checked
+        against value-only shapes, decided by the literal's absence from the
+        data graph or found in the cross-call cache. Otherwise the focus node
+        is validated, unless validate is False. New verdicts are added to
+        verdicts.
+
+        Args:
+            focus_node: The node in the data graph
+            data_graph: The data graph containing the focus node
+            shape: The dataGraphShape
+            verdicts: Verdict memo for focus_node in data_graph
+            validate: Whether to run a validation when the verdict is unknown
+
+        Returns:
+            The verdict, or None if it is unknown and validate is False
+        """
+        verdict = verdicts.get(shape)
+        if verdict is not None:
+            return verdict
+
+        if not isinstance(focus_node, Literal) or shape not in self.value_only_shapes:
+            if not validate:
+                return None
+            return self._verdict(
+                verdicts, focus_node, data_graph, shape, self.data_graph_shapes_graph
+            )
+
+        if not _node_exists_in_graph(focus_node, data_graph):
+            verdict = False
+        else:
+            key = _literal_key(shape, focus_node)
+            verdict = self.literal_verdicts.get(key)
+            if verdict is None:
+                if not validate:
+                    return None
+                verdict = self._validate_node(
+                    focus_node,
+                    shape,
+                    data_graph,
+                    self.data_graph_shapes_graph,
+                    self.logger,
+                )
+                self.literal_verdicts.put(key, verdict)
+        verdicts[shape] = verdict
+        return verdict
+
+    def shapes_graph_verdict(
+        self,
+        constraint_shape: Union[URIRef, BNode],
+        shapes_graph: Graph,
+        shape: Union[URIRef, BNode],
+        verdicts: Dict[Union[URIRef, BNode], bool],
+        validate: bool = True,
+    ) -> Optional[bool]:
+        """
+        Return the verdict of a constraint shape against a shapesGraphShape.
+
+        Args:
+            constraint_shape: The constraint shape in the shapes graph
+            shapes_graph: The shapes graph containing constraint_shape
+            shape: The shapesGraphShape
+            verdicts: Verdict memo for constraint_shape in shapes_graph; new
+                verdicts are added to it
+            validate: Whether to run a validation when the verdict is unknown
+
+        Returns:
+            The verdict, or None if it is unknown and validate is False
+        """
+        if not validate:
+            return verdicts.get(shape)
+        return self._verdict(
+            verdicts,
+            constraint_shape,
+            shapes_graph,
+            shape,
+            self.shapes_graph_shapes_graph,
+        )
+
+    def _verdict(
+        self,
+        verdicts: Dict[Union[URIRef, BNode], bool],
+        focus_node: Union[URIRef, BNode, Literal],
+        target_graph: Graph,
+        shape: Union[URIRef, BNode],
+        shape_definitions_graph: Graph,
+    ) -> bool:
+        """Return the memoised verdict of focus_node against a single shape."""
+        verdict = verdicts.get(shape)
+        if verdict is None:
+            verdict = validate_against_shapes(
+                focus_node,
+                target_graph,
+                [shape],
+                shape_definitions_graph,
+                self.logger,
+                validate_node=self._validate_node,
+            )
+            verdicts[shape] = verdict
+        return verdict
+
+    def precompute_shapes_verdicts(
+        self,
+        shapes_graph: Graph,
+        constraint_shapes: Optional[Iterable[Union[URIRef, BNode]]] = None,
+    ) -> ShapesGraphVerdicts:
+        """
+        Evaluate every shapesGraphShape against every constraint shape up front.
+
+        Each distinct shapesGraphShape is validated against all candidate
+        constraint shapes in one batched pyshacl run. Pass the returned table to
+        score() as shapes_verdicts so shapes-side validation does not run per call.
+
+        Args:
+            shapes_graph: The shapes graph containing the constraint shapes
+            constraint_shapes: Candidate constraint shapes; defaults to every
+                sh:property shape in shapes_graph
+
+        Returns:
+            ShapesGraphVerdicts for the candidate constraint shapes
+        """
+        shapes_graph = as_graph(shapes_graph)
+        if constraint_shapes is None:
+            constraint_shapes = shapes_graph.objects(None, SH.property)
+        candidates = list(dict.fromkeys(constraint_shapes))
+
+        shapes = list(
+            dict.fromkeys(
+                shape
+                for score_inst in self.score_instances
+                for shape in score_inst["shapesGraphShapes"]
+            )
+        )
+
+        existing = [
+            candidate
+            for candidate in candidates
+            if _node_exists_in_graph(candidate, shapes_graph)
+        ]
+
+        def conforming_candidates(shape):
+            if not list(self.shapes_graph_shapes_graph.predicate_objects(shape)):
+                if self.logger:
+                    self.logger.warning(f"Shape {shape} is not defined in shapes graph")
+                return set()
+            return self._validate_nodes(
+                existing, shape, shapes_graph, self.shapes_graph_shapes_graph
+            )
+
+        verdicts: Dict[Union[URIRef, BNode], Dict[Union[URIRef, BNode], bool]] = {
+            candidate: {} for candidate in candidates
+        }
+        for shape, conforming in self._map_shapes(
+            conforming_candidates, shapes
+        ).items():
+            for candidate in candidates:
+                verdicts[candidate][shape] = candidate in conforming
+
+        applicable_scores = {
+            candidate: frozenset(
+                score_inst["uri"]
+                for score_inst in self.score_instances
+                if all(verdicts[candidate][s] for s in score_inst["shapesGraphShapes"])
+            )
+            for candidate in candidates
+        }
+
+        return ShapesGraphVerdicts(
+            verdicts=verdicts, applicable_scores=applicable_scores
+        )
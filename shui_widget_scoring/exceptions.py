@@ -1,5 +1,7 @@
 """Custom exception classes for SHACL UI Widget Scoring."""
 
+from typing import Iterable
+
 
 class ShuiWidgetScoringError(Exception):
     """Base exception for SHUI widget scoring errors."""
@@ -25,3 +27,22 @@ class MissingGraphError(ShuiWidgetScoringError):
     """Raised when required graphs are not provided."""
 
     pass
+
+
+class StaleArtifactError(ShuiWidgetScoringError):
+    """Raised when a compiled engine artefact does not match its version or sources."""
+
+    pass
+
+
+class UnsupportedFeatureError(ShuiWidgetScoringError):
+    """Raised when the native backend meets a SHACL feature outside its subset."""
+
+    def __init__(self, score_uri: str, features: Iterable[str]):
+        self.score_uri = score_uri
+        self.features = sorted(features)
+        super().__init__(
+            f"Score instance {score_uri} uses SHACL features the native backend "
+            f"does not support: {', '.join(self.features)}. "
+            "Install pyshacl to score it with pyshacl"
+        )
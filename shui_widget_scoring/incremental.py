@@ -0,0 +1,209 @@
+"""Incremental re-scoring of focus nodes after data graph changes."""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from rdflib import Graph, URIRef, BNode, Literal
+
+from .analysis import shape_read_predicates
+from .engine import ScoringEngine, ShapesGraphVerdicts, check_inputs
+from .models import ScoringResult
+from .validation import has_declared_targets
+
+Node = Union[URIRef, BNode, Literal]
+Shape = Union[URIRef, BNode]
+Triple = Tuple[Node, Node, Node]
+FieldKey = Tuple[Node, Optional[Shape]]
+
+
+class IncrementalScorer:
+    """
+    Keep the scores of a set of focus nodes up to date as a data graph changes.
+
+    Every cached dataGraphShape verdict records what it read: the triples that
+    mention its focus node, which decide whether the node exists in the data
+    graph, and the predicates the shape can traverse (see
+    analysis.shape_read_predicates). A patch only invalidates the verdicts whose
+    read set it intersects, and only the focus nodes with invalidated verdicts
+    are re-scored.
+
+    Args:
+        engine: The compiled scoring engine
+        data_graph: The data graph; apply_patch modifies it in place
+        shapes_graph: The shapes graph containing the constraint shapes (optional)
+        shapes_verdicts: Optional precomputed shapesGraphShape verdicts for shapes_graph
+    """
+
+    def __init__(
+        self,
+        engine: ScoringEngine,
+        data_graph: Graph,
+        shapes_graph: Optional[Graph] = None,
+        shapes_verdicts: Optional[ShapesGraphVerdicts] = None,
+    ):
+        self.engine = engine
+        self.data_graph = data_graph
+        self.shapes_graph = shapes_graph
+        self.shapes_verdicts = shapes_verdicts
+
+        self._declared_targets = has_declared_targets(engine.data_graph_shapes_graph)
+        self._read_predicates: Dict[Shape, Optional[frozenset]] = {}
+
+        # Cached verdicts, per focus node and per constraint shape
+        self._data_verdicts: Dict[Node, Dict[Shape, bool]] = {}
+        self._shape_verdicts: Dict[Shape, Dict[Shape, bool]] = {}
+        self._results: Dict[FieldKey, ScoringResult] = {}
+        self._fields: Dict[Node, Set[FieldKey]] = {}
+
+        # Read set indexes: which cached verdicts read which predicates
+        self._readers: Dict[URIRef, Set[Tuple[Node, Shape]]] = {}
+        self._unbounded: Set[Tuple[Node, Shape]] = set()
+
+    def score(
+        self,
+        focus_node: Node,
+        constraint_shape: Optional[Shape] = None,
+    ) -> ScoringResult:
+        """
+        Score a focus node and keep its result up to date.
+
+        Args:
+            focus_node: The node in the data graph to score widgets for
+            constraint_shape: The SHACL shape constraining the focus node (optional)
+
+        Returns:
+            The current ScoringResult for the focus node
+
+        Raises:
+            InvalidFocusNodeError: If focus_node is invalid or not provided
+            MissingGraphError: If constraint_shape is given without a shapes graph
+        """
+        key = (focus_node, constraint_shape)
+        result = self._results.get(key)
+        if result is None:
+            check_inputs(
+                focus_node, self.data_graph, constraint_shape, self.shapes_graph
+            )
+            result = self._rescore(key)
+            self._fields.setdefault(focus_node, set()).add(key)
+        return result
+
+    def forget(
+        self, focus_node: Node, constraint_shape: Optional[Shape] = None
+    ) -> None:
+        """Stop tracking a focus node."""
+        key = (focus_node, constraint_shape)
+        self._results.pop(key, None)
+        fields = self._fields.get(focus_node)
+        if fields is not None:
+            fields.discard(key)
+            if not fields:
+                del self._fields[focus_node]
+                for shape in list(self._data_verdicts.get(focus_node, ())):
+                    self._invalidate(focus_node, shape)
+                self._data_verdicts.pop(focus_node, None)
+
+    def apply_patch(
+        self,
+        added: Iterable[Triple] = (),
+        removed: Iterable[Triple] = (),
+    ) -> List[FieldKey]:
+        """
+        Apply a patch to the data graph and re-score the affected focus nodes.
+
+        Args:
+            added: Triples to add to the data graph
+            removed: Triples to remove from the data graph
+
+        Returns:
+            The (focus_node, constraint_shape) pairs whose ranked widget list
+            changed, in no particular order
+        """
+        changed_triples: List[Triple] = []
+        for triple in removed:
+            if triple in self.data_graph:
+                self.data_graph.remove(triple)
+                changed_triples.append(triple)
+        for triple in added:
+            if triple not in self.data_graph:
+                self.data_graph.add(triple)
+                changed_triples.append(triple)
+        if not changed_triples:
+            return []
+
+        # Verdicts whose read predicates intersect the patch
+        invalidated: Set[Tuple[Node, Shape]] = set(self._unbounded)
+        touched_nodes: Set[Node] = set()
+        for triple in changed_triples:
+            invalidated |= self._readers.get(triple[1], set())
+            touched_nodes.update(triple)
+        for node, shape in invalidated:
+            self._invalidate(node, shape)
+
+        # Triples mentioning a focus node may change whether it exists
+        touched_fields = touched_nodes & self._fields.keys()
+        for node in touched_fields:
+            for shape in list(self._data_verdicts.get(node, ())):
+                self._invalidate(node, shape)
+
+        affected_nodes = {node for node, shape in invalidated} | touched_fields
+        changed: List[FieldKey] = []
+        for node in affected_nodes:
+            for key in self._fields.get(node, ()):
+                previous = self._results[key]
+                if self._rescore(key).widget_scores != previous.widget_scores:
+                    changed.append(key)
+        return changed
+
+    def _rescore(self, key: FieldKey) -> ScoringResult:
+        """Evaluate a field, reusing every cached verdict that is still valid."""
+        focus_node, constraint_shape = key
+        data_verdicts = self._data_verdicts.setdefault(focus_node, {})
+        if constraint_shape is None:
+            shape_verdicts: Dict[Shape, bool] = {}
+        else:
+            shape_verdicts = self._shape_verdicts.get(constraint_shape)
+            if shape_verdicts is None:
+                shape_verdicts = self.engine.initial_shape_verdicts(
+                    constraint_shape, self.shapes_verdicts
+                )
+                self._shape_verdicts[constraint_shape] = shape_verdicts
+
+        known = set(data_verdicts)
+        widget_scores = self.engine.evaluate(
+            focus_node,
+            self.data_graph,
+            constraint_shape,
+            self.shapes_graph,
+            data_verdicts,
+            shape_verdicts,
+        )
+        for shape in data_verdicts.keys() - known:
+            self._record_reads(focus_node, shape)
+
+        result = ScoringResult(widget_scores=widget_scores)
+        self._results[key] = result
+        return result
+
+    def _record_reads(self, focus_node: Node, shape: Shape) -> None:
+        """Index a newly computed verdict by the predicates it read."""
+        if shape not in self._read_predicates:
+            self._read_predicates[shape] = shape_read_predicates(
+                shape, self.engine.data_graph_shapes_graph, self._declared_targets
+            )
+        predicates = self._read_predicates[shape]
+        if predicates is None:
+            self._unbounded.add((focus_node, shape))
+            return
+        for predicate in predicates:
+            self._readers.setdefault(predicate, set()).add((focus_node, shape))
+
+    def _invalidate(self, focus_node: Node, shape: Shape) -> None:
+        """Drop a cached verdict and its read set entries."""
+        verdicts = self._data_verdicts.get(focus_node)
+        if verdicts is not None:
+            verdicts.pop(shape, None)
+        self._unbounded.discard((focus_node, shape))
+        for predicate in self._read_predicates.get(shape) or ():
+            readers = self._readers.get(predicate)
+            if readers is not None:
+                readers.discard((focus_node, shape))
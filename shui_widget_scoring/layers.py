@@ -0,0 +1,234 @@
+"""Engines compiled from layered widget scoring graphs.
+
+A layered engine is built from an ordered list of widget scoring graphs, such
+as a shared widget catalogue followed by per-customer overrides. Each layer is
+meta-validated and its Score instances extracted on its own, and the compiled
+layers are cached by fingerprint, so a change to one overlay only recompiles
+that overlay. The layers are combined at the Score-table level: a Score
+instance in a later layer replaces the Score instance with the same IRI in an
+earlier layer. No layer graph is copied or merged.
+"""
+
+import logging
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple, Union
+
+from rdflib import Graph
+
+from .artifact import graph_fingerprint
+from .cache import LRUCache
+from .engine import ScoringEngine
+from .lite import NATIVE, resolve_backend
+from .native import validate_widget_scoring_graph_natively
+from .validation import extract_score_instances, validate_widget_scoring_graph
+from .views import union_graph
+
+
+@dataclass(frozen=True)
+class CompiledLayer:
+    """
+    The meta-validated Score instances of one widget scoring graph layer.
+
+    Attributes:
+        fingerprint: Fingerprint of the layer graph (see graph_fingerprint), or
+            the key the caller compiled it under
+        backend: Backend the layer was meta-validated with
+        graph: The layer graph
+        score_instances: The layer's Score instances
+    """
+
+    fingerprint: Hashable
+    backend: str
+    graph: Graph
+    score_instances: Tuple[Dict[str, Any], ...]
+
+
+def compile_layer(
+    graph: Graph,
+    backend: Optional[str] = None,
+    logger: Optional[logging.Logger] = None,
+    fingerprint: Optional[Hashable] = None,
+) -> CompiledLayer:
+    """
+    Meta-validate a widget scoring graph layer and extract its Score instances.
+
+    Args:
+        graph: The layer graph
+        backend: Backend used for meta-validation, as for ScoringEngine
+        logger: Optional logger for warnings
+        fingerprint: Key of the layer's content; computed with
+            graph_fingerprint when None
+
+    Returns:
+        The compiled layer
+
+    Raises:
+        MalformedScoreError: If a Score instance in the layer is malformed
+    """
+    backend = resolve_backend(backend)
+    if backend == NATIVE:
+        validate_widget_scoring_graph_natively(graph, logger=logger)
+    else:
+        validate_widget_scoring_graph(graph, logger=logger)
+    return CompiledLayer(
+        fingerprint=graph_fingerprint(graph) if fingerprint is None else fingerprint,
+        backend=backend,
+        graph=graph,
+        score_instances=tuple(extract_score_instances(graph)),
+    )
+
+
+class LayerCache:
+    """
+    Compiled layers by fingerprint and backend.
+
+    Layers with the same content share one compilation, whichever engines
+    they are part of.
+
+    Args:
+        maxsize: Maximum number of cached layers
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self._layers = LRUCache(maxsize)
+
+    def compile(
+        self,
+        graph: Graph,
+        backend: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+        fingerprint: Optional[Hashable] = None,
+    ) -> CompiledLayer:
+        """
+        Return the compiled layer for a graph, compiling it on a miss.
+
+        Fingerprinting reads every triple of the graph. Callers that know a
+        version or content hash of a layer should pass it as fingerprint.
+
+        Args:
+            graph: The layer graph
+            backend: Backend used for meta-validation, as for ScoringEngine
+            logger: Optional logger for warnings
+            fingerprint: Key of the layer's content; computed with
+                graph_fingerprint when None
+
+        Raises:
+            MalformedScoreError: If a Score instance in the layer is malformed
+        """
+        backend = resolve_backend(backend)
+        if fingerprint is None:
+            fingerprint = graph_fingerprint(graph)
+        key = (fingerprint, backend)
+        layer = self._layers.get(key)
+        if layer is None:
+            layer = compile_layer(graph, backend, logger, fingerprint)
+            self._layers.put(key, layer)
+        return layer
+
+    def info(self) -> Dict[str, int]:
+        """Return hit, miss and size statistics of the cache."""
+        return self._layers.info()
+
+    def clear(self) -> None:
+        """Remove every cached layer."""
+        self._layers.clear()
+
+
+def merge_layers(layers: Sequence[CompiledLayer]) -> Dict[Any, Dict[str, Any]]:
+    """
+    Combine the Score instances of layers, later layers taking precedence.
+
+    Returns:
+        Score instances by IRI
+    """
+    score_instances: Dict[Any, Dict[str, Any]] = {}
+    for layer in layers:
+        for score_inst in layer.score_instances:
+            score_instances[score_inst["uri"]] = score_inst
+    return score_instances
+
+
+def compile_layered_engine(
+    layers: Sequence[Union[Graph, CompiledLayer]],
+    data_graph_shapes_graph: Optional[Graph] = None,
+    shapes_graph_shapes_graph: Optional[Graph] = None,
+    logger: Optional[logging.Logger] = None,
+    literal_cache_size: int = 4096,
+    backend: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    cache: Optional[LayerCache] = None,
+    fingerprints: Optional[Sequence[Optional[Hashable]]] = None,
+) -> ScoringEngine:
+    """
+    Build an engine from an ordered list of widget scoring graph layers.
+
+    A graph layer is cached under its entry in fingerprints, such as a version
+    the caller already tracks, or under graph_fingerprint of its content when
+    there is none.
+
+    Args:
+        layers: Layer graphs or compiled layers, lowest precedence first
+        data_graph_shapes_graph: Graph containing dataGraphShape definitions;
+            defaults to a read-only view of all layers
+        shapes_graph_shapes_graph: Graph containing shapesGraphShape
+            definitions; defaults to a read-only view of all layers
+        logger: Optional logger for warnings and debug messages
+        literal_cache_size: As for ScoringEngine
+        backend: As for ScoringEngine
+        executor: As for ScoringEngine
+        cache: Cache of compiled layers; graphs are compiled without caching
+            when None
+        fingerprints: One fingerprint per layer, in the order of layers; None
+            entries, and entries for compiled layers, are not used
+
+    Returns:
+        The compiled engine
+
+    Raises:
+        MalformedScoreError: If a Score instance in a layer is malformed
+        UnsupportedFeatureError: If the native backend is used and a Score
+            instance uses a SHACL feature outside the native subset
+        ValueError: If there are no layers, a compiled layer was meta-validated
+            with a different backend, or fingerprints does not have one entry
+            per layer
+    """
+    if not layers:
+        raise ValueError("at least one widget scoring graph layer is required")
+    if fingerprints is None:
+        fingerprints = [None] * len(layers)
+    elif len(fingerprints) != len(layers):
+        raise ValueError(
+            f"got {len(fingerprints)} fingerprints for {len(layers)} layers"
+        )
+    backend = resolve_backend(backend)
+
+    compiled = []
+    for layer, fingerprint in zip(layers, fingerprints):
+        if isinstance(layer, CompiledLayer):
+            if layer.backend != backend:
+                raise ValueError(
+                    f"layer {layer.fingerprint} was compiled with the "
+                    f"{layer.backend} backend, not {backend}"
+                )
+        elif cache is not None:
+            layer = cache.compile(layer, backend, logger, fingerprint)
+        else:
+            layer = compile_layer(layer, backend, logger, fingerprint)
+        compiled.append(layer)
+
+    widget_scoring_graph = union_graph([layer.graph for layer in compiled])
+    if data_graph_shapes_graph is None:
+        data_graph_shapes_graph = widget_scoring_graph
+    if shapes_graph_shapes_graph is None:
+        shapes_graph_shapes_graph = widget_scoring_graph
+    return ScoringEngine.from_score_instances(
+        widget_scoring_graph,
+        merge_layers(compiled).values(),
+        data_graph_shapes_graph,
+        shapes_graph_shapes_graph,
+        logger=logger,
+        literal_cache_size=literal_cache_size,
+        backend=backend,
+        executor=executor,
+    )
@@ -0,0 +1,215 @@
+"""The pyshacl-free "lite" scoring backend.
+
+With the native backend, Score instances are meta-validated and shapes are
+evaluated by native.shape_conforms instead of pyshacl. The native evaluator
+supports a subset of SHACL Core; a scoring graph that uses anything else is
+rejected when the engine is built, and lite_conformance_report lists which
+Score instances are lite-compatible.
+"""
+
+import importlib.util
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Union
+
+from rdflib import Graph, URIRef, BNode
+from rdflib.namespace import OWL, RDF, RDFS
+
+from .exceptions import UnsupportedFeatureError
+from .namespaces import SH
+from .native import unsupported_features
+from .validation import TARGET_PREDICATES, extract_score_instances
+
+# Validation backends
+PYSHACL = "pyshacl"
+NATIVE = "native"
+BACKENDS = (PYSHACL, NATIVE)
+
+
+def pyshacl_available() -> bool:
+    """Check whether pyshacl is installed, without importing it."""
+    return importlib.util.find_spec("pyshacl") is not None
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    Resolve a backend name.
+
+    Args:
+        backend: "pyshacl", "native", or None to use pyshacl when it is
+            installed and the native backend otherwise
+
+    Returns:
+        The backend name
+
+    Raises:
+        ValueError: If backend is not a known backend
+        ImportError: If the pyshacl backend is requested but not installed
+    """
+    if backend is None:
+        return PYSHACL if pyshacl_available() else NATIVE
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend == PYSHACL and not pyshacl_available():
+        raise ImportError("The pyshacl backend requires pyshacl: pip install pyshacl")
+    return backend
+
+
+def declared_target_features(shapes_graph: Graph) -> Set[URIRef]:
+    """
+    Return the target declarations of a shapes graph.
+
+    Declared targets make every validation session depend on nodes other than
+    the focus node, which the native evaluator does not model.
+    """
+    features = {
+        predicate
+        for predicate in TARGET_PREDICATES
+        if (None, predicate, None) in shapes_graph
+    }
+    for class_type in (RDFS.Class, OWL.Class):
+        for subject in shapes_graph.subjects(RDF.type, class_type):
+            if (subject, RDF.type, SH.NodeShape) in shapes_graph or (
+                subject,
+                RDF.type,
+                SH.PropertyShape,
+            ) in shapes_graph:
+                features.add(class_type)
+    return features
+
+
+def _compact(feature: URIRef) -> str:
+    """Abbreviate a SHACL feature IRI for messages."""
+    if str(feature).startswith(str(SH)):
+        return "sh:" + str(feature)[len(str(SH)) :]
+    return str(feature)
+
+
+def _score_features(
+    score_inst: Dict[str, Any],
+    data_graph_shapes_graph: Graph,
+    shapes_graph_shapes_graph: Graph,
+    declared_targets: Dict[int, Set[URIRef]],
+) -> FrozenSet[URIRef]:
+    """Collect the unsupported features used by a Score instance."""
+    features: Set[URIRef] = set()
+    for key, graph in (
+        ("dataGraphShapes", data_graph_shapes_graph),
+        ("shapesGraphShapes", shapes_graph_shapes_graph),
+    ):
+        if not score_inst[key]:
+            continue
+        if id(graph) not in declared_targets:
+            declared_targets[id(graph)] = declared_target_features(graph)
+        features |= declared_targets[id(graph)]
+        for shape in score_inst[key]:
+            features |= unsupported_features(shape, graph)
+    return frozenset(features)
+
+
+@dataclass(frozen=True)
+class LiteConformanceReport:
+    """
+    Lite compatibility of the Score instances of a widget scoring graph.
+
+    Attributes:
+        unsupported: The unsupported SHACL features used by each Score
+            instance; Score instances mapped to an empty set are lite-compatible
+    """
+
+    unsupported: Dict[Union[URIRef, BNode], FrozenSet[URIRef]]
+
+    @property
+    def conforms(self) -> bool:
+        """True if every Score instance is lite-compatible."""
+        return not any(self.unsupported.values())
+
+    @property
+    def compatible_scores(self) -> List[Union[URIRef, BNode]]:
+        """Lite-compatible Score instances."""
+        return sorted(uri for uri, features in self.unsupported.items() if not features)
+
+    @property
+    def incompatible_scores(self) -> List[Union[URIRef, BNode]]:
+        """Score instances that need the pyshacl backend."""
+        return sorted(uri for uri, features in self.unsupported.items() if features)
+
+    def __str__(self) -> str:
+        lines = [
+            f"{len(self.compatible_scores)} of {len(self.unsupported)} Score "
+            "instances are lite-compatible"
+        ]
+        for uri in self.incompatible_scores:
+            features = ", ".join(sorted(_compact(f) for f in self.unsupported[uri]))
+            lines.append(f"  {uri}: {features}")
+        return "\n".join(lines)
+
+
+def lite_conformance_report(
+    widget_scoring_graph: Graph,
+    data_graph_shapes_graph: Optional[Graph] = None,
+    shapes_graph_shapes_graph: Optional[Graph] = None,
+) -> LiteConformanceReport:
+    """
+    Report which Score instances the native backend can evaluate.
+
+    Args:
+        widget_scoring_graph: Graph containing shui:Score instances
+        data_graph_shapes_graph: Graph containing dataGraphShape definitions;
+            defaults to widget_scoring_graph
+        shapes_graph_shapes_graph: Graph containing shapesGraphShape
+            definitions; defaults to widget_scoring_graph
+
+    Returns:
+        A LiteConformanceReport covering every Score instance
+
+    Raises:
+        MalformedScoreError: If a Score instance violates multiplicity constraints
+    """
+    if data_graph_shapes_graph is None:
+        data_graph_shapes_graph = widget_scoring_graph
+    if shapes_graph_shapes_graph is None:
+        shapes_graph_shapes_graph = widget_scoring_graph
+
+    declared_targets: Dict[int, Set[URIRef]] = {}
+    return LiteConformanceReport(
+        unsupported={
+            score_inst["uri"]: _score_features(
+                score_inst,
+                data_graph_shapes_graph,
+                shapes_graph_shapes_graph,
+                declared_targets,
+            )
+            for score_inst in extract_score_instances(widget_scoring_graph)
+        }
+    )
+
+
+def check_lite_compatible(
+    score_instances: Iterable[Dict[str, Any]],
+    data_graph_shapes_graph: Graph,
+    shapes_graph_shapes_graph: Graph,
+) -> None:
+    """
+    Check that the native backend can evaluate every Score instance.
+
+    Args:
+        score_instances: Score instances, as returned by extract_score_instances
+        data_graph_shapes_graph: Graph containing dataGraphShape definitions
+        shapes_graph_shapes_graph: Graph containing shapesGraphShape definitions
+
+    Raises:
+        UnsupportedFeatureError: For the first Score instance that uses a
+            feature outside the native subset
+    """
+    declared_targets: Dict[int, Set[URIRef]] = {}
+    for score_inst in score_instances:
+        features = _score_features(
+            score_inst,
+            data_graph_shapes_graph,
+            shapes_graph_shapes_graph,
+            declared_targets,
+        )
+        if features:
+            raise UnsupportedFeatureError(
+                str(score_inst["uri"]), (_compact(f) for f in features)
+            )
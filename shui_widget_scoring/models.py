@@ -1,30 +1,48 @@
 """Data structures for SHACL UI Widget Scoring."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from rdflib import URIRef, BNode
+from rdflib import URIRef, BNode, Literal
 
 
-@dataclass(frozen=True)
+def score_to_json(score: Decimal) -> Union[int, float]:
+    """Return a score as a JSON number: an int when it is integral, else a float."""
+    return int(score) if score == score.to_integral_value() else float(score)
+
+
+@dataclass(frozen=True, slots=True)
+class ScoreSource:
+    """The Score instance a WidgetScore was produced by."""
+
+    uri: Union[URIRef, BNode]
+    data_graph_shapes: Tuple[Union[URIRef, BNode], ...] = ()
+    shapes_graph_shapes: Tuple[Union[URIRef, BNode], ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
 class WidgetScore:
     """Represents a widget with its calculated score."""
 
     widget: Union[URIRef, BNode]
     score: Decimal
+    # The Score instance behind this entry; not part of equality or ordering
+    source: Optional[ScoreSource] = field(default=None, repr=False, compare=False)
+    # Sort key computed once, so sorting never converts widgets to strings again
+    _sort_key: Tuple[Decimal, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_sort_key", (-self.score, str(self.widget)))
 
     def __lt__(self, other: "WidgetScore") -> bool:
         """Enable sorting: first by score (desc), then by widget IRI (asc)."""
         if not isinstance(other, WidgetScore):
             return NotImplemented
-
-        if self.score != other.score:
-            return self.score > other.score  # Descending
-        return str(self.widget) < str(other.widget)  # Ascending (lexicographic)
+        return self._sort_key < other._sort_key
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ScoringResult:
     """Result of widget scoring algorithm."""
 
@@ -45,3 +63,16 @@ class ScoringResult:
     ) -> List[WidgetScore]:
         """Filter widgets with score >= min_score."""
         return [ws for ws in self.widget_scores if ws.score >= min_score]
+
+
+@dataclass(frozen=True, slots=True)
+class PropertyScores:
+    """Widget scores for the values of one property of a form."""
+
+    property_shape: Union[URIRef, BNode]
+    # The sh:path of the property shape, or None if it has none
+    path: Optional[Any]
+    # One result per value node, with the property shape as constraint shape
+    value_scores: Dict[Union[URIRef, BNode, Literal], ScoringResult]
+    # The Scores that apply to the property shape alone, e.g. for an empty property
+    shape_scores: ScoringResult
@@ -0,0 +1,645 @@
+"""Native evaluation of SHACL constraints without pyshacl.
+
+The functions here reproduce pyshacl's results for the constraints they
+support, so the engine can use them in place of a validation run.
+"""
+
+import logging
+import re
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import FrozenSet, NamedTuple, Optional, Set, Union
+
+from rdflib import Graph, URIRef, BNode, Literal
+from rdflib.collection import Collection
+from rdflib.namespace import RDF, RDFS, XSD
+
+from .exceptions import MalformedScoreError
+from .namespaces import SH, SHUI
+from .validation import _get_meta_shapes_graph
+
+
+# Node kinds that a literal matches
+LITERAL_NODE_KINDS = frozenset({SH.Literal, SH.BlankNodeOrLiteral, SH.IRIOrLiteral})
+
+# Datatype bucket for typed literals whose datatype no shape mentions
+OTHER_DATATYPE = URIRef("urn:shui:other-datatype")
+
+
+class LiteralBucket(NamedTuple):
+    """The properties of a literal that datatype-determined shapes depend on."""
+
+    datatype: Optional[URIRef]
+    has_language: bool
+    well_formed: bool
+
+
+def literal_value_matches_datatype(literal: Literal, datatype: URIRef) -> bool:
+    """Check the Python value of a literal against a datatype, as pyshacl does."""
+    value = literal.value
+    if datatype == XSD.string or datatype == RDF.langString:
+        return isinstance(value, (str, bytes))
+    elif datatype == XSD.integer:
+        return isinstance(value, int)
+    elif datatype == XSD.float:
+        return isinstance(value, float)
+    elif datatype == XSD.decimal:
+        return isinstance(value, Decimal)
+    elif datatype == XSD.boolean:
+        return isinstance(value, bool)
+    elif datatype == XSD.date:
+        return isinstance(value, date)
+    elif datatype == XSD.time:
+        return isinstance(value, time)
+    elif datatype == XSD.dateTime:
+        return isinstance(value, datetime)
+    # Other datatypes are not checked
+    return True
+
+
+def literal_is_well_formed(literal: Literal) -> bool:
+    """Check whether a literal matches its own datatype."""
+    if literal.datatype is None:
+        return True
+    if getattr(literal, "ill_typed", None) is True:
+        return False
+    return literal_value_matches_datatype(literal, literal.datatype)
+
+
+def literal_bucket(literal: Literal, datatypes: FrozenSet[URIRef]) -> LiteralBucket:
+    """
+    Map a literal to its bucket for a set of datatypes mentioned by shapes.
+
+    Well-formedness only matters for datatypes that some shape mentions, so
+    typed literals of any other datatype share the OTHER_DATATYPE bucket.
+
+    Args:
+        literal: The literal to classify
+        datatypes: Datatypes mentioned by sh:datatype in the shapes
+
+    Returns:
+        The LiteralBucket of the literal
+    """
+    datatype = literal.datatype
+    if datatype is None:
+        return LiteralBucket(None, literal.language is not None, True)
+    if datatype not in datatypes:
+        return LiteralBucket(OTHER_DATATYPE, False, True)
+    return LiteralBucket(datatype, False, literal_is_well_formed(literal))
+
+
+def bucket_matches_datatype(bucket: LiteralBucket, datatype: URIRef) -> bool:
+    """Evaluate sh:datatype for every literal in a bucket."""
+    if bucket.datatype == datatype:
+        return bucket.well_formed
+    if datatype == RDFS.Literal:
+        # All literals have datatype rdfs:Literal
+        return True
+    if datatype == RDFS.Datatype:
+        return bucket.datatype is not None
+    if bucket.datatype is None and not bucket.has_language:
+        return datatype == XSD.string
+    if bucket.has_language:
+        return datatype == RDF.langString
+    return False
+
+
+def evaluate_literal_bucket(
+    shape: Union[URIRef, BNode], shapes_graph: Graph, bucket: LiteralBucket
+) -> bool:
+    """
+    Evaluate a datatype-determined shape for every literal in a bucket.
+
+    The shape must satisfy analysis.is_datatype_determined.
+
+    Args:
+        shape: The shape to evaluate
+        shapes_graph: The graph containing the shape definition
+        bucket: The literal bucket
+
+    Returns:
+        True if literals in the bucket conform to the shape
+    """
+    for datatype in shapes_graph.objects(shape, SH.datatype):
+        if not bucket_matches_datatype(bucket, datatype):
+            return False
+    for node_kind in shapes_graph.objects(shape, SH.nodeKind):
+        if node_kind not in LITERAL_NODE_KINDS:
+            return False
+    for nested in shapes_graph.objects(shape, SH.node):
+        if not evaluate_literal_bucket(nested, shapes_graph, bucket):
+            return False
+    for nested in shapes_graph.objects(shape, SH["not"]):
+        if evaluate_literal_bucket(nested, shapes_graph, bucket):
+            return False
+    for list_node in shapes_graph.objects(shape, SH["and"]):
+        if not all(
+            evaluate_literal_bucket(member, shapes_graph, bucket)
+            for member in Collection(shapes_graph, list_node)
+        ):
+            return False
+    for list_node in shapes_graph.objects(shape, SH["or"]):
+        if not any(
+            evaluate_literal_bucket(member, shapes_graph, bucket)
+            for member in Collection(shapes_graph, list_node)
+        ):
+            return False
+    for list_node in shapes_graph.objects(shape, SH.xone):
+        matches = sum(
+            evaluate_literal_bucket(member, shapes_graph, bucket)
+            for member in Collection(shapes_graph, list_node)
+        )
+        if matches != 1:
+            return False
+    return True
+
+
+# Constraint parameters supported by the native SHACL-subset evaluator
+NATIVE_PARAMETERS = frozenset(
+    {
+        SH.datatype,
+        SH.nodeKind,
+        SH["class"],
+        SH["in"],
+        SH.hasValue,
+        SH.pattern,
+        SH.flags,
+        SH.minInclusive,
+        SH.maxInclusive,
+        SH.minExclusive,
+        SH.maxExclusive,
+        SH.minLength,
+        SH.maxLength,
+        SH.languageIn,
+        SH.uniqueLang,
+        SH.minCount,
+        SH.maxCount,
+        SH.equals,
+        SH.disjoint,
+        SH.node,
+        SH["not"],
+        SH["and"],
+        SH["or"],
+        SH.xone,
+        SH.property,
+        SH.path,
+    }
+)
+
+# Predicates of shapes that never affect validation results
+IGNORED_PARAMETERS = frozenset(
+    {
+        RDF.type,
+        RDFS.label,
+        RDFS.comment,
+        SH.message,
+        SH.name,
+        SH.description,
+        SH.severity,
+        SH.order,
+        SH.group,
+        SH.defaultValue,
+        SH.deactivated,
+    }
+)
+
+# Values of sh:nodeKind and the node types they match
+NODE_KINDS = {
+    SH.IRI: (URIRef,),
+    SH.BlankNode: (BNode,),
+    SH.Literal: (Literal,),
+    SH.BlankNodeOrIRI: (BNode, URIRef),
+    SH.BlankNodeOrLiteral: (BNode, Literal),
+    SH.IRIOrLiteral: (URIRef, Literal),
+}
+
+# Characters of sh:flags and the regular expression flags they set
+PATTERN_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}
+
+Node = Union[URIRef, BNode, Literal]
+Shape = Union[URIRef, BNode]
+
+
+def _custom_component_parameters(shapes_graph: Graph) -> FrozenSet[URIRef]:
+    """Return the parameters of constraint components declared in a shapes graph."""
+    return frozenset(
+        path
+        for component in shapes_graph.subjects(RDF.type, SH.ConstraintComponent)
+        for parameter in shapes_graph.objects(component, SH.parameter)
+        for path in shapes_graph.objects(parameter, SH.path)
+    )
+
+
+def _unsupported_path_features(path: Node, shapes_graph: Graph) -> Set[URIRef]:
+    """Return the path constructs of a property path that are not supported."""
+    if isinstance(path, URIRef):
+        return set()
+    if not isinstance(path, BNode):
+        return {SH.path}
+    if (path, RDF.first, None) in shapes_graph:
+        features: Set[URIRef] = set()
+        for member in Collection(shapes_graph, path):
+            features |= _unsupported_path_features(member, shapes_graph)
+        return features
+    alternatives = shapes_graph.value(path, SH.alternativePath)
+    if alternatives is not None:
+        features = set()
+        for member in Collection(shapes_graph, alternatives):
+            features |= _unsupported_path_features(member, shapes_graph)
+        return features
+    inverse = shapes_graph.value(path, SH.inversePath)
+    if inverse is not None:
+        return set() if isinstance(inverse, URIRef) else {SH.inversePath}
+    for parameter in (SH.zeroOrMorePath, SH.oneOrMorePath, SH.zeroOrOnePath):
+        nested = shapes_graph.value(path, parameter)
+        if nested is not None:
+            return _unsupported_path_features(nested, shapes_graph)
+    return {SH.path}
+
+
+def unsupported_features(shape: Shape, shapes_graph: Graph) -> Set[URIRef]:
+    """
+    Collect the SHACL features of a shape that the native evaluator does not support.
+
+    Every shape reachable through logical parameters, sh:node and sh:property
+    is inspected. Predicates outside the SHACL namespace are ignored, as pyshacl
+    ignores them, unless they are parameters of a custom constraint component.
+
+    Args:
+        shape: The shape to inspect
+        shapes_graph: The graph containing the shape definitions
+
+    Returns:
+        The unsupported parameters and path constructs; empty if the shape can
+        be evaluated natively
+    """
+    custom_parameters = _custom_component_parameters(shapes_graph)
+    features: Set[URIRef] = set()
+    seen: Set[Shape] = set()
+    pending = [shape]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        for predicate, value in shapes_graph.predicate_objects(current):
+            if predicate in IGNORED_PARAMETERS:
+                continue
+            if predicate in custom_parameters:
+                features.add(predicate)
+            elif predicate in (SH["and"], SH["or"], SH.xone):
+                pending.extend(Collection(shapes_graph, value))
+            elif predicate in (SH.node, SH["not"], SH.property):
+                pending.append(value)
+            elif predicate == SH.path:
+                features |= _unsupported_path_features(value, shapes_graph)
+            elif predicate in NATIVE_PARAMETERS:
+                continue
+            elif str(predicate).startswith(str(SH)):
+                features.add(predicate)
+    return features
+
+
+def path_values(
+    focus_node: Node, path: Node, data_graph: Graph, shapes_graph: Graph
+) -> Set[Node]:
+    """
+    Return the value nodes reached from a focus node through a property path.
+
+    Args:
+        focus_node: The node the path starts from
+        path: The value of sh:path
+        data_graph: The data graph
+        shapes_graph: The graph containing the path definition
+
+    Returns:
+        The set of value nodes
+    """
+    if isinstance(path, URIRef):
+        if isinstance(focus_node, Literal):
+            return set()
+        return set(data_graph.objects(focus_node, path))
+
+    if (path, RDF.first, None) in shapes_graph:
+        current = {focus_node}
+        for member in Collection(shapes_graph, path):
+            current = {
+                value
+                for node in current
+                for value in path_values(node, member, data_graph, shapes_graph)
+            }
+        return current
+
+    alternatives = shapes_graph.value(path, SH.alternativePath)
+    if alternatives is not None:
+        return {
+            value
+            for member in Collection(shapes_graph, alternatives)
+            for value in path_values(focus_node, member, data_graph, shapes_graph)
+        }
+
+    inverse = shapes_graph.value(path, SH.inversePath)
+    if inverse is not None:
+        return set(data_graph.subjects(inverse, focus_node))
+
+    nested = shapes_graph.value(path, SH.zeroOrOnePath)
+    if nested is not None:
+        return {focus_node} | path_values(focus_node, nested, data_graph, shapes_graph)
+
+    for parameter, include_focus in (
+        (SH.zeroOrMorePath, True),
+        (SH.oneOrMorePath, False),
+    ):
+        nested = shapes_graph.value(path, parameter)
+        if nested is None:
+            continue
+        reached: Set[Node] = set()
+        frontier = [focus_node]
+        while frontier:
+            node = frontier.pop()
+            for value in path_values(node, nested, data_graph, shapes_graph):
+                if value not in reached:
+                    reached.add(value)
+                    frontier.append(value)
+        if include_focus:
+            reached.add(focus_node)
+        return reached
+
+    raise ValueError(f"Unsupported property path {path}")
+
+
+def _has_class(node: Node, cls: Node, data_graph: Graph) -> bool:
+    """Check whether a node is a SHACL instance of a class in the data graph."""
+    if isinstance(node, Literal):
+        return False
+    seen: Set[Node] = set()
+    pending = list(data_graph.objects(node, RDF.type))
+    while pending:
+        current = pending.pop()
+        if current == cls:
+            return True
+        if current in seen:
+            continue
+        seen.add(current)
+        pending.extend(data_graph.objects(current, RDFS.subClassOf))
+    return False
+
+
+# Errors raised by comparing literals whose values cannot be ordered. Kept as a
+# tuple so the except clause stays valid syntax before Python 3.14 (Pyodide)
+_INCOMPARABLE = (TypeError, NotImplementedError)
+
+
+def _compare(value: Node, bound: Node, accept) -> bool:
+    """
+    Compare a value node with a range bound, as pyshacl does.
+
+    Literals are ordered with rdflib's Literal comparison, except that
+    dateTime and time values are compared by value and strings never compare
+    with non-strings. Other nodes and incomparable literals fail.
+
+    Args:
+        value: The value node
+        bound: The value of the range parameter
+        accept: Called with -1, 0 or 1 for value below, equal to or above bound
+    """
+    if not isinstance(value, Literal) or not isinstance(bound, Literal):
+        return False
+    if isinstance(value.value, str) != isinstance(bound.value, str):
+        return False
+    try:
+        if value.eq(bound):
+            order = 0
+        elif value.value.__class__ in (datetime, time):
+            if value.value == bound.value:
+                order = 0
+            else:
+                order = 1 if value.value > bound.value else -1
+        else:
+            order = 1 if value > bound else -1
+    except _INCOMPARABLE:
+        return False
+    return accept(order)
+
+
+def _language_matches(language: str, language_range: str) -> bool:
+    """Basic language range matching, as used by sh:languageIn."""
+    language = language.lower()
+    language_range = language_range.lower()
+    return (
+        language_range == "*"
+        or language == language_range
+        or language.startswith(language_range + "-")
+    )
+
+
+def _value_conforms(
+    value: Node, shape: Shape, data_graph: Graph, shapes_graph: Graph
+) -> bool:
+    """Evaluate the value node constraints of a shape for a single value node."""
+    for predicate, parameter in shapes_graph.predicate_objects(shape):
+        if predicate == SH.datatype:
+            if not isinstance(value, Literal) or not bucket_matches_datatype(
+                literal_bucket(value, frozenset({parameter})), parameter
+            ):
+                return False
+        elif predicate == SH.nodeKind:
+            if not isinstance(value, NODE_KINDS.get(parameter, ())):
+                return False
+        elif predicate == SH["class"]:
+            if not _has_class(value, parameter, data_graph):
+                return False
+        elif predicate == SH["in"]:
+            if value not in list(Collection(shapes_graph, parameter)):
+                return False
+        elif predicate == SH.pattern:
+            if isinstance(value, BNode):
+                return False
+            flags = 0
+            for flag in str(shapes_graph.value(shape, SH.flags) or ""):
+                flags |= PATTERN_FLAGS.get(flag, 0)
+            if not re.search(str(parameter), str(value), flags):
+                return False
+        elif predicate == SH.minLength:
+            if isinstance(value, BNode) or len(str(value)) < int(parameter):
+                return False
+        elif predicate == SH.maxLength:
+            if isinstance(value, BNode) or len(str(value)) > int(parameter):
+                return False
+        elif predicate == SH.minInclusive:
+            if not _compare(value, parameter, lambda order: order >= 0):
+                return False
+        elif predicate == SH.maxInclusive:
+            if not _compare(value, parameter, lambda order: order <= 0):
+                return False
+        elif predicate == SH.minExclusive:
+            if not _compare(value, parameter, lambda order: order > 0):
+                return False
+        elif predicate == SH.maxExclusive:
+            if not _compare(value, parameter, lambda order: order < 0):
+                return False
+        elif predicate == SH.languageIn:
+            language = value.language if isinstance(value, Literal) else None
+            if not language or not any(
+                _language_matches(language, str(language_range))
+                for language_range in Collection(shapes_graph, parameter)
+            ):
+                return False
+        elif predicate == SH.node:
+            if not shape_conforms(value, parameter, data_graph, shapes_graph):
+                return False
+        elif predicate == SH["not"]:
+            if shape_conforms(value, parameter, data_graph, shapes_graph):
+                return False
+        elif predicate == SH["and"]:
+            if not all(
+                shape_conforms(value, member, data_graph, shapes_graph)
+                for member in Collection(shapes_graph, parameter)
+            ):
+                return False
+        elif predicate == SH["or"]:
+            if not any(
+                shape_conforms(value, member, data_graph, shapes_graph)
+                for member in Collection(shapes_graph, parameter)
+            ):
+                return False
+        elif predicate == SH.xone:
+            matches = sum(
+                shape_conforms(value, member, data_graph, shapes_graph)
+                for member in Collection(shapes_graph, parameter)
+            )
+            if matches != 1:
+                return False
+        elif predicate == SH.property:
+            if not shape_conforms(value, parameter, data_graph, shapes_graph):
+                return False
+    return True
+
+
+def shape_conforms(
+    focus_node: Node, shape: Shape, data_graph: Graph, shapes_graph: Graph
+) -> bool:
+    """
+    Evaluate a shape for a focus node without pyshacl.
+
+    The shape must only use supported features (see unsupported_features), and
+    the shapes graph must not declare targets of its own.
+
+    Args:
+        focus_node: The focus node
+        shape: The shape to evaluate
+        data_graph: The data graph
+        shapes_graph: The graph containing the shape definitions
+
+    Returns:
+        True if the focus node conforms to the shape
+    """
+    if shapes_graph.value(shape, SH.deactivated) == Literal(True):
+        return True
+
+    path = shapes_graph.value(shape, SH.path)
+    if path is None:
+        values = {focus_node}
+    else:
+        values = path_values(focus_node, path, data_graph, shapes_graph)
+
+        for min_count in shapes_graph.objects(shape, SH.minCount):
+            if len(values) < int(min_count):
+                return False
+        for max_count in shapes_graph.objects(shape, SH.maxCount):
+            if len(values) > int(max_count):
+                return False
+        if shapes_graph.value(shape, SH.uniqueLang) == Literal(True):
+            languages = [
+                v.language for v in values if isinstance(v, Literal) and v.language
+            ]
+            if len(languages) != len(set(languages)):
+                return False
+        for other in shapes_graph.objects(shape, SH.equals):
+            if values != set(data_graph.objects(focus_node, other)):
+                return False
+        for other in shapes_graph.objects(shape, SH.disjoint):
+            if values & set(data_graph.objects(focus_node, other)):
+                return False
+
+    for has_value in shapes_graph.objects(shape, SH.hasValue):
+        if has_value not in values:
+            return False
+
+    return all(
+        _value_conforms(value, shape, data_graph, shapes_graph) for value in values
+    )
+
+
+def validate_node_natively(
+    focus_node: Node,
+    shape: Shape,
+    data_graph: Graph,
+    shape_definitions_graph: Graph,
+    logger: Optional[logging.Logger] = None,
+) -> bool:
+    """
+    Validate a focus node against a SHACL shape with the native evaluator.
+
+    A drop-in replacement for validation.validate_node_against_shape for shapes
+    within the native subset.
+
+    Args:
+        focus_node: The node to validate
+        shape: The SHACL shape to validate against
+        data_graph: The data graph containing the focus node
+        shape_definitions_graph: The graph containing the shape definition
+        logger: Optional logger for warnings
+
+    Returns:
+        True if validation passes (conforms), False if violations occur
+    """
+    try:
+        return shape_conforms(focus_node, shape, data_graph, shape_definitions_graph)
+    except Exception as e:
+        # Malformed shape
+        if logger:
+            logger.warning(f"Shape validation failed for shape {shape}: {e}")
+        return False
+
+
+def _class_instances(graph: Graph, cls: URIRef) -> Set[Node]:
+    """Return the SHACL instances of a class, following rdfs:subClassOf."""
+    classes = {cls}
+    pending = [cls]
+    while pending:
+        for subclass in graph.subjects(RDFS.subClassOf, pending.pop()):
+            if subclass not in classes:
+                classes.add(subclass)
+                pending.append(subclass)
+    return {instance for c in classes for instance in graph.subjects(RDF.type, c)}
+
+
+def validate_widget_scoring_graph_natively(
+    widget_scoring_graph: Graph, logger: Optional[logging.Logger] = None
+) -> None:
+    """
+    Validate the widget scoring graph against the meta-shapes without pyshacl.
+
+    Args:
+        widget_scoring_graph: Graph containing shui:Score instances
+        logger: Optional logger for warnings
+
+    Raises:
+        MalformedScoreError: If any Score instance is malformed
+    """
+    meta_shapes_graph = _get_meta_shapes_graph()
+    property_shapes = list(meta_shapes_graph.objects(SHUI.ScoreShape, SH.property))
+
+    for score_uri in sorted(_class_instances(widget_scoring_graph, SHUI.Score)):
+        for property_shape in property_shapes:
+            if not shape_conforms(
+                score_uri, property_shape, widget_scoring_graph, meta_shapes_graph
+            ):
+                message = str(meta_shapes_graph.value(property_shape, SH.message))
+                if logger:
+                    logger.error(
+                        "Widget scoring graph validation failed for "
+                        f"{score_uri}: {message}"
+                    )
+                raise MalformedScoreError(str(score_uri), message)
@@ -0,0 +1,449 @@
+"""Batch scoring on pools of threads, worker processes or subinterpreters.
+
+Each process or interpreter worker builds its scoring state once, in the
+pool initializer: it loads the compiled engine and restores the data and
+shapes graphs, or attaches to their shared memory snapshots. Tasks then only
+carry a chunk of focus nodes and return compact (widget, score, source)
+tuples, so the graphs are never pickled per task. Thread workers share the caller's
+engine and graphs.
+"""
+
+import abc
+import concurrent.futures
+import os
+import pickle
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import lru_cache
+from itertools import islice
+from typing import (
+    Any,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from rdflib import Graph, URIRef, BNode, Literal
+
+from .engine import ScoringEngine
+from .models import ScoringResult, WidgetScore
+from .snapshot import GraphSnapshot, snapshot_of
+
+Node = Union[URIRef, BNode, Literal]
+PathLike = Union[str, "os.PathLike[str]"]
+
+# A scored chunk: per focus node, its (widget, score, source) triples in result order
+ChunkResult = List[Tuple[Tuple[Any, Any, Any], ...]]
+
+# Scoring state of the current worker process or interpreter, set by _init_worker
+_worker_engine: Optional[ScoringEngine] = None
+_worker_data_graph: Optional[Graph] = None
+_worker_shapes_graph: Optional[Graph] = None
+
+
+def graph_payload(
+    graph: Union[Graph, GraphSnapshot, None],
+) -> Union[bytes, GraphSnapshot, None]:
+    """
+    Encode a graph for a pool initializer.
+
+    Snapshots, and graphs backed by one, are passed by the name of their
+    shared memory segment, so workers attach to them instead of receiving a
+    copy of the triples.
+    """
+    if graph is None or isinstance(graph, GraphSnapshot):
+        return graph
+    snapshot = snapshot_of(graph)
+    if snapshot is not None:
+        return snapshot
+    return pickle.dumps(list(graph), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def graph_from_payload(
+    payload: Union[bytes, GraphSnapshot, None],
+) -> Optional[Graph]:
+    """Restore a graph encoded by graph_payload."""
+    if payload is None:
+        return None
+    if isinstance(payload, GraphSnapshot):
+        return payload.graph()
+    graph = Graph()
+    graph.addN((s, p, o, graph) for s, p, o in pickle.loads(payload))
+    return graph
+
+
+def engine_payload(engine: Union[ScoringEngine, PathLike]) -> Union[bytes, str]:
+    """Encode an engine, or the path of its artefact, for a pool initializer."""
+    if isinstance(engine, ScoringEngine):
+        return pickle.dumps(engine, protocol=pickle.HIGHEST_PROTOCOL)
+    return os.fspath(engine)
+
+
+def engine_from_payload(payload: Union[bytes, str]) -> ScoringEngine:
+    """Restore an engine encoded by engine_payload."""
+    if isinstance(payload, bytes):
+        return pickle.loads(payload)
+    from .artifact import load_engine
+
+    return load_engine(payload)
+
+
+def _as_graph(graph: Union[Graph, GraphSnapshot, None]) -> Optional[Graph]:
+    """Return a graph, or the Graph view of a snapshot."""
+    return graph.graph() if isinstance(graph, GraphSnapshot) else graph
+
+
+def _init_worker(
+    engine: Union[bytes, str],
+    data_graph: Union[bytes, GraphSnapshot, None],
+    shapes_graph: Union[bytes, GraphSnapshot, None],
+) -> None:
+    """Pool initializer: build the worker's scoring state once."""
+    global _worker_engine, _worker_data_graph, _worker_shapes_graph
+    _worker_engine = engine_from_payload(engine)
+    _worker_data_graph = graph_from_payload(data_graph)
+    _worker_shapes_graph = graph_from_payload(shapes_graph)
+
+
+def score_chunk(
+    engine: ScoringEngine,
+    focus_nodes: List[Node],
+    data_graph: Graph,
+    constraint_shape: Optional[Union[URIRef, BNode]],
+    shapes_graph: Optional[Graph],
+) -> ChunkResult:
+    """Score a chunk of focus nodes and return compact results."""
+    results = engine.score_batch(
+        focus_nodes,
+        data_graph=data_graph,
+        constraint_shape=constraint_shape,
+        shapes_graph=shapes_graph,
+    )
+    return [
+        tuple((ws.widget, ws.score, ws.source) for ws in result.widget_scores)
+        for result in results
+    ]
+
+
+def _score_chunk_in_worker(
+    focus_nodes: List[Node], constraint_shape: Optional[Union[URIRef, BNode]]
+) -> ChunkResult:
+    """Pool task: score a chunk with the worker's scoring state."""
+    assert _worker_engine is not None and _worker_data_graph is not None
+    return score_chunk(
+        _worker_engine,
+        focus_nodes,
+        _worker_data_graph,
+        constraint_shape,
+        _worker_shapes_graph,
+    )
+
+
+@lru_cache(maxsize=4096)
+def _widget_score(widget: Any, score: Any, source: Any) -> WidgetScore:
+    """Return a shared WidgetScore, so results from workers do not each allocate one."""
+    return WidgetScore(widget=widget, score=score, source=source)
+
+
+def result_from_chunk_entry(entry: Tuple[Tuple[Any, Any, Any], ...]) -> ScoringResult:
+    """Build a ScoringResult from one entry of a ChunkResult."""
+    return ScoringResult(
+        widget_scores=[
+            _widget_score(widget, score, source) for widget, score, source in entry
+        ]
+    )
+
+
+def chunked(items: Iterable[Node], chunk_size: int) -> Iterator[List[Node]]:
+    """Split an iterable into lists of at most chunk_size items."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def stream_chunks(
+    submit,
+    focus_nodes: Iterable[Node],
+    chunk_size: int,
+    max_pending: int,
+    ordered: bool,
+) -> Iterator[Tuple[Node, ScoringResult]]:
+    """
+    Submit chunks of focus nodes and yield their results as they complete.
+
+    At most max_pending chunks are in flight, so focus nodes are consumed
+    lazily and memory stays bounded for arbitrarily long inputs.
+
+    Args:
+        submit: Called with a chunk, returns a Future of its ChunkResult
+        focus_nodes: The focus nodes to score
+        chunk_size: Number of focus nodes per task
+        max_pending: Maximum number of chunks in flight
+        ordered: Yield results in input order instead of completion order
+
+    Yields:
+        (focus_node, ScoringResult) pairs
+    """
+    chunks = chunked(focus_nodes, chunk_size)
+    pending: Deque[Tuple[List[Node], Future]] = deque()
+
+    def fill() -> None:
+        while len(pending) < max_pending:
+            chunk = next(chunks, None)
+            if chunk is None:
+                return
+            pending.append((chunk, submit(chunk)))
+
+    fill()
+    while pending:
+        if ordered:
+            chunk, future = pending.popleft()
+        else:
+            done, _ = wait([f for _, f in pending], return_when=FIRST_COMPLETED)
+            index = next(i for i, (_, f) in enumerate(pending) if f in done)
+            chunk, future = pending[index]
+            del pending[index]
+        entries = future.result()
+        fill()
+        for focus_node, entry in zip(chunk, entries):
+            yield focus_node, result_from_chunk_entry(entry)
+
+
+class PoolScorer(abc.ABC):
+    """
+    Base class of the pool scorers: splits focus nodes into chunks, submits
+    them to an executor and streams the results back.
+
+    Subclasses create self._executor and implement _submit.
+
+    Args:
+        max_workers: Number of workers; defaults to the CPU count
+        chunk_size: Number of focus nodes per task. Larger chunks amortise
+            task overhead and batch validation runs; smaller chunks balance
+            load and stream results sooner.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 1000):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Executor
+
+    @abc.abstractmethod
+    def _submit(
+        self, chunk: List[Node], constraint_shape: Optional[Union[URIRef, BNode]]
+    ) -> Future:
+        """Submit a chunk to the executor, returning a Future of its ChunkResult."""
+
+    def score_iter(
+        self,
+        focus_nodes: Iterable[Node],
+        constraint_shape: Optional[Union[URIRef, BNode]] = None,
+        ordered: bool = True,
+    ) -> Iterator[Tuple[Node, ScoringResult]]:
+        """
+        Score focus nodes on the pool, streaming the results.
+
+        Args:
+            focus_nodes: The focus nodes to score; consumed lazily
+            constraint_shape: The SHACL shape constraining every focus node
+                (optional; requires a shapes graph)
+            ordered: Yield results in input order; when False, chunks are
+                yielded as soon as they complete
+
+        Yields:
+            (focus_node, ScoringResult) pairs
+        """
+        return stream_chunks(
+            lambda chunk: self._submit(chunk, constraint_shape),
+            focus_nodes,
+            self.chunk_size,
+            self.max_workers * 2,
+            ordered,
+        )
+
+    def score(
+        self,
+        focus_nodes: Iterable[Node],
+        constraint_shape: Optional[Union[URIRef, BNode]] = None,
+    ) -> List[ScoringResult]:
+        """Score focus nodes on the pool, returning results in input order."""
+        return [result for _, result in self.score_iter(focus_nodes, constraint_shape)]
+
+    def close(self) -> None:
+        """Shut down the pool."""
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ThreadPoolScorer(PoolScorer):
+    """
+    Score large numbers of focus nodes on a pool of threads sharing one engine.
+
+    Threads only run in parallel on the free-threaded build, or while pyshacl
+    releases the GIL; this scorer is the baseline for the process and
+    interpreter pools.
+
+    Args:
+        engine: A compiled engine, or the path of an engine artefact
+        data_graph: The data graph containing the focus nodes, or a
+            GraphSnapshot of it
+        shapes_graph: The shapes graph containing constraint shapes, or a
+            GraphSnapshot of it (optional)
+        max_workers: Number of threads; defaults to the CPU count
+        chunk_size: Number of focus nodes per task
+    """
+
+    def __init__(
+        self,
+        engine: Union[ScoringEngine, PathLike],
+        data_graph: Union[Graph, GraphSnapshot],
+        shapes_graph: Union[Graph, GraphSnapshot, None] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 1000,
+    ):
+        super().__init__(max_workers, chunk_size)
+        if not isinstance(engine, ScoringEngine):
+            engine = engine_from_payload(os.fspath(engine))
+        self.engine = engine
+        self.data_graph = _as_graph(data_graph)
+        self.shapes_graph = _as_graph(shapes_graph)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _submit(
+        self, chunk: List[Node], constraint_shape: Optional[Union[URIRef, BNode]]
+    ) -> Future:
+        return self._executor.submit(
+            score_chunk,
+            self.engine,
+            chunk,
+            self.data_graph,
+            constraint_shape,
+            self.shapes_graph,
+        )
+
+
+class ProcessPoolScorer(PoolScorer):
+    """
+    Score large numbers of focus nodes on a pool of worker processes.
+
+    The engine and graphs are sent to each worker once, by the pool
+    initializer; tasks only carry chunks of focus nodes. Use as a context
+    manager, or call close() when done.
+
+    Args:
+        engine: A compiled engine, or the path of an engine artefact (see
+            shui_widget_scoring.artifact), which workers load themselves
+        data_graph: The data graph containing the focus nodes, or a
+            GraphSnapshot of it, which workers attach to without copying
+        shapes_graph: The shapes graph containing constraint shapes, or a
+            GraphSnapshot of it (optional)
+        max_workers: Number of worker processes; defaults to the CPU count
+        chunk_size: Number of focus nodes per task. Larger chunks amortise
+            task overhead and batch validation runs; smaller chunks balance
+            load and stream results sooner.
+        mp_context: Optional multiprocessing context for the pool
+    """
+
+    def __init__(
+        self,
+        engine: Union[ScoringEngine, PathLike],
+        data_graph: Union[Graph, GraphSnapshot],
+        shapes_graph: Union[Graph, GraphSnapshot, None] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 1000,
+        mp_context=None,
+    ):
+        super().__init__(max_workers, chunk_size)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(
+                engine_payload(engine),
+                graph_payload(data_graph),
+                graph_payload(shapes_graph),
+            ),
+        )
+
+    def _submit(
+        self, chunk: List[Node], constraint_shape: Optional[Union[URIRef, BNode]]
+    ) -> Future:
+        return self._executor.submit(_score_chunk_in_worker, chunk, constraint_shape)
+
+
+def interpreters_available() -> bool:
+    """Check whether this Python provides InterpreterPoolExecutor (3.14+)."""
+    return hasattr(concurrent.futures, "InterpreterPoolExecutor")
+
+
+class InterpreterPoolScorer(PoolScorer):
+    """
+    Score large numbers of focus nodes on a pool of subinterpreters.
+
+    Each interpreter imports the package and builds its own engine once, in
+    the pool initializer, like the workers of ProcessPoolScorer; focus nodes
+    and results cross interpreter boundaries as compact pickled tuples. Pass
+    an artefact path, so each interpreter loads the compiled engine instead
+    of unpickling a copy sent by the caller, and a GraphSnapshot, so the
+    interpreters share one copy of the data graph.
+
+    Requires Python 3.14. Every module imported while scoring must support
+    subinterpreters; with the pyshacl backend that includes pyshacl's
+    dependencies.
+
+    Args:
+        engine: A compiled engine, or the path of an engine artefact
+        data_graph: The data graph containing the focus nodes, or a
+            GraphSnapshot of it
+        shapes_graph: The shapes graph containing constraint shapes, or a
+            GraphSnapshot of it (optional)
+        max_workers: Number of interpreters; defaults to the CPU count
+        chunk_size: Number of focus nodes per task
+
+    Raises:
+        ImportError: If this Python has no InterpreterPoolExecutor
+    """
+
+    def __init__(
+        self,
+        engine: Union[ScoringEngine, PathLike],
+        data_graph: Union[Graph, GraphSnapshot],
+        shapes_graph: Union[Graph, GraphSnapshot, None] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 1000,
+    ):
+        if not interpreters_available():
+            raise ImportError("InterpreterPoolScorer requires Python 3.14 or later")
+        super().__init__(max_workers, chunk_size)
+        self._executor = concurrent.futures.InterpreterPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(
+                engine_payload(engine),
+                graph_payload(data_graph),
+                graph_payload(shapes_graph),
+            ),
+        )
+
+    def _submit(
+        self, chunk: List[Node], constraint_shape: Optional[Union[URIRef, BNode]]
+    ) -> Future:
+        return self._executor.submit(_score_chunk_in_worker, chunk, constraint_shape)
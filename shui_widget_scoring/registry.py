@@ -0,0 +1,279 @@
+"""A registry of compiled engines shared across tenants.
+
+EngineRegistry maps keys, typically fingerprints of the scoring graphs, to
+compiled engines. Engines are built once, even when many threads ask for the
+same key at the same time, and the least recently used engines are evicted
+once their estimated memory use exceeds a budget.
+"""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Tuple
+
+from rdflib import Graph
+
+from .artifact import graph_fingerprint
+from .engine import ScoringEngine
+
+# Rough per-item memory costs used by estimate_engine_size, in bytes
+TRIPLE_SIZE = 600
+SCORE_SIZE = 1024
+CACHE_ENTRY_SIZE = 256
+DISPATCH_ENTRY_SIZE = 128
+
+
+def estimate_engine_size(engine: ScoringEngine) -> int:
+    """
+    Estimate the memory held by a compiled engine, in bytes.
+
+    Counts the triples of each distinct shapes graph, the Score table, the
+    datatype dispatch table and the current literal cache entries. The
+    estimate is meant for relative budgeting, not exact accounting.
+    """
+    graphs = {
+        id(graph): graph
+        for graph in (
+            engine.widget_scoring_graph,
+            engine.data_graph_shapes_graph,
+            engine.shapes_graph_shapes_graph,
+        )
+    }
+    size = sum(len(graph) for graph in graphs.values()) * TRIPLE_SIZE
+    size += len(engine.score_instances) * SCORE_SIZE
+    if engine.datatype_dispatch is not None:
+        size += (
+            sum(len(scores) for scores in engine.datatype_dispatch.values())
+            * DISPATCH_ENTRY_SIZE
+        )
+    size += len(engine.literal_verdicts) * CACHE_ENTRY_SIZE
+    return size
+
+
+@dataclass
+class TenantStats:
+    """
+    Registry statistics for one tenant.
+
+    Attributes:
+        hits: Lookups answered by a registered engine
+        misses: Lookups that had to build an engine, or wait for another
+            thread's build of it
+        builds: Engines built for the tenant
+        build_seconds: Total time spent building the tenant's engines
+        errors: Builds that raised
+    """
+
+    hits: int = 0
+    misses: int = 0
+    builds: int = 0
+    build_seconds: float = 0.0
+    errors: int = 0
+
+
+@dataclass
+class _Entry:
+    engine: ScoringEngine
+    size: int = field(default=0)
+    cache_entries: int = field(default=0)
+
+    @property
+    def current_size(self) -> int:
+        """The size estimated at build time plus literal cache growth since."""
+        grown = len(self.engine.literal_verdicts) - self.cache_entries
+        return self.size + max(grown, 0) * CACHE_ENTRY_SIZE
+
+
+class EngineRegistry:
+    """
+    Compiled engines by key, with LRU eviction under a memory budget.
+
+    Args:
+        memory_budget: Maximum estimated memory of the registered engines, in
+            bytes. The most recently used engine is never evicted, even when
+            it alone exceeds the budget.
+        estimate: Function estimating an engine's memory use. It is called
+            once per build, outside the registry lock; literal cache entries
+            added afterwards count CACHE_ENTRY_SIZE each.
+    """
+
+    def __init__(
+        self,
+        memory_budget: int = 512 * 1024 * 1024,
+        estimate: Callable[[ScoringEngine], int] = estimate_engine_size,
+    ):
+        self.memory_budget = memory_budget
+        self.estimate = estimate
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._building: Dict[Hashable, Future] = {}
+        self._tenants: Dict[Hashable, TenantStats] = {}
+        self._fingerprints: Dict[int, Tuple[weakref.ref, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: Hashable,
+        build: Callable[[], ScoringEngine],
+        tenant: Hashable = None,
+    ) -> ScoringEngine:
+        """
+        Return the engine registered under key, building it if needed.
+
+        Concurrent calls for a key that is not registered yet share a single
+        build. If the build raises, every waiting caller receives the error and
+        nothing is registered.
+
+        Args:
+            key: The engine's key, such as a fingerprint of its scoring graphs
+            build: Builds the engine on a miss
+            tenant: Tenant to attribute the lookup to in the statistics
+
+        Returns:
+            The compiled engine
+        """
+        with self._lock:
+            stats = self._tenants.setdefault(tenant, TenantStats())
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                stats.hits += 1
+                return entry.engine
+            stats.misses += 1
+            future = self._building.get(key)
+            owner = future is None
+            if owner:
+                future = self._building[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        start = time.perf_counter()
+        try:
+            engine = build()
+            elapsed = time.perf_counter() - start
+            entry = _Entry(engine, self.estimate(engine), len(engine.literal_verdicts))
+        except BaseException as e:
+            with self._lock:
+                stats.errors += 1
+                del self._building[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            stats.builds += 1
+            stats.build_seconds += elapsed
+            self._entries[key] = entry
+            del self._building[key]
+            self._evict()
+        future.set_result(engine)
+        return engine
+
+    def get_for_graphs(
+        self,
+        widget_scoring_graph: Graph,
+        data_graph_shapes_graph: Graph,
+        shapes_graph_shapes_graph: Graph,
+        tenant: Hashable = None,
+        **engine_kwargs,
+    ) -> ScoringEngine:
+        """
+        Return the engine for a set of scoring graphs, keyed by their fingerprints.
+
+        Graphs with the same content share an engine, whichever tenant sent
+        them. Fingerprinting reads every triple, so a graph's fingerprint is
+        reused while the same graph object keeps its triple count. An edit that
+        leaves the count unchanged is not noticed; callers that edit graphs in
+        place, or already know a version or content hash of their graphs,
+        should use get with their own key.
+
+        Args:
+            widget_scoring_graph: Graph containing shui:Score instances
+            data_graph_shapes_graph: Graph containing dataGraphShape definitions
+            shapes_graph_shapes_graph: Graph containing shapesGraphShape
+                definitions
+            tenant: Tenant to attribute the lookup to in the statistics
+            **engine_kwargs: Passed to ScoringEngine when building
+
+        Returns:
+            The compiled engine
+        """
+        graphs = (
+            widget_scoring_graph,
+            data_graph_shapes_graph,
+            shapes_graph_shapes_graph,
+        )
+        fingerprints: Dict[int, str] = {}
+        for graph in graphs:
+            if id(graph) not in fingerprints:
+                fingerprints[id(graph)] = self._fingerprint(graph)
+        key = (
+            tuple(fingerprints[id(graph)] for graph in graphs),
+            tuple(sorted(engine_kwargs.items())),
+        )
+        return self.get(key, lambda: ScoringEngine(*graphs, **engine_kwargs), tenant)
+
+    def _fingerprint(self, graph: Graph) -> str:
+        """Return a graph's fingerprint, reusing it while its size is unchanged."""
+        # Not under the registry lock: a graph freed by an eviction runs forget
+        # while the lock is held. Single dict operations are atomic, and a lost
+        # race only costs a recomputed fingerprint.
+        key = id(graph)
+        size = len(graph)
+        cached = self._fingerprints.get(key)
+        if cached is not None and cached[0]() is graph and cached[1] == size:
+            return cached[2]
+
+        fingerprint = graph_fingerprint(graph)
+
+        def forget(ref: weakref.ref) -> None:
+            # The id may already belong to a newer graph with its own entry
+            if self._fingerprints.get(key, (None,))[0] is ref:
+                self._fingerprints.pop(key, None)
+
+        self._fingerprints[key] = (weakref.ref(graph, forget), size, fingerprint)
+        return fingerprint
+
+    def _evict(self) -> None:
+        """Evict least recently used engines until within budget; holds the lock."""
+        sizes = {key: entry.current_size for key, entry in self._entries.items()}
+        total = sum(sizes.values())
+        while total > self.memory_budget and len(self._entries) > 1:
+            key, _ = self._entries.popitem(last=False)
+            total -= sizes[key]
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Remove the engine registered under key; return whether one was."""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def memory_used(self) -> int:
+        """Estimated memory of the registered engines."""
+        with self._lock:
+            return sum(entry.current_size for entry in self._entries.values())
+
+    def stats(self) -> Dict[Hashable, TenantStats]:
+        """Return a copy of the statistics of every tenant."""
+        with self._lock:
+            return {
+                tenant: TenantStats(**vars(stats))
+                for tenant, stats in self._tenants.items()
+            }
+
+    def tenant_stats(self, tenant: Hashable) -> TenantStats:
+        """Return a copy of one tenant's statistics."""
+        with self._lock:
+            return TenantStats(**vars(self._tenants.get(tenant, TenantStats())))
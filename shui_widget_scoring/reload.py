@@ -0,0 +1,192 @@
+"""Hot reload of scoring engines from RDF files.
+
+FileEngineSource compiles an engine from the widget scoring, dataGraphShape
+and shapesGraphShape files and recompiles it when they change. Changes are
+detected by modification time and size, then confirmed by content hash, and
+the new engine is compiled off the request path and swapped in with a single
+reference assignment. Callers that read source.engine once per request keep
+scoring with the engine they read, so a swap never affects calls in flight.
+A source that fails to parse or meta-validate leaves the previous engine in
+place and is reported through last_error and the logger.
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+from rdflib import Graph
+
+from .artifact import PathLike, file_fingerprint
+from .engine import ScoringEngine
+
+# (mtime_ns, size) of a source file
+FileStat = Tuple[int, int]
+
+
+class FileEngineSource:
+    """
+    A compiled engine that follows changes to its source files.
+
+    The engine is compiled once on construction, and errors in the initial
+    sources are raised. Afterwards check() recompiles the engine when the
+    files' content changed, and start() runs check() periodically on a
+    background thread.
+
+    Args:
+        widget_scoring_path: File containing shui:Score instances
+        data_graph_shapes_path: File containing dataGraphShape definitions;
+            defaults to the widget scoring file
+        shapes_graph_shapes_path: File containing shapesGraphShape definitions;
+            defaults to the widget scoring file
+        format: RDF format of the source files; guessed from the file
+            extension when None
+        logger: Optional logger for the engine and reload reports
+        backend: Evaluation backend of the engine, as for ScoringEngine
+
+    Raises:
+        MalformedScoreError: If a Score instance in the initial sources is
+            malformed
+    """
+
+    def __init__(
+        self,
+        widget_scoring_path: PathLike,
+        data_graph_shapes_path: Optional[PathLike] = None,
+        shapes_graph_shapes_path: Optional[PathLike] = None,
+        format: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+        backend: Optional[str] = None,
+    ):
+        self.paths = {
+            "widget_scoring_graph": widget_scoring_path,
+            "data_graph_shapes_graph": data_graph_shapes_path or widget_scoring_path,
+            "shapes_graph_shapes_graph": shapes_graph_shapes_path
+            or widget_scoring_path,
+        }
+        self.format = format
+        self.logger = logger
+        self.backend = backend
+
+        self.generation = 0
+        self.last_error: Optional[Exception] = None
+
+        # Serialises checks, so only one compile runs at a time
+        self._check_lock = threading.Lock()
+        self._stats = self._stat()
+        self._sources = self._fingerprint()
+        self._failed_sources: Optional[Dict[str, str]] = None
+        self._engine = self._compile()
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def engine(self) -> ScoringEngine:
+        """The current engine; read it once per request and score with that."""
+        return self._engine
+
+    def _stat(self) -> Dict[str, FileStat]:
+        stats = {}
+        for path in self.paths.values():
+            key = os.fspath(path)
+            if key not in stats:
+                st = os.stat(path)
+                stats[key] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def _fingerprint(self) -> Dict[str, str]:
+        return {os.fspath(path): file_fingerprint(path) for path in self.paths.values()}
+
+    def _compile(self) -> ScoringEngine:
+        """Parse each distinct file once and compile the engine."""
+        graphs: Dict[str, Graph] = {}
+        for path in self.paths.values():
+            key = os.fspath(path)
+            if key not in graphs:
+                graphs[key] = Graph().parse(path, format=self.format)
+        return ScoringEngine(
+            *(graphs[os.fspath(path)] for path in self.paths.values()),
+            logger=self.logger,
+            backend=self.backend,
+        )
+
+    def check(self) -> bool:
+        """
+        Recompile and swap the engine if the source files changed.
+
+        Files whose modification time and size are unchanged are not read.
+        Otherwise their content hash decides whether to recompile, so touched
+        but unchanged files cost one read. Sources that failed to compile are
+        not retried until their content changes again.
+
+        Returns:
+            True if a new engine was swapped in
+        """
+        with self._check_lock:
+            sources = None
+            try:
+                stats = self._stat()
+                if stats == self._stats:
+                    return False
+                sources = self._fingerprint()
+                self._stats = stats
+                if sources == self._sources or sources == self._failed_sources:
+                    return False
+                engine = self._compile()
+            except Exception as e:
+                # Missing files, parse errors and malformed Scores all keep
+                # the previous engine serving
+                self._failed_sources = sources
+                self.last_error = e
+                if self.logger:
+                    self.logger.error(f"Keeping the previous scoring engine: {e}")
+                return False
+
+            self._sources = sources
+            self._failed_sources = None
+            self.last_error = None
+            self._engine = engine
+            self.generation += 1
+            if self.logger:
+                self.logger.info(
+                    f"Reloaded scoring engine (generation {self.generation})"
+                )
+            return True
+
+    def check_in_background(self) -> "Future[bool]":
+        """Run check() on a new thread and return a Future of its result."""
+        future: "Future[bool]" = Future()
+
+        def run() -> None:
+            future.set_result(self.check())
+
+        threading.Thread(target=run, name="shui-reload-check", daemon=True).start()
+        return future
+
+    def start(self, interval: float = 1.0) -> None:
+        """Check the source files every interval seconds on a background thread."""
+        if self._thread is not None:
+            raise RuntimeError("FileEngineSource is already watching its files")
+        self._stop.clear()
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                self.check()
+
+        self._thread = threading.Thread(target=run, name="shui-reload", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the background thread started by start()."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FileEngineSource":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,400 @@
+"""A JSON scoring service on the standard library HTTP server.
+
+Engines are compiled, or loaded from artefacts, once at startup. Requests
+carry the data (and shapes) graph as Turtle or N-Triples fragments, and terms
+in N-Triples syntax (<http://example.org/a>, "text"@en, "1"^^<...#integer>).
+
+Endpoints:
+    POST /score         {"focus_node", "data", ["constraint_shape", "shapes",
+                         "format", "engine"]} -> {"widgets": [...]}
+    POST /score/batch   {"focus_nodes": [...], "data", ...} -> {"results": [...]}
+    GET  /metrics       request counts, latencies and engine cache statistics
+    GET  /health        {"status": "ok", "engines": [...]}
+
+Run with:
+    python -m shui_widget_scoring.server --engine scores.ttl --port 8080
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple, Union
+
+from rdflib import Graph, URIRef, BNode, Literal
+from rdflib.util import from_n3
+
+from .artifact import load_engine_source
+from .engine import ScoringEngine
+from .exceptions import ShuiWidgetScoringError
+from .models import ScoringResult, score_to_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENGINE = "default"
+
+# Maximum accepted request body, in bytes
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+# Formats accepted for graph fragments. Other rdflib parsers can fetch remote
+# documents (JSON-LD contexts) or expand XML entities, so they are not exposed
+GRAPH_FORMATS = frozenset({"turtle", "nt", "ntriples"})
+
+
+class RequestError(Exception):
+    """A client error, reported with its HTTP status."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        self.status = status
+        super().__init__(message)
+
+
+def parse_term(value: Any, name: str) -> Union[URIRef, BNode, Literal]:
+    """Parse a term in N-Triples syntax."""
+    if not isinstance(value, str):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"{name} must be a string")
+    # from_n3 also accepts bare words and prefixed names, which are ambiguous here
+    if not value.startswith(("<", '"', "_:")):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid {name} {value!r}")
+    try:
+        term = from_n3(value)
+    except Exception as e:
+        raise RequestError(
+            HTTPStatus.BAD_REQUEST, f"Invalid {name} {value!r}: {e}"
+        ) from e
+    if not isinstance(term, (URIRef, BNode, Literal)):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid {name} {value!r}")
+    return term
+
+
+def parse_graph(data: Any, format: str, name: str) -> Graph:
+    """Parse a Turtle or N-Triples fragment."""
+    if not isinstance(data, str):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"{name} must be a string")
+    if format not in GRAPH_FORMATS:
+        raise RequestError(
+            HTTPStatus.BAD_REQUEST,
+            f"Unsupported format {format!r}; use one of {sorted(GRAPH_FORMATS)}",
+        )
+    try:
+        return Graph().parse(data=data, format=format)
+    except Exception as e:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid {name}: {e}") from e
+
+
+def body_length(value: Optional[str]) -> int:
+    """Parse a Content-Length header, rejecting invalid and oversized bodies."""
+    if value is None:
+        return 0
+    try:
+        length = int(value)
+    except ValueError:
+        raise RequestError(
+            HTTPStatus.BAD_REQUEST, f"Invalid Content-Length {value!r}"
+        ) from None
+    if length < 0:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid Content-Length {value!r}")
+    if length > MAX_BODY_SIZE:
+        raise RequestError(
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large"
+        )
+    return length
+
+
+def result_to_json(result: ScoringResult) -> Dict[str, Any]:
+    """Encode a ScoringResult as JSON."""
+    return {
+        "widgets": [
+            {"widget": ws.widget.n3(), "score": score_to_json(ws.score)}
+            for ws in result.widget_scores
+        ]
+    }
+
+
+class Metrics:
+    """
+    Thread-safe request counts and latencies per endpoint.
+
+    Args:
+        window: Number of recent latencies kept per endpoint for percentiles
+    """
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._window = window
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    def record(self, endpoint: str, status: int, seconds: float) -> None:
+        """Record a handled request."""
+        with self._lock:
+            counts = self._counts.setdefault(endpoint, {"requests": 0, "errors": 0})
+            counts["requests"] += 1
+            if status >= 400:
+                counts["errors"] += 1
+            self._latencies.setdefault(endpoint, deque(maxlen=self._window)).append(
+                seconds
+            )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return counts and latency percentiles (in milliseconds) per endpoint."""
+        with self._lock:
+            report = {}
+            for endpoint, counts in self._counts.items():
+                latencies = sorted(self._latencies[endpoint])
+                report[endpoint] = {
+                    **counts,
+                    "latency_ms": {
+                        "p50": _percentile(latencies, 0.5) * 1000,
+                        "p95": _percentile(latencies, 0.95) * 1000,
+                        "p99": _percentile(latencies, 0.99) * 1000,
+                        "max": latencies[-1] * 1000,
+                    },
+                }
+            return report
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Return a percentile of sorted, non-empty values (nearest rank)."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class ScoringService:
+    """
+    Transport-independent request handling for the scoring server.
+
+    Args:
+        engines: Compiled engines by name; requests without an "engine" field
+            use the engine named "default", or the only engine
+    """
+
+    def __init__(self, engines: Mapping[str, ScoringEngine]):
+        if not engines:
+            raise ValueError("At least one engine is required")
+        self.engines = dict(engines)
+        self.metrics = Metrics()
+
+    def handle(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        """
+        Handle a request.
+
+        Returns:
+            The HTTP status and the JSON response body
+        """
+        start = time.perf_counter()
+        route = {
+            ("POST", "/score"): self._score,
+            ("POST", "/score/batch"): self._score_batch,
+            ("GET", "/metrics"): self._metrics,
+            ("GET", "/health"): self._health,
+        }.get((method, path))
+        try:
+            if route is None:
+                raise RequestError(
+                    HTTPStatus.NOT_FOUND, f"No route for {method} {path}"
+                )
+            status, response = HTTPStatus.OK, route(body)
+        except RequestError as e:
+            status, response = e.status, {"error": str(e)}
+        except ShuiWidgetScoringError as e:
+            status, response = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception:
+            logger.exception(f"Error handling {method} {path}")
+            status, response = (
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+                {"error": "Internal server error"},
+            )
+        if route is not None:
+            self.metrics.record(path, status, time.perf_counter() - start)
+        return int(status), response
+
+    def _request(self, body: bytes) -> Dict[str, Any]:
+        """Decode a JSON request body."""
+        try:
+            request = json.loads(body)
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}") from e
+        if not isinstance(request, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Request must be a JSON object")
+        return request
+
+    def _engine(self, request: Dict[str, Any]) -> ScoringEngine:
+        """Return the engine a request asks for."""
+        name = request.get("engine")
+        if name is None:
+            if len(self.engines) == 1:
+                return next(iter(self.engines.values()))
+            name = DEFAULT_ENGINE
+        engine = self.engines.get(name)
+        if engine is None:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"Unknown engine {name!r}")
+        return engine
+
+    def _graphs(
+        self, request: Dict[str, Any]
+    ) -> Tuple[Graph, Optional[URIRef], Optional[Graph]]:
+        """Parse the data graph, constraint shape and shapes graph of a request."""
+        format = request.get("format", "turtle")
+        if "data" not in request:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "data is required")
+        data_graph = parse_graph(request["data"], format, "data")
+
+        constraint_shape = None
+        shapes_graph = None
+        if request.get("constraint_shape") is not None:
+            constraint_shape = parse_term(
+                request["constraint_shape"], "constraint_shape"
+            )
+        if request.get("shapes") is not None:
+            shapes_graph = parse_graph(request["shapes"], format, "shapes")
+        return data_graph, constraint_shape, shapes_graph
+
+    def _score(self, body: bytes) -> Dict[str, Any]:
+        request = self._request(body)
+        engine = self._engine(request)
+        if "focus_node" not in request:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "focus_node is required")
+        focus_node = parse_term(request["focus_node"], "focus_node")
+        data_graph, constraint_shape, shapes_graph = self._graphs(request)
+        result = engine.score(
+            focus_node,
+            data_graph=data_graph,
+            constraint_shape=constraint_shape,
+            shapes_graph=shapes_graph,
+        )
+        return result_to_json(result)
+
+    def _score_batch(self, body: bytes) -> Dict[str, Any]:
+        request = self._request(body)
+        engine = self._engine(request)
+        focus_nodes = request.get("focus_nodes")
+        if not isinstance(focus_nodes, list):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "focus_nodes must be a list")
+        focus_nodes = [parse_term(node, "focus_node") for node in focus_nodes]
+        data_graph, constraint_shape, shapes_graph = self._graphs(request)
+        results = engine.score_batch(
+            focus_nodes,
+            data_graph=data_graph,
+            constraint_shape=constraint_shape,
+            shapes_graph=shapes_graph,
+        )
+        return {"results": [result_to_json(result) for result in results]}
+
+    def _metrics(self, body: bytes) -> Dict[str, Any]:
+        return {
+            "endpoints": self.metrics.snapshot(),
+            "engines": {
+                name: {
+                    "scores": len(engine.score_instances),
+                    "literal_cache": engine.literal_verdicts.info(),
+                }
+                for name, engine in self.engines.items()
+            },
+        }
+
+    def _health(self, body: bytes) -> Dict[str, Any]:
+        return {"status": "ok", "engines": sorted(self.engines)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Adapts HTTP requests to the server's ScoringService."""
+
+    server: "ScoringServer"
+
+    def do_GET(self) -> None:
+        self._dispatch(b"")
+
+    def do_POST(self) -> None:
+        try:
+            length = body_length(self.headers.get("Content-Length"))
+        except RequestError as e:
+            # The unread body would be taken for the next request
+            self.close_connection = True
+            self._respond(e.status, {"error": str(e)})
+            return
+        self._dispatch(self.rfile.read(length))
+
+    def _dispatch(self, body: bytes) -> None:
+        status, response = self.server.service.handle(
+            self.command, self.path.split("?", 1)[0], body
+        )
+        self._respond(status, response)
+
+    def _respond(self, status: int, response: Dict[str, Any]) -> None:
+        payload = json.dumps(response).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format, *args)
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """A threading HTTP server answering requests with a ScoringService."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: ScoringService):
+        self.service = service
+        super().__init__(address, _Handler)
+
+
+def make_server(
+    engines: Union[ScoringEngine, Mapping[str, ScoringEngine]],
+    host: str = "127.0.0.1",
+    port: int = 8080,
+) -> ScoringServer:
+    """
+    Create a scoring server; call serve_forever() to start serving.
+
+    Args:
+        engines: A compiled engine, or compiled engines by name
+        host: Address to bind
+        port: Port to bind; 0 picks a free port (see server_address)
+
+    Returns:
+        The server
+    """
+    if isinstance(engines, ScoringEngine):
+        engines = {DEFAULT_ENGINE: engines}
+    return ScoringServer((host, port), ScoringService(engines))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve widget scoring over HTTP.")
+    parser.add_argument(
+        "--engine",
+        action="append",
+        required=True,
+        metavar="[NAME=]PATH",
+        help="Engine artefact or widget scoring graph file; repeat for several engines",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    engines = {}
+    for spec in args.engine:
+        name, path = spec.split("=", 1) if "=" in spec else (DEFAULT_ENGINE, spec)
+        engines[name] = load_engine_source(path)
+
+    logging.basicConfig(level=logging.INFO)
+    server = make_server(engines, args.host, args.port)
+    logger.info(f"Serving {sorted(engines)} on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
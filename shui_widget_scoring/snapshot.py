@@ -0,0 +1,391 @@
+"""Read-only graph snapshots in shared memory.
+
+A snapshot dictionary-encodes a graph into a single shared memory segment: a
+term table plus three sorted integer triple arrays (SPO, POS and OSP), so any
+triple pattern is answered by a binary search over one permutation. Worker
+processes attach to the segment by name and read it in place, without
+unpickling or copying the graph, so memory use stays flat as workers are
+added.
+
+Layout of the segment, in native byte order:
+
+    header      magic, term count, triple count, term table size (4 x 8 bytes)
+    offsets     term count + 1 int64 offsets into the term table
+    terms       the encoded terms, sorted, padded to 8 bytes
+    spo/pos/osp triple count x 3 int32 term ids each
+"""
+
+import struct
+from array import array
+from multiprocessing import shared_memory
+from typing import Iterator, Optional, Sequence, Tuple, Union
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.graph import ModificationException
+from rdflib.store import Store
+
+from .cache import LRUCache
+
+Node = Union[URIRef, BNode, Literal]
+Triple = Tuple[Node, Node, Node]
+Pattern = Tuple[Optional[Node], Optional[Node], Optional[Node]]
+
+MAGIC = b"SHUISNP\x00"
+
+_HEADER = struct.Struct("=8sqqq")
+_LENGTH = struct.Struct(">I")
+
+# Row layouts of the three permutations: positions of s, p and o in a row
+_SPO, _POS, _OSP = (0, 1, 2), (2, 0, 1), (1, 2, 0)
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to a multiple of 8 bytes."""
+    return (offset + 7) & ~7
+
+
+def encode_term(term: Node) -> bytes:
+    """
+    Encode an RDF term as bytes.
+
+    Encodings are unique per term, so the sorted encodings form the term
+    table and a term's id is found by binary search.
+
+    Raises:
+        ValueError: If the term is not an IRI, blank node or literal
+    """
+    if isinstance(term, Literal):
+        lexical = str(term).encode("utf-8")
+        datatype = str(term.datatype or "").encode("utf-8")
+        return (
+            b"L"
+            + _LENGTH.pack(len(lexical))
+            + lexical
+            + _LENGTH.pack(len(datatype))
+            + datatype
+            + (term.language or "").encode("utf-8")
+        )
+    if isinstance(term, URIRef):
+        return b"U" + str(term).encode("utf-8")
+    if isinstance(term, BNode):
+        return b"B" + str(term).encode("utf-8")
+    raise ValueError(f"Cannot snapshot term {term!r} of type {type(term).__name__}")
+
+
+def decode_term(data: bytes) -> Node:
+    """Decode a term encoded by encode_term."""
+    kind, body = data[:1], data[1:]
+    if kind == b"U":
+        return URIRef(body.decode("utf-8"))
+    if kind == b"B":
+        return BNode(body.decode("utf-8"))
+    (length,) = _LENGTH.unpack_from(body, 0)
+    offset = _LENGTH.size
+    lexical = body[offset : offset + length].decode("utf-8")
+    offset += length
+    (length,) = _LENGTH.unpack_from(body, offset)
+    offset += _LENGTH.size
+    datatype = body[offset : offset + length].decode("utf-8")
+    language = body[offset + length :].decode("utf-8")
+    return Literal(
+        lexical, datatype=URIRef(datatype) if datatype else None, lang=language or None
+    )
+
+
+class GraphSnapshot:
+    """
+    A read-only, dictionary-encoded graph held in a shared memory segment.
+
+    Create a snapshot with GraphSnapshot.create in the parent process, and
+    attach to it by name with GraphSnapshot.attach in workers. Pickling a
+    snapshot only pickles its name, so snapshots can be passed to pool
+    initializers. The creating process owns the segment and unlinks it on
+    close().
+
+    Args:
+        segment: The shared memory segment holding the snapshot
+        owner: Whether close() also unlinks the segment
+        term_cache_size: Maximum number of decoded terms cached per process
+    """
+
+    def __init__(
+        self,
+        segment: shared_memory.SharedMemory,
+        owner: bool = False,
+        term_cache_size: int = 65536,
+    ):
+        self._segment = segment
+        self.owner = owner
+        self._terms_cache = LRUCache(maxsize=term_cache_size)
+
+        buffer = segment.buf
+        magic, num_terms, num_triples, terms_size = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory segment {segment.name} is not a snapshot")
+        self.num_terms = num_terms
+        self.num_triples = num_triples
+
+        offset = _HEADER.size
+        size = (num_terms + 1) * 8
+        self._offsets = buffer[offset : offset + size].cast("q")
+        offset += size
+        self._terms = buffer[offset : offset + terms_size]
+        offset = _align(offset + terms_size)
+        size = num_triples * 3 * 4
+        self._permutations = {}
+        for layout in (_SPO, _POS, _OSP):
+            self._permutations[layout] = buffer[offset : offset + size].cast("i")
+            offset += size
+
+    @classmethod
+    def create(
+        cls, graph: Graph, name: Optional[str] = None, term_cache_size: int = 65536
+    ) -> "GraphSnapshot":
+        """
+        Snapshot a graph into a new shared memory segment.
+
+        Args:
+            graph: The graph to snapshot
+            name: Name of the segment; a unique name is generated when None
+            term_cache_size: Maximum number of decoded terms cached per process
+
+        Returns:
+            The snapshot, owning its segment
+
+        Raises:
+            ValueError: If the graph contains terms other than IRIs, blank
+                nodes and literals
+        """
+        encodings = {}
+        for triple in graph:
+            for term in triple:
+                if term not in encodings:
+                    encodings[term] = encode_term(term)
+        table = sorted(encodings.values())
+        ids = {data: i for i, data in enumerate(table)}
+        rows = [tuple(ids[encodings[term]] for term in triple) for triple in graph]
+
+        offsets = array("q", [0])
+        for data in table:
+            offsets.append(offsets[-1] + len(data))
+        terms = b"".join(table)
+
+        permutations = []
+        for layout in (_SPO, _POS, _OSP):
+            # A row holds the ids of the positions in layout order
+            order = sorted(
+                tuple(row[layout.index(column)] for column in range(3)) for row in rows
+            )
+            permutations.append(array("i", [i for row in order for i in row]))
+
+        triples_offset = _align(_HEADER.size + len(offsets) * 8 + len(terms))
+        size = triples_offset + 3 * len(rows) * 3 * 4
+        segment = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+        try:
+            buffer = segment.buf
+            _HEADER.pack_into(buffer, 0, MAGIC, len(table), len(rows), len(terms))
+            offset = _HEADER.size
+            buffer[offset : offset + len(offsets) * 8] = offsets.tobytes()
+            offset += len(offsets) * 8
+            buffer[offset : offset + len(terms)] = terms
+            offset = triples_offset
+            for permutation in permutations:
+                data = permutation.tobytes()
+                buffer[offset : offset + len(data)] = data
+                offset += len(data)
+            del buffer
+            return cls(segment, owner=True, term_cache_size=term_cache_size)
+        except BaseException:
+            segment.close()
+            segment.unlink()
+            raise
+
+    @classmethod
+    def attach(cls, name: str, term_cache_size: int = 65536) -> "GraphSnapshot":
+        """Attach to the snapshot in a named shared memory segment, without copying."""
+        segment = shared_memory.SharedMemory(name=name, track=False)
+        return cls(segment, owner=False, term_cache_size=term_cache_size)
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory segment."""
+        return self._segment.name
+
+    def __reduce__(self):
+        return (GraphSnapshot.attach, (self.name, self._terms_cache.maxsize))
+
+    def __len__(self) -> int:
+        return self.num_triples
+
+    def graph(self) -> Graph:
+        """Return a read-only rdflib Graph backed by the snapshot."""
+        return Graph(store=SnapshotStore(self))
+
+    def term(self, term_id: int) -> Node:
+        """Return the term with the given id."""
+        term = self._terms_cache.get(term_id)
+        if term is None:
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            term = decode_term(bytes(self._terms[start:end]))
+            self._terms_cache.put(term_id, term)
+        return term
+
+    def term_id(self, term: Node) -> Optional[int]:
+        """Return the id of a term, or None if the snapshot does not contain it."""
+        try:
+            data = encode_term(term)
+        except ValueError:
+            return None
+        lo, hi = 0, self.num_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start, end = self._offsets[mid], self._offsets[mid + 1]
+            found = self._terms[start:end]
+            if found == data:
+                return mid
+            if bytes(found) < data:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _range(self, rows: memoryview, prefix: Sequence[int]) -> Tuple[int, int]:
+        """Return the range of rows of a permutation starting with prefix."""
+        k = len(prefix)
+        prefix = list(prefix)
+
+        def bound(upper: bool) -> int:
+            lo, hi = 0, self.num_triples
+            while lo < hi:
+                mid = (lo + hi) // 2
+                row = rows[mid * 3 : mid * 3 + k].tolist()
+                if row < prefix or (upper and row == prefix):
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo
+
+        return bound(False), bound(True)
+
+    def triple_ids(self, pattern: Pattern) -> Iterator[Tuple[int, int, int]]:
+        """Yield the (s, p, o) term ids of the triples matching a pattern."""
+        ids = []
+        for term in pattern:
+            if term is None:
+                ids.append(None)
+                continue
+            term_id = self.term_id(term)
+            if term_id is None:
+                return
+            ids.append(term_id)
+        s, p, o = ids
+
+        # Pick the permutation whose rows start with the bound positions
+        if s is not None:
+            if p is None and o is not None:
+                layout, prefix = _OSP, [o, s]
+            else:
+                layout, prefix = _SPO, [s] + ([p] if p is not None else [])
+                if p is not None and o is not None:
+                    prefix.append(o)
+        elif p is not None:
+            layout, prefix = _POS, [p] + ([o] if o is not None else [])
+        elif o is not None:
+            layout, prefix = _OSP, [o]
+        else:
+            layout, prefix = _SPO, []
+
+        rows = self._permutations[layout]
+        start, end = self._range(rows, prefix)
+        for i in range(start, end):
+            row = rows[i * 3 : i * 3 + 3]
+            yield row[layout[0]], row[layout[1]], row[layout[2]]
+
+    def triples(self, pattern: Pattern) -> Iterator[Triple]:
+        """Yield the triples matching a pattern."""
+        term = self.term
+        for s, p, o in self.triple_ids(pattern):
+            yield term(s), term(p), term(o)
+
+    def close(self) -> None:
+        """Detach from the segment, unlinking it if this snapshot owns it."""
+        if self._segment is None:
+            return
+        self._offsets.release()
+        self._terms.release()
+        for rows in self._permutations.values():
+            rows.release()
+        self._permutations = {}
+        self._segment.close()
+        if self.owner:
+            self._segment.unlink()
+        self._segment = None
+
+    def __enter__(self) -> "GraphSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SnapshotStore(Store):
+    """A read-only rdflib Store answering triple patterns from a GraphSnapshot."""
+
+    # pyshacl wraps data graphs in a Dataset, which needs a context and graph
+    # aware store; every triple is in the single default context
+    context_aware = True
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = True
+
+    def __init__(self, snapshot: GraphSnapshot):
+        super().__init__()
+        self.snapshot = snapshot
+        self._namespaces: dict = {}
+
+    def triples(self, triple_pattern, context=None):
+        for triple in self.snapshot.triples(triple_pattern):
+            yield triple, iter(())
+
+    def __len__(self, context=None) -> int:
+        return len(self.snapshot)
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def add(self, triple, context=None, quoted=False):
+        raise ModificationException()
+
+    def addN(self, quads):
+        raise ModificationException()
+
+    def remove(self, triple, context=None):
+        raise ModificationException()
+
+    def add_graph(self, graph):
+        raise ModificationException()
+
+    def remove_graph(self, graph):
+        raise ModificationException()
+
+    def bind(self, prefix, namespace, override=True):
+        if override or prefix not in self._namespaces:
+            self._namespaces[prefix] = namespace
+
+    def namespace(self, prefix):
+        return self._namespaces.get(prefix)
+
+    def prefix(self, namespace):
+        for prefix, bound in self._namespaces.items():
+            if bound == namespace:
+                return prefix
+        return None
+
+    def namespaces(self):
+        yield from self._namespaces.items()
+
+
+def snapshot_of(graph: Graph) -> Optional[GraphSnapshot]:
+    """Return the snapshot backing a graph, or None for other graphs."""
+    store = getattr(graph, "store", None)
+    return store.snapshot if isinstance(store, SnapshotStore) else None
@@ -3,14 +3,21 @@
 import logging
 import decimal
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Union
 
-import pyshacl
 from rdflib import Graph, URIRef, BNode, Literal
-from rdflib.namespace import RDF
+from rdflib.namespace import OWL, RDF, RDFS
 
 from .namespaces import SHUI, SH
 from .exceptions import MalformedScoreError
+from .views import union_graph
+
+
+def _pyshacl():
+    """Import pyshacl on first use, so code paths that never validate do not load it."""
+    import pyshacl
+
+    return pyshacl
 
 
 # Meta-shapes for validating shui:Score instances
@@ -94,12 +101,55 @@ def _node_exists_in_graph(node: Union[URIRef, BNode, Literal], graph: Graph) ->
     return False
 
 
+# Predicates that give a shape its own focus nodes, independent of sh:targetNode
+# triples added for a validation session
+TARGET_PREDICATES = (
+    SH.targetNode,
+    SH.targetClass,
+    SH.targetSubjectsOf,
+    SH.targetObjectsOf,
+    SH.target,
+)
+
+
+def has_declared_targets(shape_definitions_graph: Graph) -> bool:
+    """
+    Check whether any shape in the graph declares targets of its own.
+
+    Validation sessions run every shape in the shape definitions graph, so a
+    declared target makes the outcome for one focus node depend on nodes other
+    than that focus node. Implicit class targets (a shape that is also an
+    rdfs:Class or owl:Class) count as declared targets.
+
+    Args:
+        shape_definitions_graph: The graph containing the shape definitions
+
+    Returns:
+        True if any target declaration is present, False otherwise
+    """
+    for predicate in TARGET_PREDICATES:
+        if (None, predicate, None) in shape_definitions_graph:
+            return True
+
+    for class_type in (RDFS.Class, OWL.Class):
+        for subject in shape_definitions_graph.subjects(RDF.type, class_type):
+            if (subject, RDF.type, SH.NodeShape) in shape_definitions_graph or (
+                subject,
+                RDF.type,
+                SH.PropertyShape,
+            ) in shape_definitions_graph:
+                return True
+
+    return False
+
+
 def validate_against_shapes(
     focus_node: Union[URIRef, BNode, Literal],
     target_graph: Graph,
     shapes: List[Union[URIRef, BNode]],
     shapes_graph: Graph,
     logger: Optional[logging.Logger] = None,
+    validate_node: Optional[Callable[..., bool]] = None,
 ) -> bool:
     """
     Validate a focus node against a list of SHACL shapes (symmetric validation logic).
@@ -112,6 +162,8 @@ def validate_against_shapes(
         shapes: List of SHACL shape IRIs to validate against (empty list is valid)
         shapes_graph: The RDF graph containing the shape definitions
         logger: Optional logger for warnings
+        validate_node: Validates a single node against a single shape, with the
+            signature of validate_node_against_shape (the default)
 
     Returns:
         True if all validations pass, False otherwise
@@ -128,6 +180,9 @@ def validate_against_shapes(
     if not shapes:
         return True
 
+    if validate_node is None:
+        validate_node = validate_node_against_shape
+
     # For each shape, validate the focus node
     for shape in shapes:
         # Check if shape is defined in shapes_graph (must have at least one predicate)
@@ -145,9 +200,7 @@ def validate_against_shapes(
             return False
 
         # Step 2b & 2c: Validate focus_node against shape
-        if not validate_node_against_shape(
-            focus_node, shape, target_graph, shapes_graph, logger
-        ):
+        if not validate_node(focus_node, shape, target_graph, shapes_graph, logger):
             return False
 
     # Step 3: All validations passed
@@ -172,7 +225,7 @@ def validate_widget_scoring_graph(
     meta_shapes_graph = _get_meta_shapes_graph()
 
     try:
-        conforms, results_graph, results_text = pyshacl.validate(
+        conforms, results_graph, results_text = _pyshacl().validate(
             data_graph=widget_scoring_graph,
             shacl_graph=meta_shapes_graph,
             inference="none",
@@ -212,6 +265,34 @@ def validate_widget_scoring_graph(
         raise MalformedScoreError("unknown", f"Validation error: {e}")
 
 
+def _targeted_shapes_graph(
+    shape_definitions_graph: Graph,
+    shape: Union[URIRef, BNode],
+    focus_nodes: Iterable[Union[URIRef, BNode, Literal]],
+) -> Graph:
+    """
+    Return the shape definitions plus sh:targetNode triples for focus_nodes.
+
+    The definitions are not copied: the result is a union view of
+    shape_definitions_graph and a graph holding the target triples, which also
+    receives the triples pyshacl adds to the shapes graph.
+    """
+    targets = Graph()
+    for focus_node in focus_nodes:
+        targets.add((shape, SH.targetNode, focus_node))
+    return union_graph([shape_definitions_graph, targets], writable=targets)
+
+
+def _has_no_rules(shape_definitions_graph: Graph) -> bool:
+    """
+    Check whether validation can run on the data graph in place.
+
+    In advanced mode pyshacl copies the data graph before every run, because
+    SHACL rules may add triples to it. Without sh:rule there is nothing to add.
+    """
+    return (None, SH.rule, None) not in shape_definitions_graph
+
+
 def validate_node_against_shape(
     focus_node: Union[URIRef, BNode, Literal],
     shape: Union[URIRef, BNode],
@@ -233,20 +314,18 @@ def validate_node_against_shape(
         True if validation passes (conforms), False if violations occur
     """
     try:
-        # Create a temporary SHACL graph that specifically targets the focus node with the shape
-        # This is necessary because the shapes in the scoring graph (shui:Score) do not have
-        # implicit targets (sh:targetClass, etc.) that match the focus node.
-        # We must explicitly link them for this validation session.
-        validation_shacl_graph = Graph()
-        validation_shacl_graph += shape_definitions_graph
-        validation_shacl_graph.add((shape, SH.targetNode, focus_node))
-
-        conforms, results_graph, results_text = pyshacl.validate(
+        # The shapes in the scoring graph (shui:Score) do not have implicit
+        # targets (sh:targetClass, etc.) that match the focus node, so the shape
+        # is explicitly linked to it for this validation session.
+        conforms, results_graph, results_text = _pyshacl().validate(
             data_graph=data_graph,
-            shacl_graph=validation_shacl_graph,
+            shacl_graph=_targeted_shapes_graph(
+                shape_definitions_graph, shape, [focus_node]
+            ),
             advanced=True,
             inference="none",
             abort_on_first=True,
+            inplace=_has_no_rules(shape_definitions_graph),
         )
         return conforms
     except Exception as e:
@@ -256,6 +335,68 @@ def validate_node_against_shape(
         return False
 
 
+def validate_nodes_against_shape(
+    focus_nodes: Iterable[Union[URIRef, BNode, Literal]],
+    shape: Union[URIRef, BNode],
+    data_graph: Graph,
+    shape_definitions_graph: Graph,
+    logger: Optional[logging.Logger] = None,
+) -> Set[Union[URIRef, BNode, Literal]]:
+    """
+    Validate many focus nodes against a SHACL shape in a single pyshacl run.
+
+    The shape is given one sh:targetNode per focus node and the nodes named as
+    sh:focusNode in the validation report are the ones that fail. The result is
+    the same as calling validate_node_against_shape for each node. When the
+    shape definitions declare targets of their own, or the batched run raises,
+    this falls back to validating each node separately.
+
+    Args:
+        focus_nodes: The nodes to validate
+        shape: The SHACL shape to validate against
+        data_graph: The data graph containing the focus nodes
+        shape_definitions_graph: The graph containing the shape definition
+        logger: Optional logger for warnings
+
+    Returns:
+        The set of focus nodes that conform to the shape
+    """
+    nodes = list(dict.fromkeys(focus_nodes))
+    if not nodes:
+        return set()
+
+    if len(nodes) > 1 and not has_declared_targets(shape_definitions_graph):
+        try:
+            conforms, results_graph, results_text = _pyshacl().validate(
+                data_graph=data_graph,
+                shacl_graph=_targeted_shapes_graph(
+                    shape_definitions_graph, shape, nodes
+                ),
+                advanced=True,
+                inference="none",
+                abort_on_first=False,
+                inplace=_has_no_rules(shape_definitions_graph),
+            )
+            if conforms:
+                return set(nodes)
+            failed = set(results_graph.objects(None, SH.focusNode))
+            return {node for node in nodes if node not in failed}
+        except Exception as e:
+            if logger:
+                logger.warning(
+                    f"Batched validation failed for shape {shape}, "
+                    f"validating nodes individually: {e}"
+                )
+
+    return {
+        node
+        for node in nodes
+        if validate_node_against_shape(
+            node, shape, data_graph, shape_definitions_graph, logger
+        )
+    }
+
+
 def validate_graph_against_shape(
     data_graph: Graph,
     shape: Union[URIRef, BNode],
@@ -282,7 +423,7 @@ def validate_graph_against_shape(
         True if validation passes (conforms), False if violations occur
     """
     try:
-        conforms, results_graph, results_text = pyshacl.validate(
+        conforms, results_graph, results_text = _pyshacl().validate(
             data_graph=data_graph,
             shacl_graph=shape_definitions_graph,
             advanced=True,
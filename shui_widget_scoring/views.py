@@ -0,0 +1,163 @@
+"""Read-only graph views over named graphs and graph unions.
+
+The engine reads graphs in place: a named graph of a Dataset is used through
+the Dataset's store, and several graphs are combined by UnionStore, which
+answers triple patterns from each underlying graph instead of copying them.
+pyshacl treats ConjunctiveGraph and Dataset inputs (including rdflib's
+ReadOnlyGraphAggregate) as sets of separately validated graphs, so as_graph
+turns them into plain Graph views before they reach validation.
+"""
+
+from typing import Iterator, List, Optional, Sequence, Union
+
+from rdflib import Dataset, Graph, URIRef, BNode
+from rdflib.graph import (
+    ConjunctiveGraph,
+    ModificationException,
+    ReadOnlyGraphAggregate,
+)
+from rdflib.store import Store
+
+from .exceptions import MissingGraphError
+
+
+class UnionStore(Store):
+    """
+    An rdflib Store answering triple patterns from several graphs.
+
+    Args:
+        graphs: The underlying graphs
+        writable: One of graphs that receives added triples; the store is
+            read-only when None
+    """
+
+    # pyshacl wraps data graphs in a Dataset, which needs a context and graph
+    # aware store; every triple is in the single default context
+    context_aware = True
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = True
+
+    def __init__(self, graphs: Sequence[Graph], writable: Optional[Graph] = None):
+        super().__init__()
+        self.graphs = list(graphs)
+        self.writable = writable
+        self._namespaces: dict = {}
+        for graph in self.graphs:
+            for prefix, namespace in graph.namespaces():
+                self._namespaces.setdefault(prefix, namespace)
+
+    def triples(self, triple_pattern, context=None):
+        # A triple in several graphs is yielded once, from the first of them
+        for index, graph in enumerate(self.graphs):
+            earlier = self.graphs[:index]
+            for triple in graph.triples(triple_pattern):
+                if not any(triple in other for other in earlier):
+                    yield triple, iter(())
+
+    def __len__(self, context=None) -> int:
+        return sum(1 for _ in self.triples((None, None, None)))
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def add(self, triple, context=None, quoted=False):
+        if self.writable is None:
+            raise ModificationException()
+        self.writable.add(triple)
+
+    def addN(self, quads):
+        if self.writable is None:
+            raise ModificationException()
+        self.writable.addN((s, p, o, self.writable) for s, p, o, _ in quads)
+
+    def remove(self, triple, context=None):
+        raise ModificationException()
+
+    def add_graph(self, graph):
+        raise ModificationException()
+
+    def remove_graph(self, graph):
+        raise ModificationException()
+
+    def bind(self, prefix, namespace, override=True):
+        if override or prefix not in self._namespaces:
+            self._namespaces[prefix] = namespace
+
+    def namespace(self, prefix):
+        return self._namespaces.get(prefix)
+
+    def prefix(self, namespace):
+        for prefix, bound in self._namespaces.items():
+            if bound == namespace:
+                return prefix
+        return None
+
+    def namespaces(self) -> Iterator:
+        yield from self._namespaces.items()
+
+
+def union_graph(graphs: Sequence[Graph], writable: Optional[Graph] = None) -> Graph:
+    """
+    Return a view of the union of graphs, without copying them.
+
+    A single graph is returned as it is.
+
+    Args:
+        graphs: The underlying graphs
+        writable: One of graphs that receives triples added to the view; the
+            view is read-only when None
+    """
+    graphs = [as_graph(graph) for graph in graphs]
+    if len(graphs) == 1 and writable is None:
+        return graphs[0]
+    return Graph(store=UnionStore(graphs, writable))
+
+
+def union_graphs_of(graph: Graph) -> Optional[Sequence[Graph]]:
+    """Return the graphs behind a union view, or None for other graphs."""
+    store = getattr(graph, "store", None)
+    return store.graphs if isinstance(store, UnionStore) else None
+
+
+def named_graph(dataset: ConjunctiveGraph, name: Union[str, URIRef, BNode]) -> Graph:
+    """
+    Return a named graph of a Dataset as a view on the Dataset's store.
+
+    Args:
+        dataset: The Dataset (or ConjunctiveGraph)
+        name: The graph name; strings are taken as IRIs
+
+    Returns:
+        A Graph reading and writing the named graph in place
+
+    Raises:
+        MissingGraphError: If the Dataset has no graph with that name
+    """
+    if isinstance(name, str) and not isinstance(name, (URIRef, BNode)):
+        name = URIRef(name)
+    if not any(graph.identifier == name for graph in _named_graphs(dataset)):
+        raise MissingGraphError(f"the dataset has no graph named {name}")
+    return dataset.get_context(name)
+
+
+def _named_graphs(dataset: ConjunctiveGraph) -> List[Graph]:
+    """Return the graphs of a Dataset or ConjunctiveGraph."""
+    if isinstance(dataset, Dataset):
+        return list(dataset.graphs())
+    return list(dataset.contexts())
+
+
+def as_graph(graph: Optional[Graph]) -> Optional[Graph]:
+    """
+    Return a plain Graph view of a graph input.
+
+    ReadOnlyGraphAggregate inputs become a union view of their graphs, and a
+    Dataset or ConjunctiveGraph passed as a whole becomes a union view of its
+    named graphs. Other graphs, and None, are returned as they are.
+    """
+    if isinstance(graph, ReadOnlyGraphAggregate):
+        return union_graph(graph.graphs)
+    if isinstance(graph, ConjunctiveGraph):
+        return union_graph(_named_graphs(graph))
+    return graph
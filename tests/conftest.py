@@ -7,6 +7,7 @@ import pytest
 from rdflib import Graph, URIRef, BNode, Literal, Namespace
 from rdflib.namespace import RDF, XSD
 
+from shui_widget_scoring import ScoringEngine
 from shui_widget_scoring.namespaces import SHUI, SH
 
 
@@ -14,6 +15,62 @@ from shui_widget_scoring.namespaces import SHUI, SH
 EX = Namespace("http://example.org/")
 
 
+# Scores with value-only, graph-dependent, shapes graph and unconditional shapes
+SCORING_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:isBoolean a sh:NodeShape ; sh:datatype xsd:boolean .
+ex:isNamed a sh:NodeShape ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+ex:hasDatatype a sh:NodeShape ;
+    sh:property [ sh:path sh:datatype ; sh:minCount 1 ] .
+
+ex:BooleanScore a shui:Score ; shui:widget ex:BooleanEditor ; shui:score 10 ;
+    shui:dataGraphShape ex:isBoolean .
+ex:NamedScore a shui:Score ; shui:widget ex:NamedResourceEditor ; shui:score 8 ;
+    shui:dataGraphShape ex:isNamed .
+ex:DatatypeScore a shui:Score ; shui:widget ex:LiteralEditor ; shui:score 5 ;
+    shui:shapesGraphShape ex:hasDatatype .
+ex:TextScore a shui:Score ; shui:widget ex:TextEditor ; shui:score 1 .
+"""
+
+# A constraint shape for ex:active values
+SHAPES_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:activeShape a sh:PropertyShape ; sh:path ex:active ; sh:datatype xsd:boolean .
+"""
+
+
+@pytest.fixture
+def scoring_graph():
+    """Provide the shared widget scoring graph (SCORING_TTL)."""
+    return Graph().parse(data=SCORING_TTL, format="turtle")
+
+
+@pytest.fixture
+def shapes_graph():
+    """Provide a shapes graph defining ex:activeShape (SHAPES_TTL)."""
+    return Graph().parse(data=SHAPES_TTL, format="turtle")
+
+
+@pytest.fixture
+def engine(scoring_graph):
+    """Provide an engine compiled from the scoring graph."""
+    return ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+
+
+@pytest.fixture(params=["pyshacl", "native"])
+def backend(request):
+    """Run a test with each backend."""
+    return request.param
+
+
 @pytest.fixture
 def logger():
     """Provide a test logger."""
@@ -0,0 +1,197 @@
+"""Tests for the asyncio scoring front-end."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from rdflib import Graph, Literal, Namespace
+
+from shui_widget_scoring import ScoringEngine
+from shui_widget_scoring.aio import AsyncScorer
+from shui_widget_scoring.exceptions import MissingGraphError
+
+EX = Namespace("http://example.org/")
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """A thread pool that counts submitted jobs."""
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+@pytest.fixture
+def data_graph():
+    """Provide a data graph with a named, active resource and a literal."""
+    g = Graph()
+    g.add((EX.alice, EX.name, Literal("Alice")))
+    g.add((EX.alice, EX.active, Literal(True)))
+    g.add((EX.bob, EX.name, Literal("Bob")))
+    return g
+
+
+@pytest.fixture
+def executor():
+    """Provide a counting executor, shut down after the test."""
+    with CountingExecutor() as executor:
+        yield executor
+
+
+class TestAsyncScorer:
+    """Tests for AsyncScorer."""
+
+    def test_results_match_engine(self, engine, data_graph, shapes_graph, executor):
+        """Async results are identical to ScoringEngine.score."""
+        scorer = AsyncScorer(engine, executor=executor)
+
+        async def main():
+            for focus_node in (EX.alice, EX.bob, EX.nobody, Literal(True)):
+                assert await scorer.score(
+                    focus_node, data_graph=data_graph
+                ) == engine.score(focus_node, data_graph=data_graph)
+            kwargs = dict(
+                data_graph=data_graph,
+                constraint_shape=EX.activeShape,
+                shapes_graph=shapes_graph,
+            )
+            assert await scorer.score(EX.alice, **kwargs) == engine.score(
+                EX.alice, **kwargs
+            )
+
+        asyncio.run(main())
+
+    def test_validation_runs_off_the_loop(self, engine, data_graph, executor):
+        """pyshacl validations run on the executor, not the event loop thread."""
+        scorer = AsyncScorer(engine, executor=executor)
+        threads = set()
+        validate_node = engine._validate_node
+
+        def recording_validate_node(*args, **kwargs):
+            threads.add(threading.get_ident())
+            return validate_node(*args, **kwargs)
+
+        engine._validate_node = recording_validate_node
+
+        async def main():
+            return await scorer.score(EX.alice, data_graph=data_graph)
+
+        asyncio.run(main())
+        assert executor.submitted > 0
+        assert threads and threading.get_ident() not in threads
+
+    def test_native_backend_stays_inline(
+        self, scoring_graph, engine, data_graph, executor
+    ):
+        """Native-backend verdicts are computed without an executor hop."""
+        native = ScoringEngine(
+            scoring_graph, scoring_graph, scoring_graph, backend="native"
+        )
+        scorer = AsyncScorer(native, executor=executor)
+
+        async def main():
+            for focus_node in (EX.alice, EX.bob, Literal(True)):
+                assert await scorer.score(
+                    focus_node, data_graph=data_graph
+                ) == engine.score(focus_node, data_graph=data_graph)
+
+        asyncio.run(main())
+        assert executor.submitted == 0
+
+    def test_dispatch_table_answers_inline(self, scoring_graph, data_graph, executor):
+        """Literals answered by the datatype dispatch table need no executor hop."""
+        scoring_graph.remove((EX.NamedScore, None, None))
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+        assert engine.datatype_dispatch is not None
+
+        result = asyncio.run(
+            AsyncScorer(engine, executor=executor).score(
+                Literal(True), data_graph=data_graph
+            )
+        )
+        assert result.widget_scores[0].widget == EX.BooleanEditor
+        assert executor.submitted == 0
+
+    def test_concurrent_calls_share_one_evaluation(self, engine, data_graph, executor):
+        """Concurrent calls for the same focus node validate each shape once."""
+        scorer = AsyncScorer(engine, executor=executor)
+
+        async def single():
+            return await scorer.score(EX.alice, data_graph=data_graph)
+
+        async def concurrent():
+            return await asyncio.gather(
+                *(scorer.score(EX.alice, data_graph=data_graph) for _ in range(5))
+            )
+
+        asyncio.run(single())
+        single_submissions = executor.submitted
+        results = asyncio.run(concurrent())
+
+        assert executor.submitted == 2 * single_submissions
+        assert all(result == results[0] for result in results)
+        assert scorer.in_flight == 0
+
+    def test_yields_between_scores(self, scoring_graph, data_graph):
+        """Other tasks run while a native evaluation is in progress."""
+        engine = ScoringEngine(
+            scoring_graph, scoring_graph, scoring_graph, backend="native"
+        )
+        scorer = AsyncScorer(engine)
+        events = []
+
+        async def ticker():
+            events.append("tick")
+
+        async def score():
+            await scorer.score(EX.alice, data_graph=data_graph)
+            events.append("scored")
+
+        async def main():
+            await asyncio.gather(score(), ticker())
+
+        asyncio.run(main())
+        assert events == ["tick", "scored"]
+
+    def test_cancelling_last_caller_cancels_evaluation(self, scoring_graph, data_graph):
+        """The shared evaluation stops once every caller has been cancelled."""
+        engine = ScoringEngine(
+            scoring_graph, scoring_graph, scoring_graph, backend="native"
+        )
+        scorer = AsyncScorer(engine)
+
+        async def main():
+            first = asyncio.ensure_future(scorer.score(EX.alice, data_graph=data_graph))
+            second = asyncio.ensure_future(
+                scorer.score(EX.alice, data_graph=data_graph)
+            )
+            await asyncio.sleep(0)
+            (evaluation,) = scorer._in_flight.values()
+
+            first.cancel()
+            assert (await second) == engine.score(EX.alice, data_graph=data_graph)
+            assert not evaluation.cancelled()
+
+            third = asyncio.ensure_future(scorer.score(EX.bob, data_graph=data_graph))
+            await asyncio.sleep(0)
+            (evaluation,) = scorer._in_flight.values()
+            third.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await third
+            with pytest.raises(asyncio.CancelledError):
+                await evaluation
+            await asyncio.sleep(0)  # Let the done callbacks run
+            assert scorer.in_flight == 0
+
+        asyncio.run(main())
+
+    def test_invalid_inputs_raise(self, engine):
+        """Input errors are raised before any evaluation starts."""
+        scorer = AsyncScorer(engine)
+        with pytest.raises(MissingGraphError):
+            asyncio.run(scorer.score(EX.alice))
@@ -0,0 +1,184 @@
+"""Tests for static shape analysis."""
+
+from rdflib import Graph, Namespace
+from rdflib.namespace import RDF, RDFS, XSD
+
+from shui_widget_scoring.analysis import (
+    is_datatype_determined,
+    is_value_only_shape,
+    mentioned_datatypes,
+    shape_closure,
+    shape_read_predicates,
+)
+
+EX = Namespace("http://example.org/")
+
+SHAPES_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:isBoolean a sh:NodeShape ;
+    sh:datatype xsd:boolean .
+
+ex:isShortString a sh:NodeShape ;
+    sh:datatype xsd:string ;
+    sh:maxLength 10 ;
+    sh:pattern "^[A-Z]" .
+
+ex:isDateOrDateTime a sh:NodeShape ;
+    sh:or ( [ sh:datatype xsd:date ] [ sh:datatype xsd:dateTime ] ) .
+
+ex:isNotBoolean a sh:NodeShape ;
+    sh:not ex:isBoolean .
+
+ex:isPerson a sh:NodeShape ;
+    sh:class ex:Person .
+
+ex:hasName a sh:NodeShape ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+
+ex:isBooleanOrPerson a sh:NodeShape ;
+    sh:or ( ex:isBoolean ex:isPerson ) .
+"""
+
+
+def shapes_graph():
+    """Provide shapes covering value-only and graph-dependent constraints."""
+    g = Graph()
+    g.parse(data=SHAPES_TTL, format="turtle")
+    return g
+
+
+class TestShapeClosure:
+    """Tests for shape_closure."""
+
+    def test_closure_follows_logical_parameters(self):
+        """Shapes referenced through sh:or are part of the closure."""
+        g = shapes_graph()
+        assert shape_closure(EX.isBooleanOrPerson, g) == {
+            EX.isBooleanOrPerson,
+            EX.isBoolean,
+            EX.isPerson,
+        }
+
+    def test_closure_of_simple_shape(self):
+        """A shape without logical parameters is its own closure."""
+        g = shapes_graph()
+        assert shape_closure(EX.isBoolean, g) == {EX.isBoolean}
+
+
+class TestIsValueOnlyShape:
+    """Tests for is_value_only_shape."""
+
+    def test_value_constraints_are_value_only(self):
+        """Datatype, length and pattern constraints are value-only."""
+        g = shapes_graph()
+        assert is_value_only_shape(EX.isBoolean, g)
+        assert is_value_only_shape(EX.isShortString, g)
+
+    def test_logical_combinations_of_value_shapes(self):
+        """Logical combinations of value-only shapes are value-only."""
+        g = shapes_graph()
+        assert is_value_only_shape(EX.isDateOrDateTime, g)
+        assert is_value_only_shape(EX.isNotBoolean, g)
+
+    def test_graph_dependent_shapes(self):
+        """sh:class and property shapes read the data graph."""
+        g = shapes_graph()
+        assert not is_value_only_shape(EX.isPerson, g)
+        assert not is_value_only_shape(EX.hasName, g)
+        assert not is_value_only_shape(EX.isBooleanOrPerson, g)
+
+    def test_undefined_shape_is_not_value_only(self):
+        """A shape without triples is not classified as value-only."""
+        assert not is_value_only_shape(EX.Undefined, shapes_graph())
+
+    def test_declared_targets_make_every_shape_graph_dependent(self):
+        """Declared targets make every validation session graph-dependent."""
+        g = shapes_graph()
+        g.parse(
+            data="""
+            @prefix sh: <http://www.w3.org/ns/shacl#> .
+            @prefix ex: <http://example.org/> .
+            ex:hasName sh:targetClass ex:Person .
+            """,
+            format="turtle",
+        )
+        assert not is_value_only_shape(EX.isBoolean, g)
+
+
+class TestIsDatatypeDetermined:
+    """Tests for is_datatype_determined."""
+
+    def test_datatype_shapes(self):
+        """sh:datatype and logical combinations of it are datatype-determined."""
+        g = shapes_graph()
+        assert is_datatype_determined(EX.isBoolean, g)
+        assert is_datatype_determined(EX.isDateOrDateTime, g)
+        assert is_datatype_determined(EX.isNotBoolean, g)
+
+    def test_other_value_constraints(self):
+        """Pattern and length constraints depend on the lexical form."""
+        assert not is_datatype_determined(EX.isShortString, shapes_graph())
+
+    def test_mentioned_datatypes(self):
+        """Datatypes are collected from the whole closure."""
+        g = shapes_graph()
+        assert mentioned_datatypes(EX.isDateOrDateTime, g) == {
+            XSD.date,
+            XSD.dateTime,
+        }
+
+
+READS_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:knowsNamedPerson a sh:NodeShape ;
+    sh:property [
+        sh:path ex:knows ;
+        sh:class ex:Person ;
+        sh:node [ sh:property [ sh:path ( ex:profile ex:name ) ; sh:minCount 1 ] ]
+    ] .
+
+ex:hasParentOrGuardian a sh:NodeShape ;
+    sh:property [
+        sh:path [ sh:alternativePath ( [ sh:inversePath ex:child ] ex:guardian ) ] ;
+        sh:minCount 1
+    ] .
+
+ex:isClosed a sh:NodeShape ;
+    sh:closed true .
+"""
+
+
+class TestShapeReadPredicates:
+    """Tests for shape_read_predicates."""
+
+    def reads_graph(self):
+        """Provide the analysis shapes plus graph-dependent shapes."""
+        g = shapes_graph()
+        g.parse(data=READS_TTL, format="turtle")
+        return g
+
+    def test_value_only_shape_reads_no_predicates(self):
+        """Value-only shapes only depend on the focus node itself."""
+        assert shape_read_predicates(EX.isBoolean, self.reads_graph()) == frozenset()
+
+    def test_paths_and_class_constraints(self):
+        """Nested paths and sh:class contribute their predicates."""
+        assert shape_read_predicates(
+            EX.knowsNamedPerson, self.reads_graph()
+        ) == frozenset({EX.knows, EX.profile, EX.name, RDF.type, RDFS.subClassOf})
+
+    def test_complex_paths(self):
+        """Alternative and inverse paths contribute their predicates."""
+        assert shape_read_predicates(
+            EX.hasParentOrGuardian, self.reads_graph()
+        ) == frozenset({EX.child, EX.guardian})
+
+    def test_unknown_parameters_are_unbounded(self):
+        """Parameters that are not understood may read any triple."""
+        assert shape_read_predicates(EX.isClosed, self.reads_graph()) is None
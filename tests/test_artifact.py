@@ -0,0 +1,218 @@
+"""Tests for compiled engine artefacts."""
+
+from unittest.mock import patch
+
+import pyshacl
+import pytest
+from rdflib import Graph, Literal, Namespace
+from rdflib.namespace import XSD
+
+from shui_widget_scoring import ScoringEngine, StaleArtifactError
+from shui_widget_scoring import artifact
+from shui_widget_scoring.namespaces import SHUI
+from shui_widget_scoring.artifact import (
+    graph_fingerprint,
+    load_engine,
+    load_engine_source,
+    load_or_compile,
+    save_engine,
+)
+
+EX = Namespace("http://example.org/")
+
+SCORING_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:isBoolean a sh:NodeShape ;
+    sh:datatype xsd:boolean .
+
+ex:hasDatatype a sh:NodeShape ;
+    sh:property [
+        sh:path sh:datatype ;
+        sh:minCount 1
+    ] .
+
+ex:BooleanScore a shui:Score ;
+    shui:widget ex:BooleanSelectEditor ;
+    shui:score 10 ;
+    shui:dataGraphShape ex:isBoolean .
+
+ex:DatatypeScore a shui:Score ;
+    shui:widget ex:LiteralEditor ;
+    shui:score 5 ;
+    shui:shapesGraphShape ex:hasDatatype .
+
+ex:TextScore a shui:Score ;
+    shui:widget ex:TextFieldEditor ;
+    shui:score 1 .
+"""
+
+
+@pytest.fixture
+def scoring_graph():
+    """Provide a widget scoring graph."""
+    g = Graph()
+    g.parse(data=SCORING_TTL, format="turtle")
+    return g
+
+
+@pytest.fixture
+def scoring_file(tmp_path):
+    """Provide a widget scoring graph as a Turtle file."""
+    path = tmp_path / "scores.ttl"
+    path.write_text(SCORING_TTL)
+    return path
+
+
+@pytest.fixture
+def data_graph():
+    """Provide a data graph with a boolean and a string value."""
+    g = Graph()
+    g.add((EX.item1, EX.value, Literal(True)))
+    g.add((EX.item2, EX.value, Literal("text")))
+    return g
+
+
+class TestSaveAndLoad:
+    """Tests for save_engine and load_engine."""
+
+    def test_round_trip_preserves_results(self, tmp_path, scoring_graph, data_graph):
+        """A loaded engine scores exactly like the engine that was saved."""
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+        path = tmp_path / "engine.bin"
+        save_engine(engine, path)
+        loaded = load_engine(path)
+
+        assert loaded.score_instances == engine.score_instances
+        assert loaded.datatype_dispatch == engine.datatype_dispatch
+        for focus_node in (Literal(True), Literal("text"), EX.item1):
+            assert loaded.score(focus_node, data_graph=data_graph) == engine.score(
+                focus_node, data_graph=data_graph
+            )
+
+    def test_shared_graphs_stay_shared(self, tmp_path, scoring_graph):
+        """A graph used for several roles is stored and restored once."""
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+        path = tmp_path / "engine.bin"
+        save_engine(engine, path)
+        loaded = load_engine(path)
+
+        assert loaded.data_graph_shapes_graph is loaded.widget_scoring_graph
+        assert loaded.shapes_graph_shapes_graph is loaded.widget_scoring_graph
+        assert len(loaded.widget_scoring_graph) == len(scoring_graph)
+
+    def test_load_skips_validation(self, tmp_path, scoring_graph):
+        """Loading an artefact runs no pyshacl validation."""
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+        path = tmp_path / "engine.bin"
+        save_engine(engine, path)
+
+        with patch.object(pyshacl, "validate") as spy:
+            load_engine(path)
+        spy.assert_not_called()
+
+    def test_mismatched_sources_are_rejected(self, tmp_path, scoring_graph):
+        """An artefact compiled from other sources raises StaleArtifactError."""
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+        path = tmp_path / "engine.bin"
+        save_engine(engine, path, sources={"scores": graph_fingerprint(scoring_graph)})
+
+        changed = Graph()
+        changed.parse(data=SCORING_TTL, format="turtle")
+        changed.set((EX.TextScore, SHUI.score, Literal(2)))
+
+        load_engine(path, sources={"scores": graph_fingerprint(scoring_graph)})
+        with pytest.raises(StaleArtifactError):
+            load_engine(path, sources={"scores": graph_fingerprint(changed)})
+
+    def test_version_mismatch_is_rejected(self, tmp_path, scoring_graph):
+        """An artefact written by another format version raises StaleArtifactError."""
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+        path = tmp_path / "engine.bin"
+        save_engine(engine, path)
+
+        with patch.object(artifact, "ARTIFACT_FORMAT_VERSION", 999):
+            with pytest.raises(StaleArtifactError):
+                load_engine(path)
+
+    def test_non_artefact_is_rejected(self, tmp_path):
+        """A file that is not an artefact raises StaleArtifactError."""
+        path = tmp_path / "engine.bin"
+        path.write_bytes(b"@prefix ex: <http://example.org/> .")
+        with pytest.raises(StaleArtifactError):
+            load_engine(path)
+
+    def test_graph_fingerprint_ignores_blank_node_labels(self):
+        """Parsing the same Turtle twice gives the same fingerprint."""
+        first = Graph().parse(data=SCORING_TTL, format="turtle")
+        second = Graph().parse(data=SCORING_TTL, format="turtle")
+        assert graph_fingerprint(first) == graph_fingerprint(second)
+
+
+class TestLoadOrCompile:
+    """Tests for load_or_compile."""
+
+    def test_compiles_and_writes_artefact(self, tmp_path, scoring_file):
+        """Without an artefact the sources are compiled and the artefact written."""
+        path = tmp_path / "engine.bin"
+        engine = load_or_compile(path, scoring_file)
+
+        assert path.exists()
+        assert [s["uri"] for s in engine.score_instances] == [
+            EX.BooleanScore,
+            EX.DatatypeScore,
+            EX.TextScore,
+        ]
+
+    def test_reuses_matching_artefact(self, tmp_path, scoring_file):
+        """A matching artefact is loaded without parsing or validation."""
+        path = tmp_path / "engine.bin"
+        load_or_compile(path, scoring_file)
+
+        with (
+            patch.object(Graph, "parse") as parse,
+            patch.object(pyshacl, "validate") as validate,
+        ):
+            engine = load_or_compile(path, scoring_file)
+        parse.assert_not_called()
+        validate.assert_not_called()
+        assert len(engine.score_instances) == 3
+
+    def test_recompiles_when_sources_change(self, tmp_path, scoring_file):
+        """Editing a source file invalidates the artefact."""
+        path = tmp_path / "engine.bin"
+        load_or_compile(path, scoring_file)
+
+        scoring_file.write_text(
+            SCORING_TTL.replace("shui:score 1 .", "shui:score 50 .")
+        )
+        engine = load_or_compile(path, scoring_file)
+
+        assert engine.score_instances[0]["uri"] == EX.TextScore
+        assert load_engine(path).score_instances[0]["uri"] == EX.TextScore
+
+    def test_literal_dispatch_survives_reload(self, tmp_path, scoring_file):
+        """The datatype dispatch table is part of the artefact."""
+        path = tmp_path / "engine.bin"
+        load_or_compile(path, scoring_file)
+        engine = load_or_compile(path, scoring_file)
+
+        assert engine.datatype_dispatch is not None
+        assert XSD.boolean in engine.dispatch_datatypes
+
+
+class TestLoadEngineSource:
+    """Tests for load_engine_source."""
+
+    def test_artefact_and_turtle(self, tmp_path, scoring_graph, scoring_file):
+        """Engines load from artefacts and compile from RDF files."""
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+        path = tmp_path / "scores.engine"
+        save_engine(engine, path)
+
+        for source in (path, scoring_file):
+            loaded = load_engine_source(source)
+            assert loaded.score_instances == engine.score_instances
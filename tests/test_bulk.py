@@ -0,0 +1,358 @@
+"""Tests for whole-graph widget assignment jobs."""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+from rdflib import Graph, Literal, Namespace
+from rdflib.namespace import XSD
+
+from shui_widget_scoring.bulk import (
+    AssignmentJob,
+    iter_assignments,
+    iter_object_nodes,
+    main,
+    object_nodes,
+    object_patterns,
+)
+
+EX = Namespace("http://example.org/")
+
+SCORING_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:isBoolean a sh:NodeShape ; sh:datatype xsd:boolean .
+ex:isDate a sh:NodeShape ; sh:datatype xsd:date .
+ex:isIRI a sh:NodeShape ; sh:nodeKind sh:IRI .
+
+ex:BooleanScore a shui:Score ; shui:widget ex:BooleanEditor ; shui:score 10 ;
+    shui:dataGraphShape ex:isBoolean .
+ex:DateScore a shui:Score ; shui:widget ex:DateEditor ; shui:score 10.0 ;
+    shui:dataGraphShape ex:isDate .
+ex:ResourceScore a shui:Score ; shui:widget ex:ResourceEditor ; shui:score 8 ;
+    shui:dataGraphShape ex:isIRI .
+ex:TextScore a shui:Score ; shui:widget ex:TextEditor ; shui:score 1.5 .
+"""
+
+DATA_TTL = """
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:alice ex:name "Alice" ; ex:active true ; ex:knows ex:bob ;
+    ex:birthDate "2000-01-01"^^xsd:date .
+ex:bob ex:name "Bob" ; ex:active false ; ex:knows ex:carol ;
+    ex:birthDate "2001-02-03"^^xsd:date, "not a date"^^xsd:date .
+"""
+
+
+@pytest.fixture
+def scoring_graph():
+    """Provide a widget scoring graph with datatype-determined Scores."""
+    return Graph().parse(data=SCORING_TTL, format="turtle")
+
+
+@pytest.fixture
+def data_graph():
+    """Provide a data graph with resource and literal objects."""
+    return Graph().parse(data=DATA_TTL, format="turtle")
+
+
+def read_jsonl(path):
+    """Return the rows of a JSON Lines file."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def run_interrupted(job, engine):
+    """Run a job with chunks of three nodes until its third score_batch call."""
+    score_batch = engine.score_batch
+    calls = []
+
+    def interrupt(focus_nodes, **kwargs):
+        calls.append(focus_nodes)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return score_batch(focus_nodes, **kwargs)
+
+    with patch.object(engine, "score_batch", side_effect=interrupt):
+        with pytest.raises(KeyboardInterrupt):
+            job.run()
+
+
+class TestAssignments:
+    """Tests for object_nodes and iter_assignments."""
+
+    def test_object_nodes(self, data_graph):
+        """Distinct objects are selected by subject and predicate."""
+        nodes = list(object_nodes(data_graph))
+        assert len(nodes) == 9
+        assert set(nodes) == set(data_graph.objects())
+
+        assert list(object_nodes(data_graph, predicates=[EX.knows])) == [
+            EX.bob,
+            EX.carol,
+        ]
+        assert list(
+            object_nodes(
+                data_graph, subjects=[EX.alice], predicates=[EX.name, EX.active]
+            )
+        ) == [Literal("Alice"), Literal(True)]
+
+    def test_repeated_objects_are_read_once(self):
+        """Objects of several subjects and predicates are yielded once."""
+        g = Graph()
+        for subject in (EX.a, EX.b):
+            for predicate in (EX.knows, EX.likes):
+                g.add((subject, predicate, EX.carol))
+                g.add((subject, predicate, Literal(1)))
+        g.add((EX.a, EX.likes, EX.dave))
+
+        expected = {Literal(1), EX.carol, EX.dave}
+        for nodes in (object_nodes(g), object_nodes(g, subjects=[EX.b, EX.a])):
+            nodes = list(nodes)
+            assert len(nodes) == 3
+            assert set(nodes) == expected
+
+    def test_order_is_reproducible(self, data_graph):
+        """A data graph parsed again is read in the same order."""
+        reloaded = Graph().parse(data=DATA_TTL, format="turtle")
+        assert list(object_nodes(reloaded)) == list(object_nodes(data_graph))
+
+    def test_resume_from_cursor(self, data_graph):
+        """Reading from a cursor continues after the node it was yielded with."""
+        patterns = object_patterns(data_graph)
+        positioned = list(iter_object_nodes(data_graph, patterns))
+        cursor, _ = positioned[4]
+        assert list(iter_object_nodes(data_graph, patterns, cursor)) == positioned[5:]
+
+    def test_matches_score(self, engine, data_graph):
+        """Every node gets the result of scoring it on its own."""
+        nodes = list(object_nodes(data_graph))
+        pairs = list(iter_assignments(engine, data_graph, nodes, chunk_size=3))
+
+        assert [node for node, _ in pairs] == nodes
+        for node, result in pairs:
+            assert result == engine.score(node, data_graph=data_graph), node
+
+    def test_equivalence_classes_are_scored_once(self, engine, data_graph):
+        """Literals in the same dispatch bucket are scored once for the job."""
+        scored = []
+        score_batch = engine.score_batch
+
+        def spy(focus_nodes, **kwargs):
+            scored.extend(focus_nodes)
+            return score_batch(focus_nodes, **kwargs)
+
+        with patch.object(engine, "score_batch", side_effect=spy):
+            list(iter_assignments(engine, data_graph, object_nodes(data_graph)))
+
+        # Valid dates, invalid dates, booleans and strings: one of each is scored
+        assert len([n for n in scored if isinstance(n, Literal)]) == 4
+        assert EX.bob in scored and EX.carol in scored
+
+    def test_chunks_are_scored_lazily(self, engine, data_graph):
+        """Nodes are taken from the input one chunk at a time."""
+        taken = []
+
+        def nodes():
+            for node in object_nodes(data_graph):
+                taken.append(node)
+                yield node
+
+        assignments = iter_assignments(engine, data_graph, nodes(), chunk_size=2)
+        next(assignments)
+        assert len(taken) == 2
+
+
+class TestAssignmentJob:
+    """Tests for AssignmentJob."""
+
+    def test_jsonl_output(self, tmp_path, engine, data_graph):
+        """Each node gets a row with its default widget and score."""
+        path = tmp_path / "widgets.jsonl"
+        assert AssignmentJob(engine, data_graph, path).run() == 9
+
+        rows = {row["node"]: row for row in read_jsonl(path)}
+        assert rows[EX.bob.n3()] == {
+            "node": EX.bob.n3(),
+            "widget": EX.ResourceEditor.n3(),
+            "score": 8,
+        }
+        assert rows[Literal(True).n3()]["widget"] == EX.BooleanEditor.n3()
+        assert rows[Literal("Alice").n3()]["widget"] == EX.TextEditor.n3()
+        assert rows[Literal("Alice").n3()]["score"] == 1.5
+
+    def test_csv_output(self, tmp_path, engine, data_graph):
+        """CSV output is chosen by extension and has a header row."""
+        path = tmp_path / "widgets.csv"
+        AssignmentJob(engine, data_graph, path, predicates=[EX.birthDate]).run()
+
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        date = Literal("2000-01-01", datatype=XSD.date)
+        assert len(rows) == 3
+        # Scores are written as in JSON Lines, so 10.0 is written as 10
+        assert {"node": date.n3(), "widget": EX.DateEditor.n3(), "score": "10"} in rows
+
+    def test_unknown_format_raises(self, tmp_path, engine, data_graph):
+        """Only JSON Lines and CSV are supported."""
+        with pytest.raises(ValueError):
+            AssignmentJob(engine, data_graph, tmp_path / "out", format="xml")
+
+    def test_resume_from_checkpoint(self, tmp_path, engine, data_graph):
+        """An interrupted job continues after its last completed chunk."""
+        expected_path = tmp_path / "expected.jsonl"
+        AssignmentJob(engine, data_graph, expected_path).run()
+
+        path = tmp_path / "widgets.jsonl"
+        checkpoint = tmp_path / "widgets.checkpoint"
+        job = AssignmentJob(
+            engine, data_graph, path, checkpoint_path=checkpoint, chunk_size=3
+        )
+        run_interrupted(job, engine)
+        assert json.loads(checkpoint.read_text())["done"] == 6
+
+        # A partly written chunk after the checkpoint is discarded
+        with open(path, "ab") as f:
+            f.write(b'{"node": "partial')
+        assert job.run() == 9
+        assert read_jsonl(path) == read_jsonl(expected_path)
+        assert not checkpoint.exists()
+
+    def test_resume_on_reloaded_graph(self, tmp_path, engine, data_graph):
+        """A job resumes against the same data parsed again."""
+        expected_path = tmp_path / "expected.jsonl"
+        AssignmentJob(engine, data_graph, expected_path).run()
+        job = AssignmentJob(
+            engine,
+            data_graph,
+            tmp_path / "widgets.jsonl",
+            checkpoint_path=tmp_path / "widgets.checkpoint",
+            chunk_size=3,
+        )
+        run_interrupted(job, engine)
+
+        job.data_graph = Graph().parse(data=DATA_TTL, format="turtle")
+        assert job.run() == 9
+        assert read_jsonl(job.output_path) == read_jsonl(expected_path)
+
+    def test_missing_output_restarts(self, tmp_path, engine, data_graph):
+        """A checkpoint without its output file is discarded."""
+        job = AssignmentJob(
+            engine,
+            data_graph,
+            tmp_path / "widgets.jsonl",
+            checkpoint_path=tmp_path / "widgets.checkpoint",
+            chunk_size=3,
+        )
+        run_interrupted(job, engine)
+        os.remove(job.output_path)
+
+        assert job.run() == 9
+        assert len(read_jsonl(job.output_path)) == 9
+        assert not os.path.exists(job.checkpoint_path)
+
+    def test_checkpoint_of_other_job_raises(self, tmp_path, engine, data_graph):
+        """A checkpoint is only used for the nodes it was written for."""
+        path = tmp_path / "widgets.jsonl"
+        checkpoint = tmp_path / "widgets.checkpoint"
+        checkpoint.write_text(
+            json.dumps(
+                {
+                    "done": 1,
+                    "offset": 0,
+                    "cursor": [0, 1],
+                    "selection": "other",
+                    "format": "jsonl",
+                }
+            )
+        )
+        with pytest.raises(ValueError):
+            AssignmentJob(engine, data_graph, path, checkpoint_path=checkpoint).run()
+
+
+class TestCommandLine:
+    """Tests for python -m shui_widget_scoring."""
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        """Write the scoring and data graphs to files."""
+        scoring = tmp_path / "scores.ttl"
+        scoring.write_text(SCORING_TTL, encoding="utf-8")
+        data = tmp_path / "data.ttl"
+        data.write_text(DATA_TTL, encoding="utf-8")
+        return scoring, data
+
+    def test_main(self, tmp_path, files):
+        """The command writes one row per selected node."""
+        scoring, data = files
+        output = tmp_path / "widgets.jsonl"
+        main(
+            [
+                str(data),
+                "--engine",
+                str(scoring),
+                "--output",
+                str(output),
+                "--predicate",
+                str(EX.knows),
+            ]
+        )
+        assert [row["node"] for row in read_jsonl(output)] == [
+            EX.bob.n3(),
+            EX.carol.n3(),
+        ]
+
+    def test_module_entry_point(self, tmp_path, files):
+        """The package runs as a module."""
+        scoring, data = files
+        output = tmp_path / "widgets.csv"
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "shui_widget_scoring",
+                str(data),
+                "--engine",
+                str(scoring),
+                "--output",
+                str(output),
+                "--subject",
+                str(EX.alice),
+            ],
+            check=True,
+            capture_output=True,
+        )
+        assert output.read_text(encoding="utf-8").splitlines()[0] == "node,widget,score"
+        assert len(output.read_text(encoding="utf-8").splitlines()) == 5
+
+    def test_order_is_independent_of_hash_seed(self, tmp_path, files):
+        """Processes with different hash seeds write the rows in the same order."""
+        scoring, data = files
+        outputs = []
+        for seed in ("1", "2"):
+            output = tmp_path / f"widgets-{seed}.jsonl"
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "shui_widget_scoring",
+                    str(data),
+                    "--engine",
+                    str(scoring),
+                    "--output",
+                    str(output),
+                ],
+                check=True,
+                capture_output=True,
+                env={**os.environ, "PYTHONHASHSEED": seed},
+            )
+            outputs.append(output.read_text(encoding="utf-8"))
+        assert outputs[0] == outputs[1]
@@ -0,0 +1,116 @@
+"""Tests for request coalescing."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from rdflib import Graph, Literal, Namespace
+
+from shui_widget_scoring.coalesce import CoalescingScorer
+from shui_widget_scoring.exceptions import MissingGraphError
+
+EX = Namespace("http://example.org/")
+
+FOCUS_NODES = [EX.alice, EX.bob, EX.alice, Literal(True), EX.alice, EX.nobody]
+
+
+@pytest.fixture
+def data_graph():
+    """Provide a data graph with one named resource."""
+    g = Graph()
+    g.add((EX.alice, EX.name, Literal("Alice")))
+    g.add((EX.alice, EX.active, Literal(True)))
+    return g
+
+
+class TestCoalescingScorer:
+    """Tests for CoalescingScorer."""
+
+    def test_concurrent_requests_share_one_batch(self, engine, data_graph):
+        """A burst of requests is scored by one deduplicated score_batch call."""
+        with (
+            patch.object(engine, "score_batch", wraps=engine.score_batch) as spy,
+            CoalescingScorer(engine, window=0.2) as scorer,
+        ):
+            futures = [scorer.submit(node, data_graph) for node in FOCUS_NODES]
+            results = [future.result(timeout=5) for future in futures]
+
+        assert results == [engine.score(n, data_graph=data_graph) for n in FOCUS_NODES]
+        spy.assert_called_once()
+        assert spy.call_args.args[0] == [EX.alice, EX.bob, Literal(True), EX.nobody]
+        assert scorer.stats() == {
+            "requests": 6,
+            "deduplicated": 2,
+            "batches": 1,
+            "pending": 0,
+        }
+
+    def test_callers_on_threads(self, engine, data_graph):
+        """Blocking score() calls from many threads get their own results."""
+        with CoalescingScorer(engine, window=0.05) as scorer:
+            with ThreadPoolExecutor(max_workers=len(FOCUS_NODES)) as pool:
+                results = list(
+                    pool.map(lambda n: scorer.score(n, data_graph), FOCUS_NODES)
+                )
+
+        assert results == [engine.score(n, data_graph=data_graph) for n in FOCUS_NODES]
+        assert results[0] is not results[2]
+
+    def test_full_batch_flushes_before_window(self, engine, data_graph):
+        """Reaching max_batch_size flushes without waiting for the window."""
+        with CoalescingScorer(engine, window=60, max_batch_size=2) as scorer:
+            start = time.monotonic()
+            first = scorer.submit(EX.alice, data_graph)
+            second = scorer.submit(EX.bob, data_graph)
+            first.result(timeout=5)
+            second.result(timeout=5)
+            assert time.monotonic() - start < 30
+
+    def test_groups_are_kept_apart(self, engine, data_graph, shapes_graph):
+        """Different constraint shapes and graph versions are never merged."""
+        with CoalescingScorer(engine, window=0.2) as scorer:
+            plain = scorer.submit(EX.alice, data_graph)
+            constrained = scorer.submit(
+                EX.alice, data_graph, EX.activeShape, shapes_graph
+            )
+            old = scorer.submit(EX.alice, data_graph, version=1)
+            new = scorer.submit(EX.alice, data_graph, version=2)
+
+            assert constrained.result(timeout=5) == engine.score(
+                EX.alice,
+                data_graph=data_graph,
+                constraint_shape=EX.activeShape,
+                shapes_graph=shapes_graph,
+            )
+            assert plain.result(timeout=5) == old.result(timeout=5)
+            assert new.result(timeout=5) == old.result(timeout=5)
+        assert scorer.stats()["batches"] == 4
+        assert scorer.stats()["deduplicated"] == 0
+
+    def test_errors_reach_every_caller(self, engine, data_graph):
+        """An error in a batch is raised to every caller in that batch."""
+        with (
+            patch.object(engine, "score_batch", side_effect=RuntimeError("boom")),
+            CoalescingScorer(engine, window=0.1) as scorer,
+        ):
+            futures = [scorer.submit(EX.alice, data_graph) for _ in range(3)]
+            for future in futures:
+                with pytest.raises(RuntimeError, match="boom"):
+                    future.result(timeout=5)
+
+    def test_invalid_requests_raise_immediately(self, engine):
+        """Input errors are raised by submit, not through the future."""
+        with CoalescingScorer(engine) as scorer:
+            with pytest.raises(MissingGraphError):
+                scorer.submit(EX.alice)
+
+    def test_close_flushes_pending_requests(self, engine, data_graph):
+        """Closing scores the pending requests and rejects new ones."""
+        scorer = CoalescingScorer(engine, window=60)
+        future = scorer.submit(EX.alice, data_graph)
+        scorer.close()
+
+        assert future.result(timeout=0) == engine.score(EX.alice, data_graph=data_graph)
+        with pytest.raises(RuntimeError):
+            scorer.submit(EX.alice, data_graph)
@@ -0,0 +1,1296 @@
+"""Tests for the compiled scoring engine."""
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest.mock import patch
+
+import pyshacl
+import pytest
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDF, XSD
+
+from shui_widget_scoring import (
+    ScoringEngine,
+    ShapesGraphVerdicts,
+    iter_widget_scores,
+    score_form,
+    score_widgets,
+)
+from shui_widget_scoring.cache import LRUCache
+from shui_widget_scoring.engine import (
+    _flags_mask,
+    _row_flags,
+    _set_bits,
+    check_inputs,
+)
+from shui_widget_scoring.exceptions import (
+    InvalidFocusNodeError,
+    MalformedScoreError,
+    MissingGraphError,
+)
+from shui_widget_scoring.namespaces import SHUI, SH
+
+EX = Namespace("http://example.org/")
+
+SCORING_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:isBoolean a sh:NodeShape ;
+    sh:datatype xsd:boolean .
+
+ex:hasDatatype a sh:NodeShape ;
+    sh:property [
+        sh:path sh:datatype ;
+        sh:minCount 1
+    ] .
+
+ex:hasDateDatatype a sh:NodeShape ;
+    sh:property [
+        sh:path sh:datatype ;
+        sh:in (xsd:date)
+    ] .
+
+ex:BooleanScore a shui:Score ;
+    shui:widget ex:BooleanSelectEditor ;
+    shui:score 10 ;
+    shui:dataGraphShape ex:isBoolean .
+
+ex:DatatypeScore a shui:Score ;
+    shui:widget ex:LiteralEditor ;
+    shui:score 5 ;
+    shui:shapesGraphShape ex:hasDatatype .
+
+ex:DateScore a shui:Score ;
+    shui:widget ex:DatePickerEditor ;
+    shui:score 20 ;
+    shui:shapesGraphShape ex:hasDatatype, ex:hasDateDatatype .
+
+ex:TextScore a shui:Score ;
+    shui:widget ex:TextFieldEditor ;
+    shui:score 1 .
+"""
+
+SHAPES_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:PersonShape a sh:NodeShape ;
+    sh:property ex:birthDateShape, ex:nameShape, ex:activeShape .
+
+ex:birthDateShape sh:path ex:birthDate ;
+    sh:datatype xsd:date .
+
+ex:nameShape sh:path ex:name .
+
+ex:activeShape sh:path ex:active ;
+    sh:datatype xsd:boolean .
+"""
+
+
+@pytest.fixture
+def scoring_graph():
+    """Provide a widget scoring graph with data and shapes graph Scores."""
+    g = Graph()
+    g.parse(data=SCORING_TTL, format="turtle")
+    return g
+
+
+@pytest.fixture
+def shapes_graph():
+    """Provide a shapes graph with three property shapes."""
+    g = Graph()
+    g.parse(data=SHAPES_TTL, format="turtle")
+    return g
+
+
+class TestScoringEngine:
+    """Tests for ScoringEngine construction and scoring."""
+
+    def test_malformed_scoring_graph_raises_on_construction(
+        self, malformed_scoring_graph_no_widget
+    ):
+        """Meta-validation happens when the engine is built."""
+        with pytest.raises(MalformedScoreError):
+            ScoringEngine(
+                malformed_scoring_graph_no_widget,
+                malformed_scoring_graph_no_widget,
+                malformed_scoring_graph_no_widget,
+            )
+
+    def test_score_instances_are_presorted(self, engine):
+        """Score instances are held in result order."""
+        widgets = [s["widget"] for s in engine.score_instances]
+        assert widgets == [
+            EX.DatePickerEditor,
+            EX.BooleanSelectEditor,
+            EX.LiteralEditor,
+            EX.TextFieldEditor,
+        ]
+
+    def test_results_share_widget_scores(self, engine):
+        """Results reference the Score table's WidgetScores instead of new objects."""
+        data_graph = Graph()
+        data_graph.add((EX.alice, EX.active, Literal(True)))
+
+        first = engine.score(Literal(True), data_graph=data_graph)
+        second = engine.score(Literal(True), data_graph=data_graph)
+        (batch,) = engine.score_batch([Literal(True)], data_graph=data_graph)
+        table = [s["widget_score"] for s in engine.score_instances]
+        assert first.widget_scores
+        for a, b, c in zip(
+            first.widget_scores, second.widget_scores, batch.widget_scores
+        ):
+            assert a is b is c
+            assert any(a is widget_score for widget_score in table)
+
+    def test_results_carry_score_source(self, engine, scoring_graph, shapes_graph):
+        """Each result entry records the Score instance it came from."""
+        result = engine.score(
+            Literal("2024-01-01", datatype=XSD.date),
+            data_graph=Graph(),
+            constraint_shape=EX.birthDateShape,
+            shapes_graph=shapes_graph,
+        )
+        sources = {ws.widget: ws.source for ws in result.widget_scores}
+        assert sources[EX.DatePickerEditor].uri == EX.DateScore
+        assert set(sources[EX.DatePickerEditor].shapes_graph_shapes) == {
+            EX.hasDatatype,
+            EX.hasDateDatatype,
+        }
+        assert sources[EX.DatePickerEditor].data_graph_shapes == ()
+        assert sources[EX.TextFieldEditor].uri == EX.TextScore
+
+    def test_score_source_distinguishes_equal_scores(self, scoring_graph):
+        """Scores with the same widget and score keep their own sources."""
+        scoring_graph.add((EX.OtherTextScore, RDF.type, SHUI.Score))
+        scoring_graph.add((EX.OtherTextScore, SHUI.widget, EX.TextFieldEditor))
+        scoring_graph.add((EX.OtherTextScore, SHUI.score, Literal(1)))
+        scoring_graph.add((EX.OtherTextScore, SHUI.dataGraphShape, EX.isBoolean))
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+        data_graph = Graph()
+        data_graph.add((EX.alice, EX.active, Literal(True)))
+
+        result = engine.score(Literal("text"), data_graph=data_graph)
+        assert [ws.source.uri for ws in result.widget_scores] == [EX.TextScore]
+        result = engine.score(Literal(True), data_graph=data_graph)
+        assert {
+            ws.source.uri
+            for ws in result.widget_scores
+            if ws.widget == EX.TextFieldEditor
+        } == {EX.TextScore, EX.OtherTextScore}
+
+    def test_score_matches_score_widgets(self, engine, scoring_graph, shapes_graph):
+        """Engine results are identical to score_widgets results."""
+        data_graph = Graph()
+        data_graph.add((EX.alice, EX.active, Literal(True)))
+
+        result = engine.score(
+            Literal(True),
+            data_graph=data_graph,
+            constraint_shape=EX.activeShape,
+            shapes_graph=shapes_graph,
+        )
+        expected = score_widgets(
+            focus_node=Literal(True),
+            widget_scoring_graph=scoring_graph,
+            data_graph_shapes_graph=scoring_graph,
+            shapes_graph_shapes_graph=scoring_graph,
+            data_graph=data_graph,
+            constraint_shape=EX.activeShape,
+            shapes_graph=shapes_graph,
+        )
+
+        assert result == expected
+        assert [ws.widget for ws in result.widget_scores] == [
+            EX.BooleanSelectEditor,
+            EX.LiteralEditor,
+            EX.TextFieldEditor,
+        ]
+
+    def test_score_input_validation(self, engine):
+        """Engine.score applies the same input validation as score_widgets."""
+        with pytest.raises(InvalidFocusNodeError):
+            engine.score(None, data_graph=Graph())
+        with pytest.raises(MissingGraphError):
+            engine.score(Literal(True))
+        with pytest.raises(MissingGraphError):
+            engine.score(Literal(True), data_graph=Graph(), constraint_shape=EX.S)
+
+    def test_shared_shape_validated_once_per_call(self, scoring_graph, shapes_graph):
+        """Scores sharing a dataGraphShape only validate it once per call."""
+        scoring_graph.add((EX.OtherBooleanScore, RDF.type, SHUI.Score))
+        scoring_graph.add((EX.OtherBooleanScore, SHUI.widget, EX.CheckboxEditor))
+        scoring_graph.add((EX.OtherBooleanScore, SHUI.score, Literal(Decimal("7"))))
+        scoring_graph.add((EX.OtherBooleanScore, SHUI.dataGraphShape, EX.isBoolean))
+        engine = ScoringEngine(
+            scoring_graph, scoring_graph, scoring_graph, literal_cache_size=0
+        )
+
+        data_graph = Graph()
+        data_graph.add((EX.alice, EX.active, Literal(True)))
+
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            result = engine.score(
+                Literal(True),
+                data_graph=data_graph,
+                constraint_shape=EX.nameShape,
+                shapes_graph=shapes_graph,
+            )
+
+        # One run for ex:isBoolean, one for ex:hasDatatype
+        assert spy.call_count == 2
+        assert [ws.widget for ws in result.widget_scores] == [
+            EX.BooleanSelectEditor,
+            EX.CheckboxEditor,
+            EX.TextFieldEditor,
+        ]
+
+
+class TestPrecomputeShapesVerdicts:
+    """Tests for bulk shapesGraphShape precomputation."""
+
+    def test_candidates_default_to_property_shapes(self, engine, shapes_graph):
+        """Every sh:property shape of the shapes graph is a candidate."""
+        table = engine.precompute_shapes_verdicts(shapes_graph)
+
+        assert isinstance(table, ShapesGraphVerdicts)
+        assert set(table.verdicts) == {
+            EX.birthDateShape,
+            EX.nameShape,
+            EX.activeShape,
+        }
+
+    def test_applicable_scores(self, engine, shapes_graph):
+        """The table maps each constraint shape to its applicable Scores."""
+        table = engine.precompute_shapes_verdicts(shapes_graph)
+
+        assert table.applicable_scores[EX.birthDateShape] == frozenset(
+            {EX.BooleanScore, EX.DatatypeScore, EX.DateScore, EX.TextScore}
+        )
+        assert table.applicable_scores[EX.activeShape] == frozenset(
+            {EX.BooleanScore, EX.DatatypeScore, EX.TextScore}
+        )
+        assert table.applicable_scores[EX.nameShape] == frozenset(
+            {EX.BooleanScore, EX.TextScore}
+        )
+        assert table.verdicts[EX.nameShape] == {
+            EX.hasDatatype: False,
+            EX.hasDateDatatype: True,
+        }
+
+    def test_one_validation_run_per_shape(self, engine, shapes_graph):
+        """Each shapesGraphShape is validated against all candidates at once."""
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            engine.precompute_shapes_verdicts(shapes_graph)
+
+        assert spy.call_count == 2
+
+    def test_score_with_table_skips_shapes_validation(
+        self, engine, scoring_graph, shapes_graph
+    ):
+        """Scoring with a precomputed table does not validate the constraint shape."""
+        table = engine.precompute_shapes_verdicts(shapes_graph)
+        data_graph = Graph()
+        data_graph.add(
+            (EX.alice, EX.birthDate, Literal("2000-01-01", datatype=XSD.date))
+        )
+        focus_node = Literal("2000-01-01", datatype=XSD.date)
+
+        expected = score_widgets(
+            focus_node=focus_node,
+            widget_scoring_graph=scoring_graph,
+            data_graph_shapes_graph=scoring_graph,
+            shapes_graph_shapes_graph=scoring_graph,
+            data_graph=data_graph,
+            constraint_shape=EX.birthDateShape,
+            shapes_graph=shapes_graph,
+        )
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            result = engine.score(
+                focus_node,
+                data_graph=data_graph,
+                constraint_shape=EX.birthDateShape,
+                shapes_graph=shapes_graph,
+                shapes_verdicts=table,
+            )
+
+        # Only the dataGraphShape is validated
+        assert spy.call_count == 1
+        assert result == expected
+        assert result.default_widget == EX.DatePickerEditor
+
+    def test_constraint_shape_missing_from_table_falls_back(self, engine, shapes_graph):
+        """Constraint shapes outside the table are validated as usual."""
+        table = engine.precompute_shapes_verdicts(
+            shapes_graph, constraint_shapes=[EX.nameShape]
+        )
+        data_graph = Graph()
+        data_graph.add((EX.alice, EX.active, Literal(True)))
+
+        result = engine.score(
+            Literal(True),
+            data_graph=data_graph,
+            constraint_shape=EX.activeShape,
+            shapes_graph=shapes_graph,
+            shapes_verdicts=table,
+        )
+
+        assert EX.activeShape not in table
+        assert [ws.widget for ws in result.widget_scores] == [
+            EX.BooleanSelectEditor,
+            EX.LiteralEditor,
+            EX.TextFieldEditor,
+        ]
+
+    def test_declared_targets_fall_back_to_per_node(self, scoring_graph, shapes_graph):
+        """Shapes with their own targets keep per-node validation semantics."""
+        scoring_graph.add((EX.hasDatatype, SH.targetNode, EX.nameShape))
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+
+        table = engine.precompute_shapes_verdicts(shapes_graph)
+
+        # ex:nameShape is targeted by ex:hasDatatype and fails it, which makes
+        # every validation session against this shapes graph fail
+        for candidate in table.verdicts:
+            assert table.verdicts[candidate] == {
+                EX.hasDatatype: False,
+                EX.hasDateDatatype: False,
+            }
+
+
+class TestLiteralVerdictCache:
+    """Tests for cross-call memoisation of value-only literal verdicts."""
+
+    @pytest.fixture
+    def cached_engine(self, scoring_graph):
+        """An engine with a value-only shape that is not datatype-determined."""
+        scoring_graph.parse(
+            data="""
+            @prefix sh: <http://www.w3.org/ns/shacl#> .
+            @prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+            @prefix ex: <http://example.org/> .
+
+            ex:isYesNo a sh:NodeShape ;
+                sh:in ("yes" "no") .
+
+            ex:YesNoScore a shui:Score ;
+                shui:widget ex:YesNoEditor ;
+                shui:score 6 ;
+                shui:dataGraphShape ex:isYesNo .
+            """,
+            format="turtle",
+        )
+        return ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+
+    def test_value_only_classification(self, scoring_graph):
+        """Value-only and graph-dependent dataGraphShapes are told apart."""
+        scoring_graph.add((EX.PropertyScore, RDF.type, SHUI.Score))
+        scoring_graph.add((EX.PropertyScore, SHUI.widget, EX.PropertyWidget))
+        scoring_graph.add((EX.PropertyScore, SHUI.score, Literal(Decimal("3"))))
+        scoring_graph.add((EX.PropertyScore, SHUI.dataGraphShape, EX.hasDatatype))
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+
+        assert engine.value_only_shapes == frozenset({EX.isBoolean})
+
+    def test_equal_literals_reuse_verdicts_across_calls(self, cached_engine):
+        """Equal literals in different data graphs share one validation per shape."""
+        first = Graph()
+        first.add((EX.alice, EX.answer, Literal("yes")))
+        second = Graph()
+        second.add((EX.bob, EX.reply, Literal("yes")))
+
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            first_result = cached_engine.score(Literal("yes"), data_graph=first)
+            second_result = cached_engine.score(Literal("yes"), data_graph=second)
+
+        # ex:isBoolean and ex:isYesNo are each validated once
+        assert spy.call_count == 2
+        assert first_result == second_result
+        assert first_result.default_widget == EX.YesNoEditor
+        assert cached_engine.literal_verdicts.info()["hits"] == 2
+
+    def test_existence_is_still_checked_per_call(self, cached_engine):
+        """A cached verdict does not apply when the literal is not in the data graph."""
+        data_graph = Graph()
+        data_graph.add((EX.alice, EX.answer, Literal("yes")))
+        cached_engine.score(Literal("yes"), data_graph=data_graph)
+
+        result = cached_engine.score(Literal("yes"), data_graph=Graph())
+
+        assert [ws.widget for ws in result.widget_scores] == [EX.TextFieldEditor]
+
+    def test_cache_key_distinguishes_datatype(self, cached_engine):
+        """Literals with the same lexical form but different datatypes are distinct."""
+        data_graph = Graph()
+        data_graph.add((EX.alice, EX.active, Literal("true", datatype=XSD.boolean)))
+        data_graph.add((EX.alice, EX.note, Literal("true")))
+
+        typed = cached_engine.score(
+            Literal("true", datatype=XSD.boolean), data_graph=data_graph
+        )
+        plain = cached_engine.score(Literal("true"), data_graph=data_graph)
+
+        assert typed.default_widget == EX.BooleanSelectEditor
+        assert plain.default_widget == EX.TextFieldEditor
+
+    def test_cache_is_bounded(self, scoring_graph):
+        """The cache never grows beyond its configured size."""
+        scoring_graph.add((EX.isSmall, RDF.type, SH.NodeShape))
+        scoring_graph.add((EX.isSmall, SH.maxInclusive, Literal(2)))
+        scoring_graph.add((EX.SmallScore, RDF.type, SHUI.Score))
+        scoring_graph.add((EX.SmallScore, SHUI.widget, EX.SliderEditor))
+        scoring_graph.add((EX.SmallScore, SHUI.score, Literal(Decimal("3"))))
+        scoring_graph.add((EX.SmallScore, SHUI.dataGraphShape, EX.isSmall))
+        engine = ScoringEngine(
+            scoring_graph, scoring_graph, scoring_graph, literal_cache_size=2
+        )
+        data_graph = Graph()
+        for i in range(5):
+            data_graph.add((EX.alice, EX.value, Literal(i)))
+            engine.score(Literal(i), data_graph=data_graph)
+
+        assert len(engine.literal_verdicts) == 2
+
+
+class TestDatatypeDispatch:
+    """Tests for the precomputed datatype dispatch table."""
+
+    LITERALS = [
+        Literal(True),
+        Literal("false", datatype=XSD.boolean),
+        Literal("maybe", datatype=XSD.boolean),
+        Literal("2025-01-15", datatype=XSD.date),
+        Literal("not a date", datatype=XSD.date),
+        Literal("2025-01-15T10:00:00", datatype=XSD.dateTime),
+        Literal(42),
+        Literal("abc", datatype=XSD.integer),
+        Literal("plain"),
+        Literal("typed", datatype=XSD.string),
+        Literal("tagged", lang="en"),
+        Literal("x", datatype=EX.customDatatype),
+    ]
+
+    @pytest.fixture
+    def dispatch_graph(self):
+        """Provide a scoring graph whose dataGraphShapes are datatype-determined."""
+        g = Graph()
+        g.parse(
+            data="""
+            @prefix sh: <http://www.w3.org/ns/shacl#> .
+            @prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+            @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+            @prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+            @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+            @prefix ex: <http://example.org/> .
+
+            ex:isBoolean a sh:NodeShape ; sh:datatype xsd:boolean .
+            ex:isDate a sh:NodeShape ; sh:datatype xsd:date .
+            ex:isString a sh:NodeShape ; sh:datatype xsd:string .
+            ex:isLangString a sh:NodeShape ; sh:datatype rdf:langString .
+            ex:hasDatatype a sh:NodeShape ; sh:datatype rdfs:Datatype .
+            ex:isTemporal a sh:NodeShape ;
+                sh:or ( [ sh:datatype xsd:date ] [ sh:datatype xsd:dateTime ] ) .
+            ex:isNotInteger a sh:NodeShape ;
+                sh:nodeKind sh:Literal ;
+                sh:not [ sh:datatype xsd:integer ] .
+            ex:isIRI a sh:NodeShape ; sh:nodeKind sh:IRI .
+
+            ex:S1 a shui:Score ; shui:widget ex:BooleanEditor ; shui:score 10 ;
+                shui:dataGraphShape ex:isBoolean .
+            ex:S2 a shui:Score ; shui:widget ex:DateEditor ; shui:score 9 ;
+                shui:dataGraphShape ex:isDate .
+            ex:S3 a shui:Score ; shui:widget ex:StringEditor ; shui:score 4 ;
+                shui:dataGraphShape ex:isString .
+            ex:S4 a shui:Score ; shui:widget ex:LangEditor ; shui:score 5 ;
+                shui:dataGraphShape ex:isLangString .
+            ex:S5 a shui:Score ; shui:widget ex:TypedEditor ; shui:score 2 ;
+                shui:dataGraphShape ex:hasDatatype .
+            ex:S6 a shui:Score ; shui:widget ex:TemporalEditor ; shui:score 8 ;
+                shui:dataGraphShape ex:isTemporal .
+            ex:S7 a shui:Score ; shui:widget ex:NotIntegerEditor ; shui:score 3 ;
+                shui:dataGraphShape ex:isNotInteger .
+            ex:S8 a shui:Score ; shui:widget ex:IRIEditor ; shui:score 7 ;
+                shui:dataGraphShape ex:isIRI .
+            ex:S9 a shui:Score ; shui:widget ex:TextEditor ; shui:score 1 .
+            ex:S10 a shui:Score ; shui:widget ex:ShapeEditor ; shui:score 6 ;
+                shui:shapesGraphShape ex:isIRI .
+            """,
+            format="turtle",
+        )
+        return g
+
+    def test_dispatch_table_is_built(self, dispatch_graph):
+        """Datatype-determined shapes produce a dispatch table."""
+        engine = ScoringEngine(dispatch_graph, dispatch_graph, dispatch_graph)
+
+        assert engine.datatype_dispatch is not None
+        assert engine.dispatch_datatypes == frozenset(
+            {
+                XSD.boolean,
+                XSD.date,
+                XSD.dateTime,
+                XSD.string,
+                XSD.integer,
+                RDF.langString,
+                URIRef("http://www.w3.org/2000/01/rdf-schema#Datatype"),
+            }
+        )
+
+    def test_dispatch_matches_pyshacl(self, dispatch_graph):
+        """Dispatched results are identical to full evaluation for every literal."""
+        engine = ScoringEngine(dispatch_graph, dispatch_graph, dispatch_graph)
+        data_graph = Graph()
+        for literal in self.LITERALS:
+            data_graph.add((EX.subject, EX.value, literal))
+
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            dispatched = [
+                engine.score(literal, data_graph=data_graph)
+                for literal in self.LITERALS
+            ]
+        assert spy.call_count == 0
+
+        for literal, result in zip(self.LITERALS, dispatched):
+            expected = score_widgets(
+                focus_node=literal,
+                widget_scoring_graph=dispatch_graph,
+                data_graph_shapes_graph=dispatch_graph,
+                shapes_graph_shapes_graph=dispatch_graph,
+                data_graph=data_graph,
+                constraint_shape=EX.isIRI,
+                shapes_graph=dispatch_graph,
+            )
+            # Drop the shapes-side Score, which needs a constraint shape
+            expected_scores = [
+                ws for ws in expected.widget_scores if ws.widget != EX.ShapeEditor
+            ]
+            assert result.widget_scores == expected_scores, literal
+
+    def test_literal_missing_from_data_graph(self, dispatch_graph):
+        """Literals absent from the data graph only get unconditional Scores."""
+        engine = ScoringEngine(dispatch_graph, dispatch_graph, dispatch_graph)
+
+        result = engine.score(Literal(True), data_graph=Graph())
+
+        assert [ws.widget for ws in result.widget_scores] == [EX.TextEditor]
+
+    def test_results_are_not_shared(self, dispatch_graph):
+        """Mutating a dispatched result does not affect later calls."""
+        engine = ScoringEngine(dispatch_graph, dispatch_graph, dispatch_graph)
+        data_graph = Graph()
+        data_graph.add((EX.subject, EX.value, Literal(True)))
+
+        engine.score(Literal(True), data_graph=data_graph).widget_scores.clear()
+
+        assert engine.score(Literal(True), data_graph=data_graph).widget_scores
+
+    def test_graph_dependent_shape_disables_dispatch(self, dispatch_graph):
+        """A graph-dependent dataGraphShape falls back to normal evaluation."""
+        dispatch_graph.add((EX.S11, RDF.type, SHUI.Score))
+        dispatch_graph.add((EX.S11, SHUI.widget, EX.PersonEditor))
+        dispatch_graph.add((EX.S11, SHUI.score, Literal(Decimal("1"))))
+        dispatch_graph.add((EX.S11, SHUI.dataGraphShape, EX.isPerson))
+        dispatch_graph.add((EX.isPerson, SH["class"], EX.Person))
+
+        engine = ScoringEngine(dispatch_graph, dispatch_graph, dispatch_graph)
+
+        assert engine.datatype_dispatch is None
+
+
+class TestScoreBatch:
+    """Tests for bitset-based batch scoring."""
+
+    BATCH_TTL = """
+    @prefix sh: <http://www.w3.org/ns/shacl#> .
+    @prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+    @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+    @prefix ex: <http://example.org/> .
+
+    ex:isBoolean a sh:NodeShape ; sh:datatype xsd:boolean .
+    ex:isYesNo a sh:NodeShape ; sh:in ("yes" "no") .
+    ex:isNamed a sh:NodeShape ;
+        sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+    ex:isIRI a sh:NodeShape ; sh:nodeKind sh:IRI .
+
+    ex:S1 a shui:Score ; shui:widget ex:BooleanEditor ; shui:score 10 ;
+        shui:dataGraphShape ex:isBoolean .
+    ex:S2 a shui:Score ; shui:widget ex:YesNoEditor ; shui:score 6 ;
+        shui:dataGraphShape ex:isYesNo .
+    ex:S3 a shui:Score ; shui:widget ex:NamedResourceEditor ; shui:score 8 ;
+        shui:dataGraphShape ex:isNamed, ex:isIRI .
+    ex:S4 a shui:Score ; shui:widget ex:ResourceEditor ; shui:score 5 ;
+        shui:dataGraphShape ex:isIRI .
+    ex:S5 a shui:Score ; shui:widget ex:TextEditor ; shui:score 1 .
+    """
+
+    @pytest.fixture
+    def batch_graph(self):
+        """Provide a scoring graph with value-only and graph-dependent shapes."""
+        g = Graph()
+        g.parse(data=self.BATCH_TTL, format="turtle")
+        return g
+
+    @pytest.fixture
+    def data_graph(self):
+        """Provide a data graph with resources and literals."""
+        g = Graph()
+        g.add((EX.alice, EX.name, Literal("Alice")))
+        g.add((EX.alice, EX.knows, EX.bob))
+        g.add((EX.alice, EX.active, Literal(True)))
+        g.add((EX.alice, EX.answer, Literal("yes")))
+        g.add((EX.bob, EX.answer, Literal("no")))
+        return g
+
+    FOCUS_NODES = [
+        EX.alice,
+        EX.bob,
+        Literal(True),
+        Literal("yes"),
+        Literal("no"),
+        Literal("Alice"),
+        EX.alice,
+        EX.nobody,
+        Literal("absent"),
+    ]
+
+    def test_batch_matches_single_calls(self, batch_graph, data_graph):
+        """Every batch result is identical to scoring the node on its own."""
+        engine = ScoringEngine(batch_graph, batch_graph, batch_graph)
+
+        results = engine.score_batch(self.FOCUS_NODES, data_graph=data_graph)
+
+        assert len(results) == len(self.FOCUS_NODES)
+        for focus_node, result in zip(self.FOCUS_NODES, results):
+            expected = score_widgets(
+                focus_node=focus_node,
+                widget_scoring_graph=batch_graph,
+                data_graph_shapes_graph=batch_graph,
+                shapes_graph_shapes_graph=batch_graph,
+                data_graph=data_graph,
+            )
+            assert result == expected, focus_node
+
+    def test_one_validation_run_per_shape(self, batch_graph, data_graph):
+        """Each distinct shape is validated once for the whole batch."""
+        engine = ScoringEngine(
+            batch_graph, batch_graph, batch_graph, literal_cache_size=0
+        )
+
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            engine.score_batch(self.FOCUS_NODES, data_graph=data_graph)
+
+        assert spy.call_count == 4
+
+    def test_batch_with_constraint_shape(self, batch_graph, data_graph):
+        """Shapes-side verdicts apply to every node of the batch."""
+        batch_graph.add((EX.S6, RDF.type, SHUI.Score))
+        batch_graph.add((EX.S6, SHUI.widget, EX.ShapeEditor))
+        batch_graph.add((EX.S6, SHUI.score, Literal(Decimal("20"))))
+        batch_graph.add((EX.S6, SHUI.shapesGraphShape, EX.isIRI))
+        engine = ScoringEngine(batch_graph, batch_graph, batch_graph)
+        shapes_graph = Graph()
+        shapes_graph.add((EX.answerShape, SH.path, EX.answer))
+
+        results = engine.score_batch(
+            [Literal("yes"), EX.alice],
+            data_graph=data_graph,
+            constraint_shape=EX.answerShape,
+            shapes_graph=shapes_graph,
+        )
+
+        assert [ws.widget for ws in results[0].widget_scores] == [
+            EX.ShapeEditor,
+            EX.YesNoEditor,
+            EX.TextEditor,
+        ]
+        assert results[1].default_widget == EX.ShapeEditor
+
+    def test_empty_batch(self, batch_graph):
+        """An empty batch returns no results."""
+        engine = ScoringEngine(batch_graph, batch_graph, batch_graph)
+        assert engine.score_batch([], data_graph=Graph()) == []
+
+    def test_batch_input_validation(self, batch_graph):
+        """Invalid nodes in a batch raise before any work is done."""
+        engine = ScoringEngine(batch_graph, batch_graph, batch_graph)
+        with pytest.raises(InvalidFocusNodeError):
+            engine.score_batch([EX.alice, "not a node"], data_graph=Graph())
+        with pytest.raises(MissingGraphError):
+            engine.score_batch([EX.alice])
+        with pytest.raises(MissingGraphError):
+            engine.score_batch([], data_graph=None)
+        with pytest.raises(MissingGraphError):
+            engine.score_batch(
+                [EX.alice], data_graph=Graph(), constraint_shape=EX.answerShape
+            )
+
+    def test_large_batch(self, batch_graph):
+        """Bitset columns over thousands of rows select the right nodes."""
+        engine = ScoringEngine(batch_graph, batch_graph, batch_graph, backend="native")
+        data_graph = Graph()
+        focus_nodes = [EX[f"item{i}"] for i in range(5000)]
+        for i, node in enumerate(focus_nodes):
+            data_graph.add((node, EX.rank, Literal(i)))
+            if i % 3 == 0:
+                data_graph.add((node, EX.name, Literal(f"Item {i}")))
+
+        results = engine.score_batch(focus_nodes, data_graph=data_graph)
+
+        widgets = [result.default_widget for result in results]
+        assert widgets[::3] == [EX.NamedResourceEditor] * 1667
+        assert widgets[1::3] == [EX.ResourceEditor] * 1667
+        assert widgets[2::3] == [EX.ResourceEditor] * 1666
+
+    def test_set_bits_and_flags_mask(self):
+        """Row flags convert to a bitset whose set bits are the flagged rows."""
+        flags = _row_flags(100_000)
+        rows = list(range(7, 100_000, 7919))
+        for index in rows:
+            flags[index] = ord("1")
+        mask = _flags_mask(flags)
+
+        assert mask == sum(1 << index for index in rows)
+        assert list(_set_bits(mask)) == rows
+        assert list(_set_bits(0)) == []
+        assert _flags_mask(_row_flags(0)) == 0
+
+
+class TestIterScores:
+    """Tests for streaming results with iter_scores."""
+
+    @pytest.fixture
+    def batch_graph(self):
+        """Provide the scoring graph of TestScoreBatch."""
+        g = Graph()
+        g.parse(data=TestScoreBatch.BATCH_TTL, format="turtle")
+        return g
+
+    @pytest.fixture
+    def data_graph(self):
+        """Provide a data graph with a named resource and literals."""
+        g = Graph()
+        g.add((EX.alice, EX.name, Literal("Alice")))
+        g.add((EX.alice, EX.active, Literal(True)))
+        g.add((EX.alice, EX.answer, Literal("yes")))
+        return g
+
+    def test_matches_score(self, batch_graph, data_graph):
+        """The iterator yields the entries of score in the same order."""
+        engine = ScoringEngine(batch_graph, batch_graph, batch_graph)
+        for focus_node in TestScoreBatch.FOCUS_NODES:
+            assert (
+                list(engine.iter_scores(focus_node, data_graph=data_graph))
+                == engine.score(focus_node, data_graph=data_graph).widget_scores
+            )
+
+    def test_stopping_early_skips_remaining_shapes(self, batch_graph, data_graph):
+        """Only the shapes of Scores evaluated before the first result are validated."""
+        engine = ScoringEngine(
+            batch_graph, batch_graph, batch_graph, literal_cache_size=0
+        )
+
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            widget_scores = engine.iter_scores(EX.alice, data_graph=data_graph)
+            assert spy.call_count == 0
+            first = next(widget_scores)
+            widget_scores.close()
+
+        assert first.widget == EX.NamedResourceEditor
+        # ex:isBoolean, ex:isNamed and ex:isIRI, but not ex:isYesNo
+        assert spy.call_count == 3
+
+    def test_inputs_are_checked_on_call(self, engine):
+        """Invalid inputs raise before the first item is requested."""
+        with pytest.raises(MissingGraphError):
+            engine.iter_scores(EX.alice)
+        with pytest.raises(MissingGraphError):
+            engine.iter_scores(EX.alice, data_graph=Graph(), constraint_shape=EX.s)
+
+    def test_iter_widget_scores(self, batch_graph, data_graph):
+        """iter_widget_scores streams the entries of score_widgets."""
+        for focus_node in (EX.alice, Literal(True), Literal("yes")):
+            expected = score_widgets(
+                focus_node, batch_graph, batch_graph, batch_graph, data_graph=data_graph
+            )
+            assert (
+                list(
+                    iter_widget_scores(
+                        focus_node,
+                        batch_graph,
+                        batch_graph,
+                        batch_graph,
+                        data_graph=data_graph,
+                    )
+                )
+                == expected.widget_scores
+            )
+
+
+class TestEvaluationApi:
+    """Tests for the public evaluation methods used by scoring front-ends."""
+
+    @pytest.fixture
+    def batch_graph(self):
+        """Provide the scoring graph of TestScoreBatch."""
+        g = Graph()
+        g.parse(data=TestScoreBatch.BATCH_TTL, format="turtle")
+        return g
+
+    @pytest.fixture
+    def data_graph(self):
+        """Provide a data graph with a named resource and literals."""
+        g = Graph()
+        g.add((EX.alice, EX.name, Literal("Alice")))
+        g.add((EX.alice, EX.answer, Literal("yes")))
+        return g
+
+    def test_check_inputs(self):
+        """check_inputs raises the exceptions of score."""
+        check_inputs(EX.alice, Graph())
+        with pytest.raises(InvalidFocusNodeError):
+            check_inputs("alice", Graph())
+        with pytest.raises(MissingGraphError):
+            check_inputs(EX.alice, None)
+        with pytest.raises(MissingGraphError):
+            check_inputs(EX.alice, Graph(), constraint_shape=EX.s)
+
+    def test_evaluate_matches_score(self, batch_graph, data_graph):
+        """evaluate with empty memos gives the widgets of score and fills the memos."""
+        engine = ScoringEngine(batch_graph, batch_graph, batch_graph)
+        for focus_node in TestScoreBatch.FOCUS_NODES:
+            data_verdicts = {}
+            widget_scores = engine.evaluate(
+                focus_node, data_graph, None, None, data_verdicts, {}
+            )
+            expected = engine.score(focus_node, data_graph=data_graph)
+            assert widget_scores == expected.widget_scores
+            assert data_verdicts
+
+    def test_evaluate_uses_memos(self, batch_graph, data_graph):
+        """Memoised verdicts are used as they are."""
+        engine = ScoringEngine(batch_graph, batch_graph, batch_graph)
+        data_verdicts = {EX.isNamed: False, EX.isIRI: True, EX.isBoolean: False}
+
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            widget_scores = engine.evaluate(
+                EX.alice, data_graph, None, None, data_verdicts, {}
+            )
+        # Only ex:isYesNo is validated
+        assert spy.call_count == 1
+        assert [ws.widget for ws in widget_scores] == [
+            EX.ResourceEditor,
+            EX.TextEditor,
+        ]
+
+    def test_data_verdict_without_validation(self, batch_graph, data_graph):
+        """With validate=False, only verdicts known without validation are returned."""
+        engine = ScoringEngine(batch_graph, batch_graph, batch_graph)
+        verdicts = {}
+
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            assert (
+                engine.data_verdict(
+                    EX.alice, data_graph, EX.isNamed, verdicts, validate=False
+                )
+                is None
+            )
+            # Absent literals fail value-only shapes without validation
+            assert (
+                engine.data_verdict(
+                    Literal("absent"), data_graph, EX.isYesNo, {}, validate=False
+                )
+                is False
+            )
+        assert spy.call_count == 0
+
+        assert engine.data_verdict(EX.alice, data_graph, EX.isNamed, verdicts)
+        assert verdicts == {EX.isNamed: True}
+
+    def test_shapes_graph_verdict(self, engine, shapes_graph):
+        """shapesGraphShape verdicts are memoised and seeded from precomputation."""
+        verdicts = {}
+        for validate, expected in ((False, None), (True, True)):
+            assert (
+                engine.shapes_graph_verdict(
+                    EX.activeShape,
+                    shapes_graph,
+                    EX.hasDatatype,
+                    verdicts,
+                    validate=validate,
+                )
+                is expected
+            )
+        assert verdicts == {EX.hasDatatype: True}
+
+        precomputed = engine.precompute_shapes_verdicts(shapes_graph)
+        memo = engine.initial_shape_verdicts(EX.activeShape, precomputed)
+        assert memo == precomputed.verdicts[EX.activeShape]
+        assert memo is not precomputed.verdicts[EX.activeShape]
+        assert engine.initial_shape_verdicts(None, precomputed) == {}
+
+    def test_dispatch_result(self, engine, data_graph):
+        """Literals without a constraint shape are answered from the dispatch table."""
+        assert engine.datatype_dispatch is not None
+        data_graph.add((EX.alice, EX.active, Literal(True)))
+
+        result = engine.dispatch_result(Literal(True), data_graph)
+        assert result == engine.score(Literal(True), data_graph=data_graph)
+        assert engine.dispatch_result(EX.alice, data_graph) is None
+        assert engine.dispatch_result(Literal(True), data_graph, EX.s) is None
+
+
+class TestScoreForm:
+    """Tests for scoring every property value of a form at once."""
+
+    @pytest.fixture
+    def form_data_graph(self):
+        """Provide a person with two birth dates, an active flag and no name."""
+        g = Graph()
+        g.add((EX.alice, RDF.type, EX.Person))
+        g.add((EX.alice, EX.birthDate, Literal("2000-01-01", datatype=XSD.date)))
+        g.add((EX.alice, EX.birthDate, Literal("2000-01-02", datatype=XSD.date)))
+        g.add((EX.alice, EX.active, Literal(True)))
+        g.add((EX.bob, EX.active, Literal(True)))
+        return g
+
+    def test_matches_per_value_scoring(self, engine, shapes_graph, form_data_graph):
+        """Every value result equals scoring the value with its property shape."""
+        form = engine.score_form(
+            EX.alice, EX.PersonShape, form_data_graph, shapes_graph
+        )
+
+        assert list(form) == list(shapes_graph.objects(EX.PersonShape, SH.property))
+        assert form[EX.activeShape].path == EX.active
+        assert list(form[EX.birthDateShape].value_scores) == [
+            Literal("2000-01-01", datatype=XSD.date),
+            Literal("2000-01-02", datatype=XSD.date),
+        ]
+        for property_shape, property_scores in form.items():
+            for value, result in property_scores.value_scores.items():
+                assert result == engine.score(
+                    value,
+                    data_graph=form_data_graph,
+                    constraint_shape=property_shape,
+                    shapes_graph=shapes_graph,
+                ), (property_shape, value)
+
+    def test_empty_property_scores_shape_alone(
+        self, engine, shapes_graph, form_data_graph
+    ):
+        """Properties without values are ranked by the Scores needing no value."""
+        form = engine.score_form(
+            EX.alice, EX.PersonShape, form_data_graph, shapes_graph
+        )
+
+        assert form[EX.nameShape].value_scores == {}
+        assert [ws.widget for ws in form[EX.nameShape].shape_scores.widget_scores] == [
+            EX.TextFieldEditor
+        ]
+        assert [
+            ws.widget for ws in form[EX.birthDateShape].shape_scores.widget_scores
+        ] == [EX.DatePickerEditor, EX.LiteralEditor, EX.TextFieldEditor]
+
+    def test_one_validation_run_per_shape(
+        self, scoring_graph, shapes_graph, form_data_graph
+    ):
+        """Each shape is validated once for the whole form."""
+        engine = ScoringEngine(
+            scoring_graph, scoring_graph, scoring_graph, literal_cache_size=0
+        )
+
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            engine.score_form(EX.alice, EX.PersonShape, form_data_graph, shapes_graph)
+
+        # ex:hasDatatype, ex:hasDateDatatype and ex:isBoolean
+        assert spy.call_count == 3
+
+    def test_precomputed_verdicts_are_used(self, engine, shapes_graph, form_data_graph):
+        """A shapes verdict table covering the form skips shapes-side validation."""
+        table = engine.precompute_shapes_verdicts(shapes_graph)
+        expected = engine.score_form(
+            EX.alice, EX.PersonShape, form_data_graph, shapes_graph
+        )
+
+        precompute = engine.precompute_shapes_verdicts
+        with patch.object(
+            engine, "precompute_shapes_verdicts", wraps=precompute
+        ) as spy:
+            form = engine.score_form(
+                EX.alice,
+                EX.PersonShape,
+                form_data_graph,
+                shapes_graph,
+                shapes_verdicts=table,
+            )
+
+        assert spy.call_count == 0
+        assert form == expected
+
+    def test_score_form(self, scoring_graph, shapes_graph, form_data_graph):
+        """score_form compiles the scoring graph and scores the form."""
+        form = score_form(
+            EX.alice,
+            EX.PersonShape,
+            form_data_graph,
+            shapes_graph,
+            scoring_graph,
+            scoring_graph,
+            scoring_graph,
+        )
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+        assert form == engine.score_form(
+            EX.alice, EX.PersonShape, form_data_graph, shapes_graph
+        )
+
+    def test_missing_shapes_graph_raises(self, engine, form_data_graph):
+        """A form needs a shapes graph."""
+        with pytest.raises(MissingGraphError):
+            engine.score_form(EX.alice, EX.PersonShape, form_data_graph, None)
+
+
+class TestScoreTableUpdates:
+    """Tests for adding, removing and updating Score instances in place."""
+
+    EDITS_TTL = """
+    @prefix sh: <http://www.w3.org/ns/shacl#> .
+    @prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+    @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+    @prefix ex: <http://example.org/> .
+
+    ex:isDate a sh:NodeShape ;
+        sh:datatype xsd:date .
+
+    ex:DateScore a shui:Score ;
+        shui:widget ex:DatePickerEditor ;
+        shui:score 15 ;
+        shui:dataGraphShape ex:isDate .
+    """
+
+    @staticmethod
+    def assert_same_as_rebuild(engine, widget_scoring_graph):
+        """Check an edited engine against one compiled from scratch."""
+        rebuilt = ScoringEngine(
+            widget_scoring_graph, widget_scoring_graph, widget_scoring_graph
+        )
+        assert engine.score_instances == rebuilt.score_instances
+        assert engine.datatype_dispatch == rebuilt.datatype_dispatch
+
+        data_graph = Graph()
+        literals = [
+            Literal(True),
+            Literal("2025-01-15", datatype=XSD.date),
+            Literal("not a date", datatype=XSD.date),
+            Literal("text"),
+        ]
+        for i, literal in enumerate(literals):
+            data_graph.add((EX[f"item{i}"], EX.value, literal))
+        for literal in literals:
+            assert engine.score(literal, data_graph=data_graph) == rebuilt.score(
+                literal, data_graph=data_graph
+            )
+
+    @pytest.fixture
+    def edits_graph(self):
+        """Provide a graph with a Score instance to add."""
+        g = Graph()
+        g.parse(data=self.EDITS_TTL, format="turtle")
+        return g
+
+    @pytest.fixture
+    def dispatch_graph(self):
+        """Provide a scoring graph of data graph Scores only."""
+        g = Graph()
+        g.parse(data=SCORING_TTL, format="turtle")
+        for score_uri in (EX.DatatypeScore, EX.DateScore):
+            g.remove((score_uri, None, None))
+        return g
+
+    def test_add_score(self, dispatch_graph, edits_graph):
+        """An added Score is placed in result order and used for dispatch."""
+        engine = ScoringEngine(dispatch_graph, dispatch_graph, dispatch_graph)
+        dispatch_graph += edits_graph
+        engine.add_score(EX.DateScore, dispatch_graph)
+
+        assert EX.DatePickerEditor in [s["widget"] for s in engine.score_instances]
+        assert XSD.date in engine.dispatch_datatypes
+        self.assert_same_as_rebuild(engine, dispatch_graph)
+
+    def test_add_validates_only_the_new_score(self, dispatch_graph, edits_graph):
+        """Adding a Score meta-validates a graph of that Score alone."""
+        engine = ScoringEngine(dispatch_graph, dispatch_graph, dispatch_graph)
+        dispatch_graph += edits_graph
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            engine.add_score(EX.DateScore, dispatch_graph)
+
+        assert spy.call_count == 1
+        validated = spy.call_args.kwargs["data_graph"]
+        assert set(validated.subjects()) == {EX.DateScore}
+
+    def test_add_malformed_score_leaves_engine_unchanged(self, engine):
+        """A malformed Score is rejected and the table is untouched."""
+        before = list(engine.score_instances)
+        g = Graph()
+        g.add((EX.BadScore, RDF.type, SHUI.Score))
+        g.add((EX.BadScore, SHUI.score, Literal(1)))
+
+        with pytest.raises(MalformedScoreError):
+            engine.add_score(EX.BadScore, g)
+        assert engine.score_instances == before
+
+    def test_add_existing_score_raises(self, engine, scoring_graph):
+        """Adding a Score that is already compiled raises ValueError."""
+        with pytest.raises(ValueError):
+            engine.add_score(EX.TextScore, scoring_graph)
+
+    def test_remove_score(self, dispatch_graph):
+        """A removed Score no longer contributes to results."""
+        engine = ScoringEngine(dispatch_graph, dispatch_graph, dispatch_graph)
+        engine.remove_score(EX.BooleanScore)
+        dispatch_graph.remove((EX.BooleanScore, None, None))
+
+        self.assert_same_as_rebuild(engine, dispatch_graph)
+
+    def test_remove_missing_score_raises(self, engine):
+        """Removing an unknown Score raises KeyError."""
+        with pytest.raises(KeyError):
+            engine.remove_score(EX.UnknownScore)
+
+    def test_update_reweights_score(self, dispatch_graph):
+        """Re-weighting a Score moves it to its new position."""
+        engine = ScoringEngine(dispatch_graph, dispatch_graph, dispatch_graph)
+        dispatch_graph.set((EX.TextScore, SHUI.score, Literal(50)))
+        engine.update_score(EX.TextScore, dispatch_graph)
+
+        assert engine.score_instances[0]["uri"] == EX.TextScore
+        self.assert_same_as_rebuild(engine, dispatch_graph)
+
+    def test_update_malformed_score_keeps_old_definition(self, engine):
+        """A malformed update leaves the previous definition in place."""
+        before = list(engine.score_instances)
+        g = Graph()
+        g.add((EX.TextScore, SHUI.score, Literal(3)))
+
+        with pytest.raises(MalformedScoreError):
+            engine.update_score(EX.TextScore, g)
+        assert engine.score_instances == before
+
+    def test_update_missing_score_raises(self, engine, scoring_graph):
+        """Updating an unknown Score raises KeyError."""
+        with pytest.raises(KeyError):
+            engine.update_score(EX.UnknownScore, scoring_graph)
+
+    def test_edits_replace_tables(self, dispatch_graph, edits_graph):
+        """Edits publish new tables and leave the ones in use untouched."""
+        engine = ScoringEngine(dispatch_graph, dispatch_graph, dispatch_graph)
+        table = engine.score_instances
+        before = list(table)
+        dispatch = engine.datatype_dispatch
+        dispatch_before = dict(dispatch)
+
+        dispatch_graph += edits_graph
+        engine.add_score(EX.DateScore, dispatch_graph)
+        dispatch_graph.set((EX.TextScore, SHUI.score, Literal(50)))
+        engine.update_score(EX.TextScore, dispatch_graph)
+        engine.remove_score(EX.BooleanScore)
+
+        assert engine.score_instances is not table
+        assert engine.datatype_dispatch is not dispatch
+        assert table == before
+        assert dispatch == dispatch_before
+
+
+class TestThreadedEvaluation:
+    """Tests for concurrent evaluation on a thread pool."""
+
+    FOCUS_NODES = TestScoreBatch.FOCUS_NODES
+
+    @pytest.fixture
+    def batch_graph(self):
+        """Provide a scoring graph with value-only and graph-dependent shapes."""
+        g = Graph()
+        g.parse(data=TestScoreBatch.BATCH_TTL, format="turtle")
+        return g
+
+    @pytest.fixture
+    def data_graph(self):
+        """Provide a data graph with resources and literals."""
+        g = Graph()
+        g.add((EX.alice, EX.name, Literal("Alice")))
+        g.add((EX.alice, EX.active, Literal(True)))
+        g.add((EX.alice, EX.answer, Literal("yes")))
+        g.add((EX.bob, EX.answer, Literal("no")))
+        return g
+
+    def test_score_matches_serial(self, batch_graph, data_graph):
+        """Concurrent shape evaluation gives the serial results."""
+        serial = ScoringEngine(batch_graph, batch_graph, batch_graph)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            threaded = ScoringEngine(
+                batch_graph, batch_graph, batch_graph, executor=executor
+            )
+            for focus_node in self.FOCUS_NODES:
+                assert threaded.score(
+                    focus_node, data_graph=data_graph
+                ) == serial.score(focus_node, data_graph=data_graph)
+            assert threaded.score_batch(
+                self.FOCUS_NODES, data_graph=data_graph
+            ) == serial.score_batch(self.FOCUS_NODES, data_graph=data_graph)
+
+    def test_constraint_shape_matches_serial(self, scoring_graph, shapes_graph):
+        """Shapes-side verdicts computed concurrently match the serial ones."""
+        data_graph = Graph()
+        data_graph.add(
+            (EX.alice, EX.birthDate, Literal("2000-01-01", datatype=XSD.date))
+        )
+        serial = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            threaded = ScoringEngine(
+                scoring_graph, scoring_graph, scoring_graph, executor=executor
+            )
+            for constraint_shape in (EX.birthDateShape, EX.nameShape, EX.activeShape):
+                kwargs = dict(
+                    data_graph=data_graph,
+                    constraint_shape=constraint_shape,
+                    shapes_graph=shapes_graph,
+                )
+                assert threaded.score(EX.alice, **kwargs) == serial.score(
+                    EX.alice, **kwargs
+                )
+            assert threaded.precompute_shapes_verdicts(
+                shapes_graph
+            ) == serial.precompute_shapes_verdicts(shapes_graph)
+
+    def test_engine_shared_between_threads(self, batch_graph, data_graph):
+        """One engine can serve concurrent score calls from many threads."""
+        engine = ScoringEngine(batch_graph, batch_graph, batch_graph)
+        expected = [engine.score(n, data_graph=data_graph) for n in self.FOCUS_NODES]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda n: engine.score(n, data_graph=data_graph),
+                    self.FOCUS_NODES * 10,
+                )
+            )
+        assert results == expected * 10
+
+    def test_literal_cache_is_thread_safe(self):
+        """Concurrent gets and puts keep the cache bounded and counted."""
+        cache = LRUCache(maxsize=64)
+
+        def work(offset):
+            for i in range(1000):
+                key = (offset + i) % 200
+                if cache.get(key) is None:
+                    cache.put(key, True)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(8)))
+
+        info = cache.info()
+        assert info["size"] == len(cache) <= 64
+        assert info["hits"] + info["misses"] == 8000
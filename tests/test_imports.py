@@ -0,0 +1,115 @@
+"""Tests for lazy loading of pyshacl and its dependencies."""
+
+import subprocess
+import sys
+import textwrap
+
+from rdflib import Graph
+
+from shui_widget_scoring import ScoringEngine
+from shui_widget_scoring.artifact import save_engine
+
+# Modules only code paths that validate with pyshacl may import
+VALIDATOR_MODULES = ("pyshacl", "owlrl")
+
+SCORING_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:isBoolean a sh:NodeShape ;
+    sh:datatype xsd:boolean .
+
+ex:BooleanScore a shui:Score ;
+    shui:widget ex:BooleanSelectEditor ;
+    shui:score 10 ;
+    shui:dataGraphShape ex:isBoolean .
+
+ex:TextScore a shui:Score ;
+    shui:widget ex:TextFieldEditor ;
+    shui:score 1 .
+"""
+
+
+def run_python(code: str) -> str:
+    """Run code in a fresh interpreter and return its standard output."""
+    completed = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return completed.stdout.strip()
+
+
+class TestLazyImports:
+    """Tests that pyshacl is only imported by code paths that validate."""
+
+    def test_package_import_does_not_load_pyshacl(self):
+        """Importing the public API does not import pyshacl."""
+        output = run_python(
+            """
+            import sys
+            from shui_widget_scoring import WidgetScore, ScoringEngine, score_widgets
+            print("pyshacl" in sys.modules)
+            """
+        )
+        assert output == "False"
+
+    def test_loading_artifact_does_not_load_pyshacl(self, tmp_path):
+        """Loading a precompiled engine and scoring natively does not import pyshacl."""
+        g = Graph().parse(data=SCORING_TTL, format="turtle")
+        path = tmp_path / "engine.bin"
+        save_engine(ScoringEngine(g, g, g), path)
+
+        output = run_python(
+            f"""
+            import sys
+            from rdflib import Graph, Literal, URIRef
+            from shui_widget_scoring.artifact import load_engine
+
+            engine = load_engine({str(path)!r})
+            data_graph = Graph()
+            data_graph.add((URIRef("http://example.org/x"), URIRef("http://example.org/p"), Literal(True)))
+            result = engine.score(Literal(True), data_graph=data_graph)
+            print(result.default_widget, "pyshacl" in sys.modules)
+            """
+        )
+        assert output == "http://example.org/BooleanSelectEditor False"
+
+    def test_modules_do_not_load_validator(self):
+        """Importing every module of the package imports neither pyshacl nor owlrl."""
+        output = run_python(
+            f"""
+            import importlib
+            import pkgutil
+            import sys
+            import shui_widget_scoring
+
+            for module in pkgutil.iter_modules(shui_widget_scoring.__path__):
+                if module.name != "__main__":
+                    importlib.import_module(f"shui_widget_scoring.{{module.name}}")
+            print([name for name in {VALIDATOR_MODULES!r} if name in sys.modules])
+            """
+        )
+        assert output == "[]"
+
+    def test_native_backend_does_not_load_pyshacl(self):
+        """Scoring with the native backend never imports pyshacl."""
+        output = run_python(
+            f"""
+            import sys
+            from rdflib import Graph, Literal, URIRef
+            from shui_widget_scoring import score_widgets
+
+            g = Graph().parse(data={SCORING_TTL!r}, format="turtle")
+            data_graph = Graph()
+            data_graph.add((URIRef("http://example.org/x"), URIRef("http://example.org/p"), Literal(True)))
+            result = score_widgets(
+                URIRef("http://example.org/x"), g, g, g, data_graph=data_graph, backend="native"
+            )
+            print(result.default_widget, "pyshacl" in sys.modules)
+            """
+        )
+        assert output == "http://example.org/TextFieldEditor False"
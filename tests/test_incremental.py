@@ -0,0 +1,152 @@
+"""Tests for incremental re-scoring."""
+
+from unittest.mock import patch
+
+import pyshacl
+import pytest
+from rdflib import Graph, Literal, Namespace
+from rdflib.namespace import RDF
+
+from shui_widget_scoring import ScoringEngine, score_widgets
+from shui_widget_scoring.incremental import IncrementalScorer
+
+EX = Namespace("http://example.org/")
+
+SCORING_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:isBoolean a sh:NodeShape ; sh:datatype xsd:boolean .
+ex:isPerson a sh:NodeShape ; sh:class ex:Person .
+ex:isNamed a sh:NodeShape ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+
+ex:BooleanScore a shui:Score ; shui:widget ex:BooleanEditor ; shui:score 10 ;
+    shui:dataGraphShape ex:isBoolean .
+ex:PersonScore a shui:Score ; shui:widget ex:PersonEditor ; shui:score 8 ;
+    shui:dataGraphShape ex:isPerson .
+ex:NamedScore a shui:Score ; shui:widget ex:NamedEditor ; shui:score 6 ;
+    shui:dataGraphShape ex:isNamed .
+ex:TextScore a shui:Score ; shui:widget ex:TextEditor ; shui:score 1 .
+"""
+
+
+@pytest.fixture
+def scoring_graph():
+    """Provide a scoring graph with value-only and graph-dependent shapes."""
+    g = Graph()
+    g.parse(data=SCORING_TTL, format="turtle")
+    return g
+
+
+@pytest.fixture
+def data_graph():
+    """Provide a data graph with two people."""
+    g = Graph()
+    g.add((EX.alice, RDF.type, EX.Person))
+    g.add((EX.alice, EX.knows, EX.bob))
+    g.add((EX.bob, EX.active, Literal(True)))
+    return g
+
+
+@pytest.fixture
+def scorer(scoring_graph, data_graph):
+    """Provide an incremental scorer tracking alice, bob and a literal."""
+    engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+    scorer = IncrementalScorer(engine, data_graph)
+    for node in (EX.alice, EX.bob, Literal(True)):
+        scorer.score(node)
+    return scorer
+
+
+def expected_widgets(scoring_graph, data_graph, focus_node):
+    """Score a node from scratch."""
+    result = score_widgets(
+        focus_node=focus_node,
+        widget_scoring_graph=scoring_graph,
+        data_graph_shapes_graph=scoring_graph,
+        shapes_graph_shapes_graph=scoring_graph,
+        data_graph=data_graph,
+    )
+    return [ws.widget for ws in result.widget_scores]
+
+
+class TestIncrementalScorer:
+    """Tests for IncrementalScorer."""
+
+    def test_initial_results(self, scorer):
+        """Tracked nodes are scored like score_widgets."""
+        assert [ws.widget for ws in scorer.score(EX.alice).widget_scores] == [
+            EX.PersonEditor,
+            EX.TextEditor,
+        ]
+        assert scorer.score(Literal(True)).default_widget == EX.BooleanEditor
+
+    def test_patch_returns_changed_nodes(self, scorer, scoring_graph, data_graph):
+        """Only nodes whose ranked list changed are reported."""
+        changed = scorer.apply_patch(added=[(EX.bob, RDF.type, EX.Person)])
+
+        assert changed == [(EX.bob, None)]
+        assert [ws.widget for ws in scorer.score(EX.bob).widget_scores] == (
+            expected_widgets(scoring_graph, data_graph, EX.bob)
+        )
+        assert scorer.score(EX.bob).default_widget == EX.PersonEditor
+
+    def test_patch_only_revalidates_intersecting_verdicts(self, scorer):
+        """A patch on ex:name re-runs ex:isNamed but not ex:isPerson."""
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            changed = scorer.apply_patch(added=[(EX.carol, EX.name, Literal("Carol"))])
+
+        # ex:isNamed is re-validated for the three tracked nodes, nothing changes
+        assert changed == []
+        assert spy.call_count == 3
+
+    def test_unrelated_patch_does_no_work(self, scorer):
+        """A patch that no verdict read does not validate anything."""
+        with patch.object(pyshacl, "validate", wraps=pyshacl.validate) as spy:
+            changed = scorer.apply_patch(added=[(EX.carol, EX.age, Literal(30))])
+
+        assert changed == []
+        assert spy.call_count == 0
+
+    def test_existence_changes(self, scorer, scoring_graph, data_graph):
+        """Removing the last triple mentioning a node changes its scores."""
+        changed = scorer.apply_patch(removed=[(EX.bob, EX.active, Literal(True))])
+
+        assert (Literal(True), None) in changed
+        assert [ws.widget for ws in scorer.score(Literal(True)).widget_scores] == (
+            expected_widgets(scoring_graph, data_graph, Literal(True))
+        )
+        assert scorer.score(Literal(True)).default_widget == EX.TextEditor
+
+    def test_patch_modifies_data_graph(self, scorer, data_graph):
+        """Patches are applied to the data graph in place."""
+        scorer.apply_patch(
+            added=[(EX.alice, EX.name, Literal("Alice"))],
+            removed=[(EX.alice, EX.knows, EX.bob)],
+        )
+
+        assert (EX.alice, EX.name, Literal("Alice")) in data_graph
+        assert (EX.alice, EX.knows, EX.bob) not in data_graph
+        assert scorer.score(EX.alice).default_widget == EX.PersonEditor
+        assert EX.NamedEditor in [
+            ws.widget for ws in scorer.score(EX.alice).widget_scores
+        ]
+
+    def test_noop_patch(self, scorer):
+        """Adding present triples or removing absent ones changes nothing."""
+        assert (
+            scorer.apply_patch(
+                added=[(EX.alice, RDF.type, EX.Person)],
+                removed=[(EX.nobody, EX.knows, EX.alice)],
+            )
+            == []
+        )
+
+    def test_forgotten_nodes_are_not_rescored(self, scorer):
+        """Forgotten nodes are no longer tracked."""
+        scorer.forget(EX.bob)
+
+        assert scorer.apply_patch(added=[(EX.bob, RDF.type, EX.Person)]) == []
@@ -0,0 +1,187 @@
+"""Tests for engines compiled from layered widget scoring graphs."""
+
+import pickle
+from unittest.mock import patch
+
+import pytest
+from rdflib import Graph, Literal, Namespace
+
+from shui_widget_scoring import ScoringEngine
+from shui_widget_scoring.exceptions import MalformedScoreError
+from shui_widget_scoring.layers import (
+    LayerCache,
+    compile_layer,
+    compile_layered_engine,
+)
+from shui_widget_scoring.views import union_graphs_of
+
+EX = Namespace("http://example.org/")
+
+BASE_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:isBoolean a sh:NodeShape ; sh:datatype xsd:boolean .
+ex:isNamed a sh:NodeShape ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+
+ex:BooleanScore a shui:Score ; shui:widget ex:BooleanEditor ; shui:score 10 ;
+    shui:dataGraphShape ex:isBoolean .
+ex:NamedScore a shui:Score ; shui:widget ex:NamedResourceEditor ; shui:score 8 ;
+    shui:dataGraphShape ex:isNamed .
+ex:TextScore a shui:Score ; shui:widget ex:TextEditor ; shui:score 1 .
+"""
+
+OVERLAY_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix ex: <http://example.org/> .
+
+ex:isActive a sh:NodeShape ;
+    sh:property [ sh:path ex:active ; sh:minCount 1 ] .
+
+ex:TextScore a shui:Score ; shui:widget ex:TextEditor ; shui:score 20 .
+ex:ActiveScore a shui:Score ; shui:widget ex:ActiveResourceEditor ; shui:score 7 ;
+    shui:dataGraphShape ex:isNamed, ex:isActive .
+"""
+
+
+@pytest.fixture
+def base():
+    """Provide the base widget catalogue layer."""
+    return Graph().parse(data=BASE_TTL, format="turtle")
+
+
+@pytest.fixture
+def overlay():
+    """Provide a customer overlay overriding ex:TextScore."""
+    return Graph().parse(data=OVERLAY_TTL, format="turtle")
+
+
+@pytest.fixture
+def data_graph():
+    """Provide a data graph with a named, active resource."""
+    g = Graph()
+    g.add((EX.alice, EX.name, Literal("Alice")))
+    g.add((EX.alice, EX.active, Literal(True)))
+    return g
+
+
+class TestLayeredEngine:
+    """Tests for compile_layered_engine."""
+
+    def test_matches_merged_graph(self, base, overlay, data_graph, backend):
+        """Layered engines score like the merged graph, overlays replacing base Scores."""
+        engine = compile_layered_engine([base, overlay], backend=backend)
+
+        merged = Graph()
+        for triple in base:
+            merged.add(triple)
+        for triple in overlay:
+            merged.add(triple)
+        merged.remove((EX.TextScore, None, Literal(1)))
+        expected = ScoringEngine(merged, merged, merged, backend=backend)
+
+        for focus_node in (EX.alice, EX.nobody, Literal(True)):
+            assert engine.score(focus_node, data_graph=data_graph) == expected.score(
+                focus_node, data_graph=data_graph
+            )
+        (text,) = [s for s in engine.score_instances if s["uri"] == EX.TextScore]
+        assert text["score"] == 20
+
+    def test_layers_are_not_copied(self, base, overlay):
+        """The engine reads the layer graphs in place."""
+        engine = compile_layered_engine([base, overlay])
+        assert union_graphs_of(engine.widget_scoring_graph) == [base, overlay]
+        assert compile_layered_engine([base]).widget_scoring_graph is base
+
+    def test_cache_reuses_unchanged_layers(self, base, overlay, backend):
+        """Only layers whose content changed are compiled again."""
+        cache = LayerCache()
+        compile_layered_engine([base, overlay], cache=cache, backend=backend)
+        assert cache.info()["misses"] == 2
+
+        other = Graph().parse(data=OVERLAY_TTL.replace("20", "30"), format="turtle")
+        engine = compile_layered_engine([base, other], cache=cache, backend=backend)
+        assert cache.info()["hits"] == 1
+        assert cache.info()["misses"] == 3
+        assert engine.score_instances[0]["score"] == 30
+
+    def test_fingerprints_are_passed_to_cache(self, base, overlay):
+        """Given fingerprints key the cache, so layers are not hashed."""
+        cache = LayerCache()
+        with patch("shui_widget_scoring.layers.graph_fingerprint") as hashed:
+            compile_layered_engine(
+                [base, overlay], cache=cache, fingerprints=["base-v1", "overlay-v1"]
+            )
+            compile_layered_engine(
+                [base, overlay], cache=cache, fingerprints=["base-v1", None]
+            )
+        assert cache.info()["hits"] == 1
+        assert hashed.call_count == 1
+
+        engine = compile_layered_engine(
+            [base, overlay], fingerprints=["base-v1", "overlay-v1"]
+        )
+        assert len(engine.score_instances) == 4
+        with pytest.raises(ValueError):
+            compile_layered_engine([base, overlay], fingerprints=["base-v1"])
+
+    def test_uncached_layers_are_fingerprinted_by_content(self, base):
+        """Layers compiled without a cache are keyed by graph_fingerprint."""
+        with patch(
+            "shui_widget_scoring.layers.graph_fingerprint", return_value="base"
+        ) as hashed:
+            compile_layered_engine([base])
+        hashed.assert_called_once_with(base)
+
+    def test_empty_shapes_graphs_are_used(self, base):
+        """Given shapes graphs are used even when they are empty."""
+        data_shapes, shapes_shapes = Graph(), Graph()
+        engine = compile_layered_engine(
+            [base],
+            data_graph_shapes_graph=data_shapes,
+            shapes_graph_shapes_graph=shapes_shapes,
+        )
+        assert engine.data_graph_shapes_graph is data_shapes
+        assert engine.shapes_graph_shapes_graph is shapes_shapes
+        assert compile_layered_engine([base]).data_graph_shapes_graph is base
+
+    def test_compiled_layers_are_shared(self, base, overlay, data_graph):
+        """A compiled base layer can be combined with different overlays."""
+        base_layer = compile_layer(base)
+        plain = compile_layered_engine([base_layer])
+        layered = compile_layered_engine([base_layer, overlay])
+
+        assert len(plain.score_instances) == 3
+        assert len(layered.score_instances) == 4
+
+    def test_backend_mismatch_raises(self, base):
+        """Compiled layers must have been validated with the engine's backend."""
+        with pytest.raises(ValueError):
+            compile_layered_engine([compile_layer(base, "native")], backend="pyshacl")
+        with pytest.raises(ValueError):
+            compile_layered_engine([])
+
+    def test_malformed_layer_raises(self, base):
+        """Each layer is meta-validated on its own."""
+        broken = Graph().parse(
+            data="@prefix shui: <http://www.w3.org/ns/shacl-ui#> .\n"
+            "@prefix ex: <http://example.org/> .\n"
+            "ex:BrokenScore a shui:Score ; shui:score 1 .",
+            format="turtle",
+        )
+        cache = LayerCache()
+        with pytest.raises(MalformedScoreError):
+            compile_layered_engine([base, broken], cache=cache)
+        assert cache.info()["size"] == 1
+
+    def test_pickles(self, base, overlay, data_graph):
+        """Layered engines pickle like other engines."""
+        engine = compile_layered_engine([base, overlay])
+        restored = pickle.loads(pickle.dumps(engine))
+        assert restored.score(EX.alice, data_graph=data_graph) == engine.score(
+            EX.alice, data_graph=data_graph
+        )
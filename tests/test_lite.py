@@ -0,0 +1,351 @@
+"""Tests for the native evaluator and the pyshacl-free lite backend."""
+
+import pytest
+from rdflib import BNode, Graph, Literal, Namespace, URIRef
+from rdflib.namespace import XSD
+
+from shui_widget_scoring import (
+    MalformedScoreError,
+    ScoringEngine,
+    UnsupportedFeatureError,
+    lite,
+    score_widgets,
+)
+from shui_widget_scoring.lite import (
+    check_lite_compatible,
+    lite_conformance_report,
+    resolve_backend,
+)
+from shui_widget_scoring.native import unsupported_features, validate_node_natively
+from shui_widget_scoring.namespaces import SH
+from shui_widget_scoring.validation import (
+    extract_score_instances,
+    validate_nodes_against_shape,
+)
+
+EX = Namespace("http://example.org/")
+
+SHAPES_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <http://example.org/> .
+
+ex:isString sh:datatype xsd:string .
+ex:isLangString sh:datatype <http://www.w3.org/1999/02/22-rdf-syntax-ns#langString> .
+ex:isDate sh:datatype xsd:date .
+ex:isInteger sh:datatype xsd:integer .
+ex:isAnyLiteral sh:datatype rdfs:Literal .
+ex:isIRI sh:nodeKind sh:IRI .
+ex:isBlankNodeOrLiteral sh:nodeKind sh:BlankNodeOrLiteral .
+ex:isPerson sh:class ex:Person .
+ex:isYesNo sh:in ("yes" "no") .
+ex:isAlice sh:hasValue ex:alice .
+ex:startsWithA sh:pattern "^a" ; sh:flags "i" .
+ex:isShort sh:maxLength 3 .
+ex:isLong sh:minLength 4 .
+ex:isSmall sh:minInclusive 0 ; sh:maxExclusive 10 .
+ex:isRecent sh:minExclusive "2020-01-01"^^xsd:date .
+ex:isEnglish sh:languageIn ("en") .
+ex:isNotString sh:not ex:isString .
+ex:isStringAndShort sh:and (ex:isString ex:isShort) .
+ex:isStringOrDate sh:or (ex:isString ex:isDate) .
+ex:isExactlyOne sh:xone (ex:isString ex:isShort) .
+ex:isNodeShort sh:node ex:isShort .
+ex:isDeactivated sh:datatype xsd:date ; sh:deactivated true .
+
+ex:hasName sh:property [ sh:path ex:name ; sh:minCount 1 ; sh:datatype xsd:string ] .
+ex:hasOneName sh:property [ sh:path ex:name ; sh:maxCount 1 ] .
+ex:hasUniqueLabels sh:property [ sh:path ex:label ; sh:uniqueLang true ] .
+ex:namesEqualLabels sh:property [ sh:path ex:name ; sh:equals ex:label ] .
+ex:namesDisjointFromLabels sh:property [ sh:path ex:name ; sh:disjoint ex:label ] .
+ex:hasPersonFriend sh:property [ sh:path ex:knows ; sh:class ex:Person ; sh:minCount 1 ] .
+ex:isKnown sh:property [ sh:path [ sh:inversePath ex:knows ] ; sh:minCount 1 ] .
+ex:hasFriendName sh:property [ sh:path ( ex:knows ex:name ) ; sh:minCount 1 ] .
+ex:hasNameOrLabel sh:property [
+    sh:path [ sh:alternativePath ( ex:name ex:label ) ] ; sh:minCount 2
+] .
+ex:reachesBob sh:property [ sh:path [ sh:oneOrMorePath ex:knows ] ; sh:hasValue ex:bob ] .
+ex:reachesSelf sh:property [ sh:path [ sh:zeroOrMorePath ex:knows ] ; sh:hasValue ex:alice ] .
+ex:maybeKnowsBob sh:property [ sh:path [ sh:zeroOrOnePath ex:knows ] ; sh:maxCount 1 ] .
+ex:nameProperty sh:path ex:name ; sh:minCount 1 .
+ex:hasNamedFriend sh:property [
+    sh:path ex:knows ;
+    sh:node [ sh:property [ sh:path ex:name ; sh:minCount 1 ] ]
+] .
+"""
+
+DATA_TTL = """
+@prefix ex: <http://example.org/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+
+ex:Employee rdfs:subClassOf ex:Person .
+ex:alice a ex:Employee ;
+    ex:name "Alice" ;
+    ex:label "Alice"@en, "Alicia"@es ;
+    ex:knows ex:bob .
+ex:bob a ex:Person ;
+    ex:name "Bob", "Robert" ;
+    ex:label "Bob"@en, "Bobby"@en ;
+    ex:knows ex:alice .
+ex:carol ex:name "Carol" ;
+    ex:label "Carol" .
+ex:values ex:value
+    "yes", "abc", "Abcdef", "hello"@en, "hello"@en-GB, "bonjour"@fr,
+    5, -1, 12, "2025-01-15"^^xsd:date, "2019-05-01"^^xsd:date,
+    "not a date"^^xsd:date, "1.5"^^xsd:decimal, true, _:b .
+"""
+
+
+@pytest.fixture(scope="module")
+def shapes_graph():
+    """Provide shapes covering the native subset."""
+    g = Graph()
+    g.parse(data=SHAPES_TTL, format="turtle")
+    return g
+
+
+@pytest.fixture(scope="module")
+def data_graph():
+    """Provide a data graph with resources and many kinds of literals."""
+    g = Graph()
+    g.parse(data=DATA_TTL, format="turtle")
+    return g
+
+
+@pytest.fixture
+def scoring_graph():
+    """Provide a scoring graph whose shapes are within the native subset."""
+    g = Graph()
+    g.parse(
+        data="""
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+        @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+        @prefix ex: <http://example.org/> .
+
+        ex:isBoolean sh:datatype xsd:boolean .
+        ex:isYesNo sh:in ("yes" "no") .
+        ex:hasDatatype sh:property [ sh:path sh:datatype ; sh:minCount 1 ] .
+
+        ex:BooleanScore a shui:Score ;
+            shui:widget ex:BooleanSelectEditor ;
+            shui:score 10 ;
+            shui:dataGraphShape ex:isBoolean .
+
+        ex:YesNoScore a shui:Score ;
+            shui:widget ex:BooleanSelectEditor ;
+            shui:score 5 ;
+            shui:dataGraphShape ex:isYesNo .
+
+        ex:DatatypeScore a shui:Score ;
+            shui:widget ex:LiteralEditor ;
+            shui:score 3 ;
+            shui:shapesGraphShape ex:hasDatatype .
+
+        ex:TextScore a shui:Score ;
+            shui:widget ex:TextFieldEditor ;
+            shui:score 1 .
+        """,
+        format="turtle",
+    )
+    return g
+
+
+def focus_nodes(data_graph):
+    """Return every subject and object of the data graph."""
+    return sorted(set(data_graph.subjects()) | set(data_graph.objects()))
+
+
+class TestNativeEvaluator:
+    """The native evaluator agrees with pyshacl on the supported subset."""
+
+    def test_supported_shapes_have_no_unsupported_features(self, shapes_graph):
+        """Every fixture shape is within the native subset."""
+        for shape in set(shapes_graph.subjects()):
+            if isinstance(shape, URIRef):
+                assert unsupported_features(shape, shapes_graph) == set(), shape
+
+    def test_verdicts_match_pyshacl(self, shapes_graph, data_graph):
+        """Each shape gives the same verdict as pyshacl for every node."""
+        shapes = sorted(
+            s for s in set(shapes_graph.subjects()) if isinstance(s, URIRef)
+        )
+        nodes = focus_nodes(data_graph)
+        mismatches = []
+        for shape in shapes:
+            expected = validate_nodes_against_shape(
+                nodes, shape, data_graph, shapes_graph
+            )
+            mismatches.extend(
+                (shape, node)
+                for node in nodes
+                if validate_node_natively(node, shape, data_graph, shapes_graph)
+                != (node in expected)
+            )
+        assert mismatches == []
+
+    def test_unsupported_features_are_reported(self):
+        """SHACL features outside the subset are reported, nested ones included."""
+        g = Graph()
+        g.parse(
+            data="""
+            @prefix sh: <http://www.w3.org/ns/shacl#> .
+            @prefix ex: <http://example.org/> .
+
+            ex:outer sh:or ( ex:inner [ sh:datatype ex:x ] ) ;
+                sh:property [ sh:path [ sh:inversePath ( ex:a ex:b ) ] ] .
+            ex:inner sh:closed true ; sh:ignoredProperties () ;
+                ex:customAnnotation "ignored" .
+            """,
+            format="turtle",
+        )
+        assert unsupported_features(EX.outer, g) == {
+            SH.closed,
+            SH.ignoredProperties,
+            SH.inversePath,
+        }
+
+    def test_incomparable_values_fail_range_checks(self):
+        """Values that cannot be ordered against a range bound fail, not raise."""
+        g = Graph()
+        g.parse(
+            data="""
+            @prefix sh: <http://www.w3.org/ns/shacl#> .
+            @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+            @prefix ex: <http://example.org/> .
+
+            ex:isAfter sh:minInclusive "2020-01-01T00:00:00"^^xsd:dateTime .
+            """,
+            format="turtle",
+        )
+        naive = Literal("2021-01-01T00:00:00", datatype=XSD.dateTime)
+        aware = Literal("2021-01-01T00:00:00Z", datatype=XSD.dateTime)
+        assert validate_node_natively(naive, EX.isAfter, Graph(), g)
+        assert not validate_node_natively(aware, EX.isAfter, Graph(), g)
+
+
+class TestNativeMetaValidation:
+    """Score meta-validation without pyshacl."""
+
+    def test_malformed_scores_are_rejected(
+        self,
+        malformed_scoring_graph_no_widget,
+        malformed_scoring_graph_multiple_widgets,
+        malformed_scoring_graph_no_score,
+        malformed_scoring_graph_invalid_score_type,
+    ):
+        """The native backend rejects the same Score instances as pyshacl."""
+        for graph in (
+            malformed_scoring_graph_no_widget,
+            malformed_scoring_graph_multiple_widgets,
+            malformed_scoring_graph_no_score,
+            malformed_scoring_graph_invalid_score_type,
+        ):
+            with pytest.raises(MalformedScoreError):
+                ScoringEngine(graph, graph, graph, backend="native")
+
+
+class TestNativeBackend:
+    """Tests for scoring with the native backend."""
+
+    def test_results_match_pyshacl_backend(self, scoring_graph, data_graph):
+        """score_widgets gives the same results with either backend."""
+        shapes_graph = Graph()
+        shapes_graph.add((EX.fieldShape, SH.path, EX.value))
+        shapes_graph.add((EX.fieldShape, SH.datatype, XSD.string))
+
+        for node in focus_nodes(data_graph):
+            for constraint_shape in (None, EX.fieldShape):
+                kwargs = dict(
+                    focus_node=node,
+                    widget_scoring_graph=scoring_graph,
+                    data_graph_shapes_graph=scoring_graph,
+                    shapes_graph_shapes_graph=scoring_graph,
+                    data_graph=data_graph,
+                    constraint_shape=constraint_shape,
+                    shapes_graph=shapes_graph,
+                )
+                assert score_widgets(**kwargs, backend="native") == score_widgets(
+                    **kwargs, backend="pyshacl"
+                )
+
+    def test_unsupported_feature_fails_early(self, scoring_graph):
+        """A Score outside the subset raises when the engine is built."""
+        scoring_graph.add((EX.isYesNo, SH.sparql, BNode()))
+        with pytest.raises(UnsupportedFeatureError) as excinfo:
+            ScoringEngine(scoring_graph, scoring_graph, scoring_graph, backend="native")
+        assert excinfo.value.score_uri == str(EX.YesNoScore)
+        assert excinfo.value.features == ["sh:sparql"]
+
+    def test_declared_targets_are_unsupported(self, scoring_graph):
+        """Shapes graphs that declare targets need the pyshacl backend."""
+        scoring_graph.add((EX.isYesNo, SH.targetNode, Literal("yes")))
+        with pytest.raises(UnsupportedFeatureError):
+            check_lite_compatible(
+                extract_score_instances(scoring_graph), scoring_graph, scoring_graph
+            )
+
+    def test_added_score_is_checked(self, scoring_graph):
+        """Scores added to a native engine are checked for the subset too."""
+        engine = ScoringEngine(
+            scoring_graph, scoring_graph, scoring_graph, backend="native"
+        )
+        scoring_graph.add((EX.isClosed, SH.closed, Literal(True)))
+        new = Graph()
+        new.parse(
+            data="""
+            @prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+            @prefix ex: <http://example.org/> .
+            ex:ClosedScore a shui:Score ;
+                shui:widget ex:ClosedEditor ;
+                shui:score 1 ;
+                shui:dataGraphShape ex:isClosed .
+            """,
+            format="turtle",
+        )
+        with pytest.raises(UnsupportedFeatureError):
+            engine.add_score(EX.ClosedScore, new)
+
+    def test_unknown_backend(self):
+        """Unknown backend names raise ValueError."""
+        with pytest.raises(ValueError):
+            resolve_backend("jena")
+
+    def test_default_backend_is_pyshacl_when_installed(self, monkeypatch):
+        """Without an explicit backend, pyshacl is used when it is importable."""
+        monkeypatch.setattr(lite, "pyshacl_available", lambda: True)
+        assert resolve_backend() == "pyshacl"
+
+    def test_default_backend_is_native_without_pyshacl(self, monkeypatch):
+        """Without an explicit backend or pyshacl, the native backend is used."""
+        monkeypatch.setattr(lite, "pyshacl_available", lambda: False)
+        assert resolve_backend() == "native"
+        with pytest.raises(ImportError):
+            resolve_backend("pyshacl")
+
+
+class TestLiteConformanceReport:
+    """Tests for lite_conformance_report."""
+
+    def test_report_lists_compatible_scores(self, scoring_graph):
+        """Compatible and incompatible Score instances are listed separately."""
+        scoring_graph.add((EX.isYesNo, SH.sparql, BNode()))
+        report = lite_conformance_report(scoring_graph)
+
+        assert not report.conforms
+        assert report.incompatible_scores == [EX.YesNoScore]
+        assert report.compatible_scores == [
+            EX.BooleanScore,
+            EX.DatatypeScore,
+            EX.TextScore,
+        ]
+        assert report.unsupported[EX.YesNoScore] == frozenset({SH.sparql})
+        assert "sh:sparql" in str(report)
+
+    def test_fully_compatible_graph(self, scoring_graph):
+        """A graph within the subset conforms."""
+        report = lite_conformance_report(scoring_graph)
+        assert report.conforms
+        assert report.incompatible_scores == []
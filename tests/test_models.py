@@ -5,7 +5,12 @@ from decimal import Decimal
 import pytest
 from rdflib import URIRef
 
-from shui_widget_scoring.models import WidgetScore, ScoringResult
+from shui_widget_scoring.models import (
+    ScoreSource,
+    WidgetScore,
+    ScoringResult,
+    score_to_json,
+)
 
 
 class TestWidgetScore:
@@ -65,6 +70,34 @@ class TestWidgetScore:
 
         assert ws2 < ws1  # ws2 has higher score
 
+    def test_widget_score_is_slotted(self):
+        """Test that WidgetScore has no per-instance dict."""
+        ws = WidgetScore(widget=URIRef("http://example.org/A"), score=Decimal("1"))
+
+        assert not hasattr(ws, "__dict__")
+
+    def test_widget_score_equality_ignores_sort_key(self):
+        """Test that equality, hashing and repr only use widget and score."""
+        ws1 = WidgetScore(widget=URIRef("http://example.org/A"), score=Decimal("1"))
+        ws2 = WidgetScore(URIRef("http://example.org/A"), Decimal("1"))
+
+        assert ws1 == ws2
+        assert hash(ws1) == hash(ws2)
+        assert repr(ws1) == (
+            "WidgetScore(widget=rdflib.term.URIRef('http://example.org/A'), "
+            "score=Decimal('1'))"
+        )
+
+    def test_widget_score_source_is_not_compared(self):
+        """Test that WidgetScores from different Score instances compare equal."""
+        widget = URIRef("http://example.org/A")
+        ws1 = WidgetScore(widget, Decimal("1"), ScoreSource(URIRef("urn:score:1")))
+        ws2 = WidgetScore(widget, Decimal("1"), ScoreSource(URIRef("urn:score:2")))
+
+        assert ws1 == ws2
+        assert ws1.source.uri != ws2.source.uri
+        assert WidgetScore(widget, Decimal("1")).source is None
+
 
 class TestScoringResult:
     """Tests for ScoringResult dataclass."""
@@ -154,3 +187,22 @@ class TestScoringResult:
 
         assert len(filtered) == 1
         assert ws1 in filtered
+
+
+class TestScoreToJson:
+    """Tests for score_to_json."""
+
+    @pytest.mark.parametrize(
+        "score, expected",
+        [
+            (Decimal("10"), 10),
+            (Decimal("10.0"), 10),
+            (Decimal("-3"), -3),
+            (Decimal("1.5"), 1.5),
+        ],
+    )
+    def test_score_to_json(self, score, expected):
+        """Integral scores become ints and other scores floats."""
+        value = score_to_json(score)
+        assert value == expected
+        assert type(value) is type(expected)
@@ -0,0 +1,187 @@
+"""Tests for batch scoring on thread, process and interpreter pools."""
+
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from rdflib import Graph, Literal, Namespace
+
+from shui_widget_scoring.artifact import save_engine
+from shui_widget_scoring.parallel import (
+    InterpreterPoolScorer,
+    PoolScorer,
+    ProcessPoolScorer,
+    ThreadPoolScorer,
+    chunked,
+    interpreters_available,
+)
+
+EX = Namespace("http://example.org/")
+
+
+@pytest.fixture
+def data_graph():
+    """Provide a data graph where every third item is named."""
+    g = Graph()
+    for i in range(30):
+        if i % 3 == 0:
+            g.add((EX[f"item{i}"], EX.name, Literal(f"Item {i}")))
+        g.add((EX[f"item{i}"], EX.active, Literal(i % 2 == 0)))
+    return g
+
+
+@pytest.fixture
+def focus_nodes():
+    """Provide resource and literal focus nodes, with repeats."""
+    return [EX[f"item{i}"] for i in range(30)] + [
+        Literal(True),
+        Literal("text"),
+        EX.item0,
+    ]
+
+
+class TestProcessPoolScorer:
+    """Tests for ProcessPoolScorer."""
+
+    def test_ordered_results_match_score_batch(self, engine, data_graph, focus_nodes):
+        """Results come back in input order and match in-process batch scoring."""
+        expected = engine.score_batch(focus_nodes, data_graph=data_graph)
+        with ProcessPoolScorer(
+            engine, data_graph, max_workers=2, chunk_size=4
+        ) as scorer:
+            pairs = list(scorer.score_iter(focus_nodes))
+
+        assert [node for node, _ in pairs] == focus_nodes
+        assert [result for _, result in pairs] == expected
+
+    def test_results_keep_score_sources(self, engine, data_graph, focus_nodes):
+        """Results from worker processes record their Score instances."""
+        expected = engine.score_batch(focus_nodes, data_graph=data_graph)
+        with ProcessPoolScorer(engine, data_graph, max_workers=1) as scorer:
+            results = scorer.score(focus_nodes)
+
+        for result, local in zip(results, expected):
+            assert [ws.source for ws in result.widget_scores] == [
+                ws.source for ws in local.widget_scores
+            ]
+
+    def test_unordered_results_cover_every_node(self, engine, data_graph, focus_nodes):
+        """Completion-order results pair each focus node with its own result."""
+        expected = engine.score_batch(focus_nodes, data_graph=data_graph)
+        with ProcessPoolScorer(
+            engine, data_graph, max_workers=2, chunk_size=4
+        ) as scorer:
+            pairs = list(scorer.score_iter(iter(focus_nodes), ordered=False))
+
+        assert sorted(pairs, key=lambda p: str(p)) == sorted(
+            zip(focus_nodes, expected), key=lambda p: str(p)
+        )
+
+    def test_workers_load_engine_from_artefact(
+        self, tmp_path, engine, data_graph, focus_nodes
+    ):
+        """Workers can load the compiled engine from an artefact path."""
+        path = tmp_path / "engine.bin"
+        save_engine(engine, path)
+        with ProcessPoolScorer(path, data_graph, max_workers=2) as scorer:
+            results = scorer.score(focus_nodes)
+
+        assert results == engine.score_batch(focus_nodes, data_graph=data_graph)
+
+    def test_constraint_shape(self, engine, data_graph, shapes_graph):
+        """Shapes graph Scores apply when a constraint shape is given."""
+        with ProcessPoolScorer(
+            engine, data_graph, shapes_graph=shapes_graph, max_workers=1
+        ) as scorer:
+            (result,) = scorer.score([EX.item0], constraint_shape=EX.activeShape)
+
+        assert result == engine.score(
+            EX.item0,
+            data_graph=data_graph,
+            constraint_shape=EX.activeShape,
+            shapes_graph=shapes_graph,
+        )
+        assert result.widget_scores[0].widget == EX.NamedResourceEditor
+
+    def test_tasks_carry_no_graphs(self, engine, data_graph, focus_nodes):
+        """Graphs go to the workers once; tasks only carry focus nodes."""
+        submitted = []
+        submit = ProcessPoolExecutor.submit
+
+        def spy(executor, fn, *args, **kwargs):
+            submitted.append(args)
+            return submit(executor, fn, *args, **kwargs)
+
+        with patch.object(ProcessPoolExecutor, "submit", spy):
+            with ProcessPoolScorer(
+                engine, data_graph, max_workers=2, chunk_size=10
+            ) as scorer:
+                scorer.score(focus_nodes)
+
+        assert len(submitted) == 4
+        for chunk, constraint_shape in submitted:
+            assert len(chunk) <= 10
+            assert constraint_shape is None
+
+    def test_invalid_chunk_size(self, engine, data_graph):
+        """A chunk size below one is rejected."""
+        with pytest.raises(ValueError):
+            ProcessPoolScorer(engine, data_graph, chunk_size=0)
+
+    def test_chunked(self):
+        """Chunks cover the input in order and respect the chunk size."""
+        assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+        assert list(chunked([], 3)) == []
+
+    def test_pool_scorer_is_abstract(self):
+        """PoolScorer cannot be used without a _submit implementation."""
+        with pytest.raises(TypeError):
+            PoolScorer()
+
+
+class TestThreadPoolScorer:
+    """Tests for ThreadPoolScorer."""
+
+    def test_results_match_score_batch(self, engine, data_graph, focus_nodes):
+        """Threads sharing one engine give the in-process batch results."""
+        with ThreadPoolScorer(
+            engine, data_graph, max_workers=3, chunk_size=4
+        ) as scorer:
+            assert scorer.score(focus_nodes) == engine.score_batch(
+                focus_nodes, data_graph=data_graph
+            )
+
+    def test_graphs_are_not_copied(self, engine, data_graph):
+        """Thread workers use the caller's engine and data graph."""
+        with ThreadPoolScorer(engine, data_graph, max_workers=1) as scorer:
+            assert scorer.engine is engine
+            assert scorer.data_graph is data_graph
+
+
+class TestInterpreterPoolScorer:
+    """Tests for InterpreterPoolScorer."""
+
+    @pytest.mark.skipif(
+        not interpreters_available(), reason="requires InterpreterPoolExecutor"
+    )
+    def test_results_match_score_batch(self, tmp_path, engine, data_graph, focus_nodes):
+        """Interpreters loading the artefact give the in-process batch results."""
+        path = tmp_path / "engine.bin"
+        save_engine(engine, path)
+        with InterpreterPoolScorer(
+            path, data_graph, max_workers=2, chunk_size=4
+        ) as scorer:
+            pairs = list(scorer.score_iter(focus_nodes))
+
+        assert [node for node, _ in pairs] == focus_nodes
+        assert [result for _, result in pairs] == engine.score_batch(
+            focus_nodes, data_graph=data_graph
+        )
+
+    @pytest.mark.skipif(
+        interpreters_available(), reason="InterpreterPoolExecutor is available"
+    )
+    def test_unavailable_raises_import_error(self, engine, data_graph):
+        """Without InterpreterPoolExecutor the scorer raises ImportError."""
+        with pytest.raises(ImportError):
+            InterpreterPoolScorer(engine, data_graph)
@@ -0,0 +1,191 @@
+"""Tests for the multi-tenant engine registry."""
+
+import threading
+import time
+
+import pytest
+from rdflib import Graph, Literal, Namespace
+
+from shui_widget_scoring import ScoringEngine
+from shui_widget_scoring import registry as registry_module
+from shui_widget_scoring.registry import (
+    CACHE_ENTRY_SIZE,
+    EngineRegistry,
+    estimate_engine_size,
+)
+
+EX = Namespace("http://example.org/")
+
+
+def compile_engine(graph, **kwargs):
+    """Compile an engine using one graph for all three scoring graphs."""
+    return ScoringEngine(graph, graph, graph, **kwargs)
+
+
+class TestEngineRegistry:
+    """Tests for EngineRegistry."""
+
+    def test_builds_once_per_key(self, scoring_graph):
+        """A registered engine is returned without rebuilding."""
+        registry = EngineRegistry()
+        builds = []
+
+        def build():
+            builds.append(1)
+            return compile_engine(scoring_graph)
+
+        first = registry.get("a", build, tenant="t1")
+        assert registry.get("a", build, tenant="t2") is first
+        assert len(builds) == 1
+        assert "a" in registry and len(registry) == 1
+
+        t1, t2 = registry.tenant_stats("t1"), registry.tenant_stats("t2")
+        assert (t1.hits, t1.misses, t1.builds) == (0, 1, 1)
+        assert t1.build_seconds > 0
+        assert (t2.hits, t2.misses, t2.builds) == (1, 0, 0)
+
+    def test_equal_graphs_share_an_engine(self, scoring_graph):
+        """Graphs with the same content map to the same engine."""
+        registry = EngineRegistry()
+        copy = Graph()
+        for triple in scoring_graph:
+            copy.add(triple)
+
+        engine = registry.get_for_graphs(
+            scoring_graph, scoring_graph, scoring_graph, tenant="t1"
+        )
+        assert registry.get_for_graphs(copy, copy, copy, tenant="t2") is engine
+        data_graph = Graph()
+        data_graph.add((EX.alice, EX.active, Literal(True)))
+        result = engine.score(Literal(True), data_graph=data_graph)
+        assert result.widget_scores[0].widget == EX.BooleanEditor
+
+        other = registry.get_for_graphs(copy, copy, copy, backend="native")
+        assert other is not engine
+        assert other.backend == "native"
+
+    def test_fingerprints_are_reused_per_graph(self, scoring_graph, monkeypatch):
+        """A graph object is fingerprinted again only when its triple count changes."""
+        fingerprinted = []
+
+        def fingerprint(graph):
+            fingerprinted.append(graph)
+            return graph_fingerprint(graph)
+
+        graph_fingerprint = registry_module.graph_fingerprint
+        monkeypatch.setattr(registry_module, "graph_fingerprint", fingerprint)
+        registry = EngineRegistry()
+        copy = Graph()
+        for triple in scoring_graph:
+            copy.add(triple)
+
+        engine = registry.get_for_graphs(copy, copy, copy)
+        assert registry.get_for_graphs(copy, copy, copy) is engine
+        assert len(fingerprinted) == 1
+
+        copy.add((EX.extra, EX.label, Literal("extra")))
+        assert registry.get_for_graphs(copy, copy, copy) is not engine
+        assert len(fingerprinted) == 2
+
+        fingerprinted.clear()
+        other = Graph()
+        for triple in scoring_graph:
+            other.add(triple)
+        assert registry.get_for_graphs(other, other, other) is engine
+        assert len(fingerprinted) == 1
+
+    def test_concurrent_builds_are_single_flight(self, scoring_graph):
+        """Threads asking for the same key at once share one build."""
+        registry = EngineRegistry()
+        builds = []
+
+        def build():
+            builds.append(1)
+            time.sleep(0.05)
+            return compile_engine(scoring_graph)
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(registry.get("a", build)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(builds) == 1
+        assert len(results) == 4 and all(r is results[0] for r in results)
+        assert registry.tenant_stats(None).misses == 4
+
+    def test_failed_build_is_not_cached(self, scoring_graph):
+        """A failing build raises and the next lookup builds again."""
+        registry = EngineRegistry()
+
+        def fail():
+            raise ValueError("broken scoring graph")
+
+        with pytest.raises(ValueError):
+            registry.get("a", fail, tenant="t")
+        assert "a" not in registry
+        assert registry.tenant_stats("t").errors == 1
+
+        engine = registry.get("a", lambda: compile_engine(scoring_graph), tenant="t")
+        assert registry.get("a", fail) is engine
+
+    def test_evicts_least_recently_used(self, scoring_graph):
+        """Engines are evicted in LRU order once the budget is exceeded."""
+        size = estimate_engine_size(compile_engine(scoring_graph))
+        registry = EngineRegistry(memory_budget=2 * size)
+
+        def build():
+            return compile_engine(scoring_graph)
+
+        registry.get("a", build)
+        registry.get("b", build)
+        registry.get("a", build)  # "b" is now least recently used
+        registry.get("c", build)
+
+        assert "a" in registry and "c" in registry and "b" not in registry
+        assert registry.evictions == 1
+        assert registry.memory_used <= 2 * size
+
+    def test_newest_engine_is_kept_over_budget(self, scoring_graph):
+        """An engine larger than the budget is still registered on its own."""
+        registry = EngineRegistry(memory_budget=1)
+        registry.get("a", lambda: compile_engine(scoring_graph))
+        registry.get("b", lambda: compile_engine(scoring_graph))
+        assert "b" in registry and len(registry) == 1
+
+    def test_invalidate(self, scoring_graph):
+        """Invalidated keys are rebuilt on the next lookup."""
+        registry = EngineRegistry()
+        engine = registry.get("a", lambda: compile_engine(scoring_graph))
+        assert registry.invalidate("a")
+        assert not registry.invalidate("a")
+        rebuilt = registry.get("a", lambda: compile_engine(scoring_graph))
+        assert rebuilt is not engine
+
+    def test_sizes_are_estimated_once_per_build(self, scoring_graph):
+        """Registered engines are not re-estimated when others are built."""
+        estimated = []
+
+        def estimate(engine):
+            estimated.append(engine)
+            return 1
+
+        registry = EngineRegistry(memory_budget=10, estimate=estimate)
+        for key in "abc":
+            registry.get(key, lambda: compile_engine(scoring_graph))
+        assert len(estimated) == 3
+        assert registry.memory_used == 3
+
+    def test_literal_cache_growth_counts_towards_the_budget(self, scoring_graph):
+        """Literal cache entries added after the build count towards memory use."""
+        registry = EngineRegistry(estimate=lambda engine: 0)
+        engine = registry.get("a", lambda: compile_engine(scoring_graph))
+        data_graph = Graph()
+        data_graph.add((EX.alice, EX.active, Literal(True)))
+        engine.score(Literal(True), data_graph=data_graph)
+        assert len(engine.literal_verdicts) > 0
+        assert registry.memory_used == len(engine.literal_verdicts) * CACHE_ENTRY_SIZE
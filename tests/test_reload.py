@@ -0,0 +1,152 @@
+"""Tests for hot reload of scoring engines from files."""
+
+import logging
+import os
+
+import pytest
+from rdflib import Graph, Literal, Namespace
+
+from shui_widget_scoring.exceptions import MalformedScoreError
+from shui_widget_scoring.reload import FileEngineSource
+
+EX = Namespace("http://example.org/")
+
+SCORING_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix ex: <http://example.org/> .
+
+ex:isNamed a sh:NodeShape ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+
+ex:NamedScore a shui:Score ; shui:widget ex:NamedResourceEditor ; shui:score {score} ;
+    shui:dataGraphShape ex:isNamed .
+"""
+
+MALFORMED_TTL = """
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix ex: <http://example.org/> .
+
+ex:BrokenScore a shui:Score ; shui:score 1 .
+"""
+
+
+def write(path, text):
+    """Write a source file and move its modification time forward."""
+    path.write_text(text)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def source_path(tmp_path):
+    """Provide a widget scoring file scoring named resources 8."""
+    path = tmp_path / "scores.ttl"
+    write(path, SCORING_TTL.replace("{score}", "8"))
+    return path
+
+
+@pytest.fixture
+def data_graph():
+    """Provide a data graph with a named resource."""
+    g = Graph()
+    g.add((EX.alice, EX.name, Literal("Alice")))
+    return g
+
+
+def named_score(engine, data_graph):
+    """Return the score of the named resource editor for ex:alice."""
+    (widget_score,) = engine.score(EX.alice, data_graph=data_graph).widget_scores
+    return widget_score.score
+
+
+class TestFileEngineSource:
+    """Tests for FileEngineSource."""
+
+    def test_unchanged_files_are_not_reloaded(self, source_path):
+        """check() keeps the engine when the files did not change."""
+        source = FileEngineSource(source_path)
+        engine = source.engine
+        assert not source.check()
+
+        # Touching the file without changing its content does not recompile
+        write(source_path, source_path.read_text())
+        assert not source.check()
+        assert source.engine is engine
+        assert source.generation == 0
+
+    def test_changed_file_swaps_engine(self, source_path, data_graph):
+        """A changed file is recompiled and swapped in."""
+        source = FileEngineSource(source_path)
+        old = source.engine
+
+        write(source_path, SCORING_TTL.replace("{score}", "9"))
+        assert source.check()
+        assert source.generation == 1
+        assert named_score(source.engine, data_graph) == 9
+        # Callers still holding the old engine keep scoring with it
+        assert named_score(old, data_graph) == 8
+
+    def test_parse_error_keeps_previous_engine(self, source_path, caplog):
+        """A file that fails to parse is reported and not swapped in."""
+        source = FileEngineSource(source_path, logger=logging.getLogger("reload"))
+        engine = source.engine
+
+        write(source_path, "this is not turtle")
+        with caplog.at_level(logging.ERROR):
+            assert not source.check()
+        assert source.engine is engine
+        assert source.last_error is not None
+        assert "Keeping the previous scoring engine" in caplog.text
+
+        # The broken content is not recompiled on every check
+        write(source_path, "this is not turtle")
+        assert not source.check()
+
+        write(source_path, SCORING_TTL.replace("{score}", "9"))
+        assert source.check()
+        assert source.last_error is None
+
+    def test_malformed_score_keeps_previous_engine(self, source_path):
+        """Meta-validation failures keep the previous engine."""
+        source = FileEngineSource(source_path)
+        engine = source.engine
+
+        write(source_path, MALFORMED_TTL)
+        assert not source.check()
+        assert source.engine is engine
+        assert isinstance(source.last_error, MalformedScoreError)
+
+    def test_initial_errors_raise(self, tmp_path):
+        """Errors in the initial sources are raised by the constructor."""
+        path = tmp_path / "scores.ttl"
+        write(path, MALFORMED_TTL)
+        with pytest.raises(MalformedScoreError):
+            FileEngineSource(path)
+
+    def test_separate_shapes_files(self, tmp_path, source_path, data_graph):
+        """Changes to a separate shapes file trigger a reload."""
+        shapes_path = tmp_path / "shapes.ttl"
+        write(shapes_path, SCORING_TTL.replace("{score}", "8"))
+        source = FileEngineSource(source_path, data_graph_shapes_path=shapes_path)
+        assert named_score(source.engine, data_graph) == 8
+
+        # Without the ex:isNamed definition, the Score no longer applies
+        write(shapes_path, "@prefix ex: <http://example.org/> .\n")
+        assert source.check()
+        assert not source.engine.score(EX.alice, data_graph=data_graph).widget_scores
+
+    def test_background_check(self, source_path, data_graph):
+        """check_in_background() compiles off the calling thread."""
+        source = FileEngineSource(source_path)
+        write(source_path, SCORING_TTL.replace("{score}", "9"))
+        assert source.check_in_background().result(timeout=10)
+        assert named_score(source.engine, data_graph) == 9
+
+    def test_start_and_close(self, source_path):
+        """The watcher thread can be started once and stopped."""
+        with FileEngineSource(source_path) as source:
+            source.start(interval=0.01)
+            with pytest.raises(RuntimeError):
+                source.start()
+        assert source._thread is None
@@ -0,0 +1,203 @@
+"""Tests for the scoring HTTP server."""
+
+import http.client
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from rdflib import Graph, Literal, Namespace
+
+from shui_widget_scoring.server import MAX_BODY_SIZE, make_server
+
+EX = Namespace("http://example.org/")
+
+DATA_TTL = """
+@prefix ex: <http://example.org/> .
+ex:alice ex:name "Alice" ; ex:active true .
+"""
+
+
+@pytest.fixture
+def server(engine):
+    """Serve the engine on a free local port for the duration of a test."""
+    server = make_server(engine, port=0)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, path, body=None):
+    """Send a request and return the status and decoded JSON response."""
+    url = f"http://127.0.0.1:{server.server_port}{path}"
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(
+        url, data=data, headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestScoringServer:
+    """Tests for the HTTP endpoints."""
+
+    def test_score(self, server):
+        """POST /score returns the widgets in result order."""
+        status, body = request(
+            server,
+            "/score",
+            {"focus_node": "<http://example.org/alice>", "data": DATA_TTL},
+        )
+        assert status == 200
+        assert body == {
+            "widgets": [
+                {"widget": "<http://example.org/NamedResourceEditor>", "score": 8},
+                {"widget": "<http://example.org/TextEditor>", "score": 1},
+            ]
+        }
+
+    def test_score_with_constraint_shape(self, server, shapes_graph):
+        """Constraint shapes and shapes graph fragments are supported."""
+        status, body = request(
+            server,
+            "/score",
+            {
+                "focus_node": "<http://example.org/alice>",
+                "data": DATA_TTL,
+                "constraint_shape": "<http://example.org/activeShape>",
+                "shapes": shapes_graph.serialize(format="turtle"),
+            },
+        )
+        assert status == 200
+        assert {"widget": "<http://example.org/LiteralEditor>", "score": 5} in body[
+            "widgets"
+        ]
+
+    def test_batch(self, server, engine):
+        """POST /score/batch returns one result per focus node, in order."""
+        focus_nodes = [
+            "<http://example.org/alice>",
+            '"true"^^<http://www.w3.org/2001/XMLSchema#boolean>',
+            "<http://example.org/nobody>",
+        ]
+        data = DATA_TTL + "ex:alice ex:flag true ."
+        status, body = request(
+            server, "/score/batch", {"focus_nodes": focus_nodes, "data": data}
+        )
+        assert status == 200
+        data_graph = Graph().parse(data=data, format="turtle")
+        expected = engine.score_batch(
+            [EX.alice, Literal(True), EX.nobody], data_graph=data_graph
+        )
+        assert [
+            [w["widget"] for w in result["widgets"]] for result in body["results"]
+        ] == [[ws.widget.n3() for ws in result.widget_scores] for result in expected]
+
+    def test_ntriples_format(self, server):
+        """Fragments can be sent as N-Triples."""
+        status, body = request(
+            server,
+            "/score",
+            {
+                "focus_node": "<http://example.org/alice>",
+                "data": '<http://example.org/alice> <http://example.org/name> "Alice" .',
+                "format": "nt",
+            },
+        )
+        assert status == 200
+        assert (
+            body["widgets"][0]["widget"] == "<http://example.org/NamedResourceEditor>"
+        )
+
+    @pytest.mark.parametrize(
+        "body, status",
+        [
+            ({"data": DATA_TTL}, 400),
+            ({"focus_node": "<http://example.org/alice>"}, 400),
+            ({"focus_node": "not a term <", "data": DATA_TTL}, 400),
+            ({"focus_node": "<http://example.org/alice>", "data": "ex:a ex:b"}, 400),
+            (
+                {
+                    "focus_node": "<http://example.org/alice>",
+                    "data": DATA_TTL,
+                    "constraint_shape": "<http://example.org/activeShape>",
+                },
+                400,
+            ),
+            (
+                {"focus_node": "<http://example.org/a>", "data": "", "engine": "x"},
+                404,
+            ),
+        ],
+    )
+    def test_client_errors(self, server, body, status):
+        """Malformed requests are rejected with a JSON error."""
+        code, response = request(server, "/score", body)
+        assert code == status
+        assert "error" in response
+
+    @pytest.mark.parametrize("format", ["json-ld", "xml", "trix", "n3"])
+    def test_unsupported_formats_are_rejected(self, server, format):
+        """Only Turtle and N-Triples fragments are parsed."""
+        code, response = request(
+            server,
+            "/score",
+            {
+                "focus_node": "<http://example.org/alice>",
+                "data": '{"@context": "http://example.org/context.jsonld"}',
+                "format": format,
+            },
+        )
+        assert code == 400
+        assert "Unsupported format" in response["error"]
+
+    @pytest.mark.parametrize(
+        "length, status",
+        [("abc", 400), ("-1", 400), (str(MAX_BODY_SIZE + 1), 413)],
+    )
+    def test_invalid_content_length(self, server, length, status):
+        """Invalid or oversized Content-Length headers get an error response."""
+        connection = http.client.HTTPConnection(
+            "127.0.0.1", server.server_port, timeout=10
+        )
+        try:
+            connection.putrequest("POST", "/score")
+            connection.putheader("Content-Length", length)
+            connection.endheaders()
+            response = connection.getresponse()
+            assert response.status == status
+            assert "error" in json.loads(response.read())
+        finally:
+            connection.close()
+
+    def test_unknown_route(self, server):
+        """Unknown paths return 404."""
+        assert request(server, "/nope")[0] == 404
+
+    def test_metrics_and_health(self, server):
+        """Metrics report request counts, latencies and cache statistics."""
+        literal = '"true"^^<http://www.w3.org/2001/XMLSchema#boolean>'
+        request(server, "/score", {"focus_node": literal, "data": ""})
+        request(server, "/score", {"data": DATA_TTL})
+
+        status, metrics = request(server, "/metrics")
+        assert status == 200
+        score = metrics["endpoints"]["/score"]
+        assert score["requests"] == 2
+        assert score["errors"] == 1
+        assert score["latency_ms"]["max"] >= score["latency_ms"]["p50"] >= 0
+        assert metrics["engines"]["default"]["scores"] == 4
+        assert set(metrics["engines"]["default"]["literal_cache"]) >= {"hits", "misses"}
+
+        assert request(server, "/health") == (
+            200,
+            {"status": "ok", "engines": ["default"]},
+        )
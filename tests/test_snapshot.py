@@ -0,0 +1,182 @@
+"""Tests for shared-memory graph snapshots."""
+
+import itertools
+import pickle
+
+import pytest
+from rdflib import BNode, Graph, Literal, Namespace
+from rdflib.graph import ModificationException
+from rdflib.namespace import RDF, XSD
+
+from shui_widget_scoring import ScoringEngine
+from shui_widget_scoring.parallel import ProcessPoolScorer, graph_payload
+from shui_widget_scoring.snapshot import (
+    GraphSnapshot,
+    decode_term,
+    encode_term,
+    snapshot_of,
+)
+
+EX = Namespace("http://example.org/")
+
+SCORING_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:isBoolean a sh:NodeShape ; sh:datatype xsd:boolean .
+ex:isNamed a sh:NodeShape ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ] .
+ex:knowsNamed a sh:NodeShape ;
+    sh:property [ sh:path ex:knows ; sh:node ex:isNamed ; sh:minCount 1 ] .
+
+ex:BooleanScore a shui:Score ; shui:widget ex:BooleanEditor ; shui:score 10 ;
+    shui:dataGraphShape ex:isBoolean .
+ex:NamedScore a shui:Score ; shui:widget ex:NamedResourceEditor ; shui:score 8 ;
+    shui:dataGraphShape ex:isNamed .
+ex:KnowsScore a shui:Score ; shui:widget ex:SocialEditor ; shui:score 9 ;
+    shui:dataGraphShape ex:knowsNamed .
+ex:TextScore a shui:Score ; shui:widget ex:TextEditor ; shui:score 1 .
+"""
+
+FOCUS_NODES = [EX.alice, EX.bob, EX.carol, Literal(True), Literal("text")]
+
+
+@pytest.fixture
+def data_graph():
+    """Provide a data graph with IRIs, blank nodes and varied literals."""
+    g = Graph()
+    address = BNode()
+    g.add((EX.alice, RDF.type, EX.Person))
+    g.add((EX.alice, EX.name, Literal("Alice")))
+    g.add((EX.alice, EX.name, Literal("Alicia", lang="es")))
+    g.add((EX.alice, EX.knows, EX.bob))
+    g.add((EX.alice, EX.address, address))
+    g.add((address, EX.city, Literal("Brisbane")))
+    g.add((EX.bob, RDF.type, EX.Person))
+    g.add((EX.bob, EX.name, Literal("Bob")))
+    g.add((EX.bob, EX.age, Literal(42)))
+    g.add((EX.bob, EX.born, Literal("1980-01-01", datatype=XSD.date)))
+    g.add((EX.carol, EX.knows, EX.dave))
+    g.add((EX.carol, EX.note, Literal("a\x00b")))
+    return g
+
+
+@pytest.fixture
+def snapshot(data_graph):
+    """Provide a snapshot of the data graph, unlinked after the test."""
+    with GraphSnapshot.create(data_graph) as snapshot:
+        yield snapshot
+
+
+@pytest.fixture
+def scoring_graph():
+    """Provide a widget scoring graph."""
+    return Graph().parse(data=SCORING_TTL, format="turtle")
+
+
+class TestGraphSnapshot:
+    """Tests for GraphSnapshot and its Graph view."""
+
+    def test_every_triple_pattern_matches(self, data_graph, snapshot):
+        """Each triple pattern returns exactly the original graph's triples."""
+        graph = snapshot.graph()
+        terms = {term for triple in data_graph for term in triple} | {EX.absent}
+        positions = [None] + sorted(terms, key=str)
+        for pattern in itertools.product(positions, repeat=3):
+            assert set(graph.triples(pattern)) == set(data_graph.triples(pattern))
+
+    def test_graph_view(self, data_graph, snapshot):
+        """The Graph view supports length, membership and neighbourhood lookups."""
+        graph = snapshot.graph()
+        assert len(graph) == len(data_graph)
+        assert (EX.bob, EX.age, Literal(42)) in graph
+        assert (EX.bob, EX.age, Literal(43)) not in graph
+        assert set(graph.objects(EX.alice, EX.name)) == {
+            Literal("Alice"),
+            Literal("Alicia", lang="es"),
+        }
+        assert set(graph.subjects(RDF.type, EX.Person)) == {EX.alice, EX.bob}
+        assert graph.value(graph.value(EX.alice, EX.address), EX.city) == Literal(
+            "Brisbane"
+        )
+
+    def test_graph_view_is_read_only(self, snapshot):
+        """Adding or removing triples raises ModificationException."""
+        graph = snapshot.graph()
+        with pytest.raises(ModificationException):
+            graph.add((EX.alice, EX.name, Literal("Al")))
+        with pytest.raises(ModificationException):
+            graph.remove((EX.alice, None, None))
+
+    def test_term_encoding_round_trips(self, data_graph):
+        """Every term decodes to an equal term."""
+        for triple in data_graph:
+            for term in triple:
+                decoded = decode_term(encode_term(term))
+                assert decoded == term
+                assert type(decoded) is type(term)
+
+    def test_pickle_attaches_by_name(self, data_graph, snapshot):
+        """Pickling a snapshot only carries its name; unpickling attaches."""
+        data = pickle.dumps(snapshot)
+        assert len(data) < 200
+
+        attached = pickle.loads(data)
+        try:
+            assert attached.name == snapshot.name
+            assert not attached.owner
+            assert set(attached.graph()) == set(data_graph)
+        finally:
+            attached.close()
+
+    def test_close_unlinks_segment(self, data_graph):
+        """Closing the owning snapshot removes its shared memory segment."""
+        snapshot = GraphSnapshot.create(data_graph)
+        name = snapshot.name
+        snapshot.close()
+        with pytest.raises(FileNotFoundError):
+            GraphSnapshot.attach(name)
+
+    def test_empty_graph(self):
+        """An empty graph gives an empty snapshot."""
+        with GraphSnapshot.create(Graph()) as snapshot:
+            assert len(snapshot.graph()) == 0
+            assert list(snapshot.graph().triples((EX.alice, None, None))) == []
+
+
+class TestSnapshotScoring:
+    """Tests for scoring against snapshot-backed graphs."""
+
+    @pytest.mark.parametrize("backend", ["pyshacl", "native"])
+    def test_results_match_original_graph(
+        self, backend, scoring_graph, data_graph, snapshot
+    ):
+        """Both backends score a snapshot exactly like the original graph."""
+        engine = ScoringEngine(
+            scoring_graph, scoring_graph, scoring_graph, backend=backend
+        )
+        graph = snapshot.graph()
+        for focus_node in FOCUS_NODES:
+            assert engine.score(focus_node, data_graph=graph) == engine.score(
+                focus_node, data_graph=data_graph
+            )
+        assert engine.score_batch(FOCUS_NODES, data_graph=graph) == engine.score_batch(
+            FOCUS_NODES, data_graph=data_graph
+        )
+
+    def test_process_pool_attaches_to_snapshot(
+        self, scoring_graph, data_graph, snapshot
+    ):
+        """Workers attach to the snapshot instead of receiving the triples."""
+        engine = ScoringEngine(scoring_graph, scoring_graph, scoring_graph)
+        assert graph_payload(snapshot) is snapshot
+        assert graph_payload(snapshot.graph()) is snapshot
+        assert snapshot_of(data_graph) is None
+
+        with ProcessPoolScorer(engine, snapshot, max_workers=2, chunk_size=2) as scorer:
+            results = scorer.score(FOCUS_NODES)
+
+        assert results == engine.score_batch(FOCUS_NODES, data_graph=data_graph)
+        assert results[0].widget_scores[0].widget == EX.SocialEditor
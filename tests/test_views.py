@@ -0,0 +1,188 @@
+"""Tests for named graph and union graph views."""
+
+import pickle
+
+import pytest
+from rdflib import Dataset, Graph, Literal, Namespace, URIRef
+from rdflib.graph import ModificationException, ReadOnlyGraphAggregate
+
+from shui_widget_scoring import ScoringEngine
+from shui_widget_scoring.exceptions import MissingGraphError
+from shui_widget_scoring.validation import validate_node_against_shape
+from shui_widget_scoring.views import as_graph, named_graph, union_graph
+
+EX = Namespace("http://example.org/")
+
+SCORING_TTL = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix shui: <http://www.w3.org/ns/shacl-ui#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.org/> .
+
+ex:isBoolean a sh:NodeShape ; sh:datatype xsd:boolean .
+ex:isNamed a sh:NodeShape ;
+    sh:property [ sh:path ex:name ; sh:minCount 1 ; sh:maxCount 1 ] .
+ex:isActive a sh:NodeShape ;
+    sh:property [ sh:path ex:active ; sh:minCount 1 ] .
+
+ex:BooleanScore a shui:Score ; shui:widget ex:BooleanEditor ; shui:score 10 ;
+    shui:dataGraphShape ex:isBoolean .
+ex:NamedScore a shui:Score ; shui:widget ex:NamedResourceEditor ; shui:score 8 ;
+    shui:dataGraphShape ex:isNamed .
+ex:ActiveScore a shui:Score ; shui:widget ex:ActiveResourceEditor ; shui:score 7 ;
+    shui:dataGraphShape ex:isNamed, ex:isActive .
+ex:TextScore a shui:Score ; shui:widget ex:TextEditor ; shui:score 1 .
+"""
+
+SCORING = URIRef("urn:graph:scoring")
+PEOPLE = URIRef("urn:graph:people")
+STATUS = URIRef("urn:graph:status")
+
+
+@pytest.fixture
+def dataset():
+    """Provide a Dataset with scoring rules and data in named graphs."""
+    ds = Dataset()
+    ds.graph(SCORING).parse(data=SCORING_TTL, format="turtle")
+    people = ds.graph(PEOPLE)
+    people.add((EX.alice, EX.name, Literal("Alice")))
+    people.add((EX.bob, EX.name, Literal("Bob")))
+    status = ds.graph(STATUS)
+    status.add((EX.alice, EX.active, Literal(True)))
+    # Also in PEOPLE: a union must not count it twice for sh:maxCount
+    status.add((EX.bob, EX.name, Literal("Bob")))
+    return ds
+
+
+def widgets(result):
+    """Return the widgets of a ScoringResult in order."""
+    return [widget_score.widget for widget_score in result.widget_scores]
+
+
+class TestUnionGraph:
+    """Tests for union_graph."""
+
+    def test_triples_are_deduplicated(self):
+        """A triple in several graphs appears once in the union."""
+        a, b = Graph(), Graph()
+        a.add((EX.s, EX.p, EX.o))
+        b.add((EX.s, EX.p, EX.o))
+        b.add((EX.s, EX.p, EX.other))
+
+        union = union_graph([a, b])
+        assert sorted(union.objects(EX.s, EX.p)) == [EX.o, EX.other]
+        assert len(union) == 2
+        assert (EX.s, EX.p, EX.other) in union
+
+    def test_reads_graphs_in_place(self):
+        """Changes to the underlying graphs are visible through the view."""
+        a, b = Graph(), Graph()
+        union = union_graph([a, b])
+        b.add((EX.s, EX.p, EX.o))
+        assert (EX.s, EX.p, EX.o) in union
+
+    def test_read_only_unless_writable(self):
+        """Views reject additions unless a writable graph is given."""
+        a, b = Graph(), Graph()
+        with pytest.raises(ModificationException):
+            union_graph([a, b]).add((EX.s, EX.p, EX.o))
+
+        union_graph([a, b], writable=b).add((EX.s, EX.p, EX.o))
+        assert len(a) == 0 and len(b) == 1
+
+    def test_single_graph_is_returned(self):
+        """A union of one graph is that graph."""
+        g = Graph()
+        assert union_graph([g]) is g
+
+
+class TestNamedGraph:
+    """Tests for named_graph and as_graph."""
+
+    def test_named_graph_is_a_view(self, dataset):
+        """Named graphs are read from the Dataset's store."""
+        people = named_graph(dataset, str(PEOPLE))
+        assert people.store is dataset.store
+        dataset.graph(PEOPLE).add((EX.carol, EX.name, Literal("Carol")))
+        assert (EX.carol, EX.name, Literal("Carol")) in people
+
+    def test_missing_named_graph_raises(self, dataset):
+        """Unknown graph names raise MissingGraphError."""
+        with pytest.raises(MissingGraphError):
+            named_graph(dataset, "urn:graph:missing")
+
+    def test_as_graph(self, dataset):
+        """Aggregates and whole Datasets become plain union views."""
+        g = Graph()
+        assert as_graph(g) is g
+        assert as_graph(None) is None
+
+        aggregate = ReadOnlyGraphAggregate(
+            [named_graph(dataset, PEOPLE), named_graph(dataset, STATUS)]
+        )
+        view = as_graph(aggregate)
+        assert type(view) is Graph
+        assert (EX.alice, EX.active, Literal(True)) in view
+        assert (EX.alice, EX.name, Literal("Alice")) in as_graph(dataset)
+
+
+class TestScoringWithViews:
+    """Tests for scoring against named graphs and aggregates."""
+
+    def test_dataset_named_graphs(self, dataset, backend):
+        """Engines compile from and score against named graphs in place."""
+        scoring = named_graph(dataset, SCORING)
+        engine = ScoringEngine(scoring, scoring, scoring, backend=backend)
+
+        data = Graph()
+        for triple in named_graph(dataset, PEOPLE):
+            data.add(triple)
+        expected = ScoringEngine(scoring, scoring, scoring, backend=backend)
+        for focus_node in (EX.alice, EX.bob, EX.nobody):
+            assert engine.score(
+                focus_node, data_graph=named_graph(dataset, PEOPLE)
+            ) == expected.score(focus_node, data_graph=data)
+
+    def test_aggregate_data_graph(self, dataset, backend):
+        """Focus node data spread over several graphs is validated as one graph."""
+        scoring = named_graph(dataset, SCORING)
+        engine = ScoringEngine(scoring, scoring, scoring, backend=backend)
+        aggregate = ReadOnlyGraphAggregate(
+            [named_graph(dataset, PEOPLE), named_graph(dataset, STATUS)]
+        )
+
+        assert widgets(engine.score(EX.alice, data_graph=aggregate)) == [
+            EX.NamedResourceEditor,
+            EX.ActiveResourceEditor,
+            EX.TextEditor,
+        ]
+        # ex:bob's name is in both graphs, but is one value
+        assert widgets(engine.score(EX.bob, data_graph=aggregate)) == [
+            EX.NamedResourceEditor,
+            EX.TextEditor,
+        ]
+        results = engine.score_batch([EX.alice, EX.bob], data_graph=aggregate)
+        assert [widgets(r) for r in results] == [
+            widgets(engine.score(EX.alice, data_graph=aggregate)),
+            widgets(engine.score(EX.bob, data_graph=aggregate)),
+        ]
+
+    def test_aggregate_scoring_graph(self, dataset):
+        """Engines compile from aggregates and still pickle."""
+        aggregate = ReadOnlyGraphAggregate([named_graph(dataset, SCORING)])
+        engine = ScoringEngine(aggregate, aggregate, aggregate)
+        restored = pickle.loads(pickle.dumps(engine))
+        people = named_graph(dataset, PEOPLE)
+        assert restored.score(EX.alice, data_graph=people) == engine.score(
+            EX.alice, data_graph=people
+        )
+
+    def test_validation_does_not_modify_shapes_graph(self, dataset):
+        """Targeting a shape for validation leaves the shape definitions untouched."""
+        scoring = named_graph(dataset, SCORING)
+        before = len(scoring)
+        assert validate_node_against_shape(
+            EX.alice, EX.isNamed, named_graph(dataset, PEOPLE), scoring
+        )
+        assert len(scoring) == before
+        assert (EX.isNamed, None, EX.alice) not in scoring